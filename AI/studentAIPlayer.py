@@ -11,10 +11,44 @@ from Move import Move
 from GameState import *
 from Ant import *
 from AIPlayerUtils import *
-
-# Depth limit for ai search
+from AlphaBetaSearch import AlphaBetaSearch
+from ParallelSearch import ParallelSearch
+from MonteCarloSearch import MonteCarloSearch
+from TurnGenerator import listTurns, applyTurn, undoTurn
+from TranspositionTable import TranspositionTable
+from GameEngine import applyMove, undoMove
+from PackedState import *
+from FeatureEvaluation import Feature, FeatureEvaluation
+from OpeningBook import loadOpeningBook
+
+#NumPy is optional.  Without it the search evaluates states one at a time.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Depth limit for ai search, in moves
 DEPTH_LIMIT = 2
 
+# Time limit for ai search, in seconds
+SEARCH_TIME_LIMIT = AI_MOVE_TIMEOUT / 30.0
+
+# Worker processes to spread the search over (see ParallelSearch), or 0 to
+# search in the player's own process
+SEARCH_PROCESSES = 0
+
+# Search with MonteCarloSearch instead of AlphaBetaSearch
+MONTE_CARLO = False
+
+# Search whole turns (see TurnGenerator) instead of single moves
+TURN_SEARCH = False
+
+# Depth limit for the turn search, in turns
+TURN_DEPTH_LIMIT = 2
+
+# Place from the opening book (see OpeningBook) instead of at random
+OPENING_BOOK = True
+
 # weight for having at least one worker
 WORKER_WEIGHT = 100000
 
@@ -33,6 +67,104 @@ QUEEN_LOCATION_WEIGHT = 20000
 # weight for every ant having moved
 MOVED_WEIGHT = 1
 
+# Score the leaves of the search together with evaluatePackedStates.  This
+# needs NumPy, and only pays off once evaluateState costs more than packing
+# a state does, which it doesn't yet.
+BATCH_EVALUATION = False
+
+
+##
+#The features that getPlayerScore adds up (see FeatureEvaluation).  The ones
+#that measure against the goals cached in getMove are given the player.
+##
+
+##
+# WorkerCountFeature
+# Description: Whether the player has exactly one worker
+##
+class WorkerCountFeature(Feature):
+
+    def antValue(self, ant):
+        if ant.type == WORKER:
+            return 1
+        return 0
+
+    def finish(self, total):
+        if total == 1:
+            return 1
+        return 0
+
+##
+# FoodFeature
+# Description: The player's food count
+##
+class FoodFeature(Feature):
+
+    def foodValue(self, foodCount):
+        return foodCount
+
+##
+# QueenLocationFeature
+# Description: 1 if the queen is off the places the workers must go, -1 if
+#    she is in the way
+##
+class QueenLocationFeature(Feature):
+
+    def __init__(self, name, player):
+        super(QueenLocationFeature, self).__init__(name)
+        self.player = player
+
+    def antValue(self, ant):
+        if ant.type != QUEEN:
+            return 0
+        coords = tuple(ant.coords)
+        if coords in self.player.buildingCoords[ant.player] or coords in self.player.foodCoords:
+            return -1
+        return 1
+
+##
+# CarryFeature
+# Description: The number of workers carrying food
+##
+class CarryFeature(Feature):
+
+    def antValue(self, ant):
+        if ant.type == WORKER and ant.carrying:
+            return 1
+        return 0
+
+##
+# GoalDistanceFeature
+# Description: Minus the total distance from each worker to its goal: the
+#    nearest building if it carries food and the nearest food if it doesn't
+##
+class GoalDistanceFeature(Feature):
+
+    def __init__(self, name, player):
+        super(GoalDistanceFeature, self).__init__(name)
+        self.player = player
+
+    def antValue(self, ant):
+        if ant.type != WORKER:
+            return 0
+        if ant.carrying:
+            goals = self.player.buildingCoords[ant.player]
+        else:
+            goals = self.player.foodCoords
+        wc = ant.coords
+        return -min(abs(wc[0]-gc[0]) + abs(wc[1]-gc[1]) for gc in goals)
+
+##
+# MovedFeature
+# Description: The number of ants that have moved
+##
+class MovedFeature(Feature):
+
+    def antValue(self, ant):
+        if ant.hasMoved:
+            return 1
+        return 0
+
 
 ##
 #AIPlayer
@@ -58,6 +190,47 @@ class AIPlayer(Player):
         self.buildingCoords = [(),()]
         self.hillCoords = None
         self.foodCoords = [()]
+        #per-cell tables for evaluatePackedStates, by player (see getGoalTables)
+        self.goalTables = {}
+        self.openingBook = None
+        if OPENING_BOOK:
+            self.openingBook = loadOpeningBook()
+
+        #the terms of getPlayerScore, which the states being searched keep
+        #up to date as moves are made and taken back
+        self.evaluation = FeatureEvaluation()
+        self.evaluation.addFeature(WorkerCountFeature('w'), WORKER_WEIGHT)
+        self.evaluation.addFeature(FoodFeature('f'), FOOD_WEIGHT)
+        self.evaluation.addFeature(QueenLocationFeature('q', self), QUEEN_LOCATION_WEIGHT)
+        self.evaluation.addFeature(CarryFeature('c'), CARRY_WEIGHT)
+        self.evaluation.addFeature(GoalDistanceFeature('d', self), DIST_WEIGHT)
+        self.evaluation.addFeature(MovedFeature('m'), MOVED_WEIGHT)
+
+        #moves are made in place rather than with hypotheticalMove so the
+        #search doesn't have to copy the state for every move it looks at
+        evaluateBatch = None
+        if BATCH_EVALUATION and numpy != None:
+            evaluateBatch = self.evaluatePackedStates
+        self.search = AlphaBetaSearch(self.evaluateState, isOver=self.isGameOver,
+                                      table=TranspositionTable(),
+                                      applyMove=applyMove, undoMove=undoMove,
+                                      evaluateBatch=evaluateBatch)
+        self.parallelSearch = None
+        if SEARCH_PROCESSES > 0:
+            self.parallelSearch = ParallelSearch(self.search, self.prepareSearch, SEARCH_PROCESSES)
+        self.monteCarlo = None
+        if MONTE_CARLO:
+            self.monteCarlo = MonteCarloSearch(self.hasWon, applyMove, undoMove,
+                                               evaluate=self.evaluateState)
+        self.turnSearch = None
+        #the rest of the turn the turn search chose, as (hash of the state
+        #the move is to be made in, Move) pairs
+        self.plannedMoves = []
+        if TURN_SEARCH:
+            self.turnSearch = AlphaBetaSearch(self.evaluateState,
+                                              listMoves=lambda state: listTurns(state, self.evaluateState),
+                                              isOver=self.isGameOver, table=TranspositionTable(),
+                                              applyMove=applyTurn, undoMove=undoTurn)
 
     ##
     #getPlacement
@@ -74,6 +247,10 @@ class AIPlayer(Player):
     #Return: The coordinates of where the construction is to be placed
     ##
     def getPlacement(self, currentState):
+        if self.openingBook != None:
+            placement = self.openingBook.getPlacement(currentState)
+            if placement != None:
+                return placement
         numToPlace = 0
         #implemented by students to return their next move
         if currentState.phase == SETUP_PHASE_1:    #stuff on my side
@@ -114,79 +291,62 @@ class AIPlayer(Player):
             return [(0, 0)]
 
 
-    # scoreChildrenHelper - Helper to determine overall score of branch.
-    # Returns max scoring child.
-    def scoreChildrenHelper(self, nodeList):
-        return max(n['score'] for n in nodeList)
-
-
     ##
-    #expand
-    #
-    #Description: Called to expand a state. Recursively examines the game tree down to
-    # DEPTH_LIMIT. Passes back up a dict with a move and associated score. The move is the
-    # best move to take in this situation.
+    #getMove
+    #Description: Gets the next move from the Player.
     #
     #Parameters:
-    #   state - The state at this place in the game tree
-    #           (to start it should be the current state)
-    #   playerID - Ignored for now. Should always be the current player
-    #   depth - The depth the tree has been examined to. (for recursive use only)
+    #   currentState - The state of the current game waiting for the player's move (GameState)
     #
-    #Return: A dict with keys 'move' and 'score'
-    # move is the ideal Move()
-    # score is the associated score. 0.0 is a loss. 1.0 or more is a victory.
+    #Return: The Move to be made
     ##
-    def expand(self, state, playerID, depth=0):
-
-        if depth == DEPTH_LIMIT:
-            # Base case for depth limit
-            return {'move': Move(END, None, None), 'score': self.evaluateState(state)}
-
-        elif self.hasWon(state, playerID):
-            # Base case for victory
-            # Make the final score take into account how many moves it will take to reach this
-            # victory state. Winning this turn is better than winning next turn.
-            return {'move': Move(END, None, None), 'score': float(DEPTH_LIMIT + 1 - depth)}
-
-        childrenList = []
-
-        bestMove = None
-        bestScore = -1
-
-        # expand this node to find all child nodes
-        for move in listAllLegalMoves(state):
-
-            childState = self.hypotheticalMove(state, move)
-            childState.whoseTurn = self.playerId
-
-            for inventory in childState.inventories:
-                for ant in inventory.ants:
-                    ant.hasMoved = False
-
-            # Recursive step
-            score = self.expand(childState, playerID, depth + 1)['score']
-
-            childrenList.append({'move': move, 'score': score})
-
-            if score > bestScore:
-                bestMove = move
-                bestScore = score
-
-        # return this node
-        return {'move': bestMove, 'score': self.scoreChildrenHelper(childrenList)}
+    def getMove(self, currentState):
+        self.prepareSearch(currentState)
+        if self.monteCarlo != None:
+            return self.monteCarlo.search(currentState, SEARCH_TIME_LIMIT)
+        if self.turnSearch != None:
+            return self.getTurnMove(currentState)
+        if self.parallelSearch != None:
+            return self.parallelSearch.search(currentState, SEARCH_TIME_LIMIT, DEPTH_LIMIT)
+        return self.search.search(currentState, SEARCH_TIME_LIMIT, DEPTH_LIMIT)
 
 
     ##
-    #getMove
-    #Description: Gets the next move from the Player.
+    #getTurnMove
+    #Description: Gets the next move of the turn chosen by the turn search,
+    #   searching for a new turn when the game has gone differently than
+    #   planned (an attack can hit a different ant than the search assumed)
     #
     #Parameters:
     #   currentState - The state of the current game waiting for the player's move (GameState)
     #
     #Return: The Move to be made
     ##
-    def getMove(self, currentState):
+    def getTurnMove(self, currentState):
+        if len(self.plannedMoves) == 0 or self.plannedMoves[0][0] != currentState.getHash():
+            turn = self.turnSearch.search(currentState, SEARCH_TIME_LIMIT, TURN_DEPTH_LIMIT)
+            state = currentState.fastclone()
+            state.buildIndex()
+            state.getHash()
+            self.plannedMoves = []
+            for move in turn:
+                self.plannedMoves.append((state.hash, move))
+                applyMove(state, move)
+        return self.plannedMoves.pop(0)[1]
+
+
+    ##
+    #prepareSearch
+    #Description: Caches what the evaluation measures against before searching
+    #   from a state.  The workers of a parallel search call it too, with the
+    #   copy of the player they were started with.
+    #
+    #Parameters:
+    #   currentState - The state the search starts from (GameState)
+    ##
+    def prepareSearch(self, currentState):
+        #it is this player's turn, which tells a worker which player it is
+        self.playerId = currentState.whoseTurn
 
         # Cache the list of building locations for each player
         buildings = [
@@ -211,8 +371,9 @@ class AIPlayer(Player):
         # Cache the locations of foods
         foods = getConstrList(currentState, None, (FOOD,))
         self.foodCoords = [tuple(f.coords) for f in foods]
-
-        return self.expand(currentState, self.playerId)['move']
+        self.goalTables = {}
+        #the goals the features measure against have moved
+        self.evaluation.invalidate()
 
 
     ##
@@ -232,8 +393,9 @@ class AIPlayer(Player):
     ##
     #hypotheticalMove
     #
-    #Description: Determine what the agent's state would look like after a given move.
-    #             We Will assume that all Move objects passed are valid.
+    #Description: Determine what the state would look like after a given move by the
+    #             player whose turn it is.  We Will assume that all Move objects passed
+    #             are valid.
     #
     #Parameters:
     #   state - A clone of the theoretical state given (GameState)
@@ -244,20 +406,33 @@ class AIPlayer(Player):
     ##
     def hypotheticalMove(self, state, move):
         newState = state.fastclone()
+        me = state.whoseTurn
 
         if move.moveType == END:
-            newState.whoseTurn = 1 - state.whoseTurn
+            #the ants get to move again next turn
+            for ant in newState.inventories[me].ants:
+                newState.hashAnt(ant)
+                ant.hasMoved = False
+                newState.hashAnt(ant)
+            newState.hashTurn()
+            newState.whoseTurn = 1 - me
+            newState.hashTurn()
             return newState
 
         elif move.moveType == MOVE_ANT:
             ant = getAntAt(newState, move.coordList[0])
+            #the ant is hashed back in once it is done changing
+            newState.hashAnt(ant)
             ant.coords = move.coordList[-1]
+            newState.noteAntMoved(ant, move.coordList[0])
 
             #check if ant is depositing food
             if ant.carrying:
-                if tuple(ant.coords) in self.buildingCoords[self.playerId]:
+                if tuple(ant.coords) in self.buildingCoords[me]:
                     ant.carrying = False
-                    newState.inventories[self.playerId].foodCount += 1
+                    newState.hashFood(me)
+                    newState.inventories[me].foodCount += 1
+                    newState.hashFood(me)
 
             #check if ant is picking up food
             if not ant.carrying:
@@ -269,38 +444,53 @@ class AIPlayer(Player):
             targets = [] #coordinates of attackable ants
             range = UNIT_STATS[ant.type][RANGE]
 
-            for ant in newState.inventories[1 - self.playerId].ants:
-                dist = math.sqrt((ant.coords[0] - ant.coords[0]) ** 2 +
-                                 (ant.coords[1] - ant.coords[1]) ** 2)
+            for enemy in newState.inventories[1 - me].ants:
+                dist = math.sqrt((ant.coords[0] - enemy.coords[0]) ** 2 +
+                                 (ant.coords[1] - enemy.coords[1]) ** 2)
                 if dist <= range:
                     #target is in range and may be attacked
-                    targets.append(ant.coords)
+                    targets.append(enemy.coords)
 
             if targets:
                 #Attack the ant chosen by the AI
                 target = self.getAttack(newState, ant, targets)
                 targetAnt = getAntAt(newState, target)
+                newState.hashAnt(targetAnt)
                 targetAnt.health -= UNIT_STATS[ant.type][ATTACK]
 
                 if targetAnt.health <= 0:
                     #Remove the dead ant
-                    newState.inventories[1 - self.playerId].ants.remove(targetAnt)
+                    newState.inventories[1 - me].ants.remove(targetAnt)
+                    newState.noteAntRemoved(targetAnt)
+                else:
+                    newState.hashAnt(targetAnt)
 
             ant.hasMoved = True
+            newState.hashAnt(ant)
 
         else: #Move type BUILD
             if move.buildType in (WORKER, DRONE, SOLDIER, R_SOLDIER):
                 #Build ant on hill
-                ant = Ant(move.coordList[0], move.buildType, self.playerId)
-                newState.inventories[self.playerId].ants.append(ant)
-
-                newState.inventories[self.playerId].foodCount -= UNIT_STATS[move.buildType][COST]
+                ant = Ant(move.coordList[0], move.buildType, me)
+                #new ants can't move until next turn
+                ant.hasMoved = True
+                newState.inventories[me].ants.append(ant)
+                newState.noteAntAdded(ant)
+                newState.hashAnt(ant)
+
+                newState.hashFood(me)
+                newState.inventories[me].foodCount -= UNIT_STATS[move.buildType][COST]
+                newState.hashFood(me)
             else:
                 #build new building
-                building = Building(move.coordList[0], move.buildType, self.playerId)
-                newState.inventories[self.playerId].constrs.append(building)
+                building = Building(move.coordList[0], move.buildType, me)
+                newState.inventories[me].constrs.append(building)
+                newState.noteConstrAdded(building)
+                newState.hashConstr(building)
 
-                newState.inventories[self.playerId].foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
+                newState.hashFood(me)
+                newState.inventories[me].foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
+                newState.hashFood(me)
 
         return newState
 
@@ -309,7 +499,9 @@ class AIPlayer(Player):
     ##
     # getPlayerScore
     # Description: takes a state and player number and returns a number estimating that
-    # player's score.
+    # player's score: the weighted sum of the features in self.evaluation.  The totals
+    # are kept on the state, so scoring it again after a move only works out the ants
+    # that changed.
     #
     # Parameters:
     #    hypotheticalState - The state to score
@@ -322,69 +514,15 @@ class AIPlayer(Player):
     #      A dict containing the components of the player's score along with the score
     ##
     def getPlayerScore(self, hypotheticalState, playerNo, debug=False):
-
-        workers = getAntList(hypotheticalState, playerNo, (WORKER,))
-
-        #################################################################################
-        #Score having exactly one worker
-
-        workerCountScore = 0
-        if len(workers) == 1:
-            workerCountScore = WORKER_WEIGHT
-
-        #################################################################################
-        #Score the food we have
-
-        foodScore = hypotheticalState.inventories[playerNo].foodCount * FOOD_WEIGHT
-
-
-        #################################################################################
-        #Score queen being off of anthill and food
-
-        queenScore = 0
-
-        for ant in hypotheticalState.inventories[playerNo].ants:
-            if ant.type == QUEEN:
-                if tuple(ant.coords) in list(self.buildingCoords[playerNo]) + self.foodCoords:
-                    queenScore = -QUEEN_LOCATION_WEIGHT
-                else:
-                    queenScore = QUEEN_LOCATION_WEIGHT
-                break
-
-
-        #################################################################################
-        #Score the workers for getting to their goals and carrying food
-
-        distScore = 0
-        carryScore = 0
-
-        for worker in workers:
-            if worker.carrying:
-                carryScore += CARRY_WEIGHT
-                goals = self.buildingCoords[playerNo]
-            else:
-                goals = self.foodCoords
-
-            wc = worker.coords
-            dist = min(abs(wc[0]-gc[0]) + abs(wc[1]-gc[1]) for gc in goals)
-
-            distScore -= DIST_WEIGHT * dist
-
-        #################################################################################
-        #Score every ant having moved
-
-        movedScore = 0
-
-        #It is to our advantage to have every ant move every turn
-        for ant in hypotheticalState.inventories[playerNo].ants:
-            if ant.hasMoved:
-                movedScore += MOVED_WEIGHT
-
-        score = foodScore + distScore + carryScore + queenScore + movedScore + workerCountScore
+        values = self.evaluation.getValues(hypotheticalState)
+        score = values.score(playerNo)
 
         if debug:
-            return {'f': foodScore, 'd': distScore, 'c': carryScore, 'q': queenScore,
-                    'm': movedScore, 'w': workerCountScore, 'S': score}
+            result = {'S': score}
+            for index in xrange(0, len(self.evaluation.features)):
+                result[self.evaluation.features[index].name] = \
+                    self.evaluation.weights[index] * values.getValue(playerNo, index)
+            return result
         else:
             return score
 
@@ -409,9 +547,8 @@ class AIPlayer(Player):
                 break
 
         #Check if enemy queen is dead
-        for ant in hypotheticalState.inventories[1 - playerNo].ants:
-            if ant.type == QUEEN and ant.health == 0:
-                return True
+        if hypotheticalState.inventories[1 - playerNo].getQueen() == None:
+            return True
 
         #Check if we have 11 food
         if hypotheticalState.inventories[playerNo].foodCount >= 11:
@@ -420,30 +557,139 @@ class AIPlayer(Player):
         return False
 
 
+    ##
+    # isGameOver
+    # Description: Takes a GameState and returns if either player has won
+    # Parameters:
+    #    hypotheticalState - The state to test for victory
+    # Returns:
+    #    True if the game is over else False.
+    ##
+    def isGameOver(self, hypotheticalState):
+        return self.hasWon(hypotheticalState, PLAYER_ONE) or self.hasWon(hypotheticalState, PLAYER_TWO)
+
+
     ##
     #evaluateState
     #
-    #Description: Examines a GameState and ranks how "good" that state is for the agent whose turn it is.
-    #              A rating is given on the players state. 1.0 is if the agent has won; 0.0 if the enemy has won.
+    #Description: Examines a GameState and ranks how "good" that state is for a player.
+    #              1.0 is if the player has won; -1.0 if the enemy has won.  Only the
+    #              agent's own progress is scored, so the rating for the enemy is the
+    #              negative of the agent's rating.
     #
     #Parameters:
     #   hypotheticalState - The state being considered by the AI for ranking.
+    #   playerNo - The player to rank the state for
     #
     #Return:
-    #   The move rated as the "best"
+    #   The rating of the state, between -1.0 and 1.0
     ##
-    def evaluateState(self, hypotheticalState):
+    def evaluateState(self, hypotheticalState, playerNo):
+        if playerNo != self.playerId:
+            return -self.evaluateState(hypotheticalState, self.playerId)
 
         #Check if the game is over
-        if self.hasWon(hypotheticalState, self.playerId):
+        if self.hasWon(hypotheticalState, playerNo):
             return 1.0
-        elif self.hasWon(hypotheticalState, 1 - self.playerId):
-            return 0.0
+        elif self.hasWon(hypotheticalState, 1 - playerNo):
+            return -1.0
 
-        playerScore = self.getPlayerScore(hypotheticalState, self.playerId)
+        playerScore = self.getPlayerScore(hypotheticalState, playerNo)
 
-        #Normalize the score to be between 0.0 and 1.0
-        return (math.atan(playerScore/10000.) + math.pi/2) / math.pi
+        #Normalize the score to be between -0.5 and 0.5
+        return math.atan(playerScore/10000.) / math.pi
+
+
+    ##
+    #getGoalTables
+    #Description: Lays the goals that getPlayerScore measures against out
+    #   by cell, in the order PackedState stores cells in.  The tables only
+    #   change when the goals do, so they are made once per getMove.
+    #
+    #Parameters:
+    #   playerNo - The player the goals are for
+    #
+    #Return: A tuple of numpy arrays with one entry per cell:
+    #   (distance to the nearest building, distance to the nearest food,
+    #   whether the queen is in the way there)
+    ##
+    def getGoalTables(self, playerNo):
+        if playerNo not in self.goalTables:
+            buildingDist = numpy.zeros(NUM_CELLS, numpy.int32)
+            foodDist = numpy.zeros(NUM_CELLS, numpy.int32)
+            queenInWay = numpy.zeros(NUM_CELLS, numpy.bool_)
+            for x in xrange(0, BOARD_LENGTH):
+                for y in xrange(0, BOARD_LENGTH):
+                    cell = x * BOARD_LENGTH + y
+                    buildingDist[cell] = min(abs(x-gc[0]) + abs(y-gc[1]) for gc in self.buildingCoords[playerNo])
+                    foodDist[cell] = min(abs(x-gc[0]) + abs(y-gc[1]) for gc in self.foodCoords)
+            for coords in list(self.buildingCoords[playerNo]) + self.foodCoords:
+                queenInWay[coords[0] * BOARD_LENGTH + coords[1]] = True
+            self.goalTables[playerNo] = (buildingDist, foodDist, queenInWay)
+        return self.goalTables[playerNo]
+
+
+    ##
+    #evaluatePackedStates
+    #
+    #Description: Rates many states at once, exactly as evaluateState would
+    #              rate each of them.  With NumPy the states are stacked into
+    #              one array and every term of getPlayerScore is worked out
+    #              for all of them together.
+    #
+    #Parameters:
+    #   packedStates - The states to rate (PackedState[])
+    #   playerNo - The player to rank the states for
+    #
+    #Return:
+    #   The rating of each state (float[])
+    ##
+    def evaluatePackedStates(self, packedStates, playerNo):
+        if numpy == None:
+            return [self.evaluateState(packed.toGameState(False), playerNo)
+                    for packed in packedStates]
+        if playerNo != self.playerId:
+            return [-rating for rating in self.evaluatePackedStates(packedStates, self.playerId)]
+
+        data = numpy.frombuffer(bytearray().join(packed.data for packed in packedStates), numpy.uint8)
+        data = data.reshape(len(packedStates), PACKED_SIZE)
+        ants = data[:, ANTS_OFFSET:ANTS_OFFSET + NUM_CELLS]
+        antTypes = (ants & ANT_TYPE_MASK).astype(numpy.int32) - 1
+        ownedByTwo = (ants & ANT_OWNER_BIT) != 0
+        mine = (ants != 0) & (ownedByTwo == (playerNo == PLAYER_TWO))
+        theirs = (ants != 0) & ~mine
+        carrying = (ants & ANT_CARRYING_BIT) != 0
+        moved = (ants & ANT_MOVED_BIT) != 0
+        myFood = data[:, FOOD_OFFSET + playerNo].astype(numpy.int32)
+        theirFood = data[:, FOOD_OFFSET + 1 - playerNo].astype(numpy.int32)
+        buildingDist, foodDist, queenInWay = self.getGoalTables(playerNo)
+
+        #the same terms as getPlayerScore
+        workers = mine & (antTypes == WORKER)
+        workerCountScore = numpy.where(workers.sum(1) == 1, WORKER_WEIGHT, 0)
+        foodScore = myFood * FOOD_WEIGHT
+        myQueen = mine & (antTypes == QUEEN)
+        queenScore = numpy.where(myQueen.any(1),
+                                 numpy.where((myQueen & queenInWay).any(1),
+                                             -QUEEN_LOCATION_WEIGHT, QUEEN_LOCATION_WEIGHT), 0)
+        carryScore = (workers & carrying).sum(1) * CARRY_WEIGHT
+        distScore = -DIST_WEIGHT * (((workers & carrying) * buildingDist).sum(1) +
+                                    ((workers & ~carrying) * foodDist).sum(1))
+        movedScore = (mine & moved).sum(1) * MOVED_WEIGHT
+        score = foodScore + distScore + carryScore + queenScore + movedScore + workerCountScore
+        ratings = numpy.arctan(score / 10000.) / math.pi
+
+        #the same checks as hasWon
+        constrs = data[:, CONSTRS_OFFSET:CONSTRS_OFFSET + NUM_CELLS]
+        captureHealth = data[:, CAPTURE_HEALTH_OFFSET:CAPTURE_HEALTH_OFFSET + NUM_CELLS]
+        theirHillTaken = ((constrs == packConstr(ANTHILL, 1 - playerNo)) &
+                          (captureHealth == 1) & mine).any(1)
+        myHillTaken = ((constrs == packConstr(ANTHILL, playerNo)) &
+                       (captureHealth == 1) & theirs).any(1)
+        won = theirHillTaken | ~(theirs & (antTypes == QUEEN)).any(1) | (myFood >= 11)
+        lost = myHillTaken | ~myQueen.any(1) | (theirFood >= 11)
+        ratings = numpy.where(won, 1.0, numpy.where(lost, -1.0, ratings))
+        return ratings.tolist()
 
 
     ##
@@ -502,5 +748,90 @@ def unitTest1():
 
     return True
 
+##
+# unitTest2
+# Description: Tests that PackedState.update packs a state with a captured
+#   tunnel the same as packing it from scratch does
+# Returns:
+#    False if anything is wrong else True
+##
+def unitTest2():
+    p1Inventory = Inventory(PLAYER_ONE, [Ant((0,0), QUEEN, PLAYER_ONE)],
+                            [Building((0,0), ANTHILL, PLAYER_ONE), Building((2,2), TUNNEL, PLAYER_ONE)], 3)
+    p2Inventory = Inventory(PLAYER_TWO, [Ant((9,9), QUEEN, PLAYER_TWO), Ant((2,2), SOLDIER, PLAYER_TWO)],
+                            [Building((9,9), ANTHILL, PLAYER_TWO), Building((7,7), TUNNEL, PLAYER_TWO)], 1)
+    neutralInventory = Inventory(NEUTRAL, [], [Construction((5,1), FOOD), Construction((4,8), GRASS)], 0)
+    state = GameState(None, [p1Inventory, p2Inventory, neutralInventory], PLAY_PHASE, PLAYER_TWO)
+    packedState = PackedState(state)
+
+    #player two's soldier captures player one's tunnel, which stays in
+    #player one's inventory
+    tunnel = p1Inventory.constrs[1]
+    tunnel.player = PLAYER_TWO
+    tunnel.captureHealth = CONSTR_STATS[TUNNEL][CAP_HEALTH]
+    packedState.update(state)
+    if packedState.key() != PackedState(state).key():
+        print "update packed a captured tunnel differently from pack"
+        return False
+
+    return True
+
+##
+# unitTest3
+# Description: Tests that a ParallelSearch worker searches from a root with
+#   the same inventories as the state it was given, and indexes it so that
+#   no state below it needs an indexed copy made (see listAllLegalMoves)
+# Returns:
+#    False if anything is wrong else True
+##
+def unitTest3():
+    import multiprocessing, time
+    import ParallelSearch as parallelSearch
+    from AlphaBetaSearch import INFINITY
+    p1Inventory = Inventory(PLAYER_ONE, [Ant((0,0), QUEEN, PLAYER_ONE), Ant((3,3), WORKER, PLAYER_ONE)],
+                            [Building((0,0), ANTHILL, PLAYER_ONE), Building((7,2), TUNNEL, PLAYER_ONE)], 3)
+    #board order would put the worker first
+    p2Inventory = Inventory(PLAYER_TWO, [Ant((9,9), QUEEN, PLAYER_TWO), Ant((5,5), WORKER, PLAYER_TWO)],
+                            [Building((9,9), ANTHILL, PLAYER_TWO), Building((2,8), TUNNEL, PLAYER_TWO)], 1)
+    neutralInventory = Inventory(NEUTRAL, [], [Construction((1,5), FOOD), Construction((8,5), FOOD)], 0)
+    state = GameState(None, [p1Inventory, p2Inventory, neutralInventory], PLAY_PHASE, PLAYER_ONE)
+
+    player = AIPlayer(PLAYER_ONE)
+    parallelSearch.initWorker(player.search, player.prepareSearch, multiprocessing.Value('d', -INFINITY), None)
+    move = listAllLegalMoves(state)[0]
+    task = (0, PackedState(state).data, parallelSearch.getInventoryOrder(state), 0, move, 2, time.time() + 10)
+
+    #count the copies made while the worker searches
+    fastclone = GameState.fastclone
+    copies = [0]
+    def countingFastclone(self):
+        copies[0] += 1
+        return fastclone(self)
+    GameState.fastclone = countingFastclone
+    try:
+        score = parallelSearch.searchRootMove(task)[1]
+    finally:
+        GameState.fastclone = fastclone
+
+    if score == None:
+        print "worker didn't finish searching"
+        return False
+
+    if parallelSearch.getInventoryOrder(parallelSearch.workerRoot) != parallelSearch.getInventoryOrder(state):
+        print "worker's inventories aren't in the order of the state it was given"
+        return False
+
+    if copies[0] != 0:
+        print "worker made " + str(copies[0]) + " indexed copies"
+        return False
+
+    return True
+
 if unitTest1():
     print "Unit Test 1 passed!"
+
+if unitTest2():
+    print "Unit Test 2 passed!"
+
+if unitTest3():
+    print "Unit Test 3 passed!"
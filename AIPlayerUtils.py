@@ -1,8 +1,9 @@
-import random
+import random, heapq, array
 from Constants import *
 from Ant import UNIT_STATS
 from Construction import CONSTR_STATS
 from Move import *
+from GameState import GameState
 
 #
 # AIPlayerUtils.py
@@ -15,6 +16,11 @@ from Move import *
 # these routines safe for a GameState that has been generated via the
 # GameState.fastclone method.
 #
+# getAntAt and getConstrAt use the GameState's index of where everything is
+# if it has one (see GameState.buildIndex).  Code that indexes a GameState
+# must tell it when ants are moved, added or removed (see
+# GameState.noteAntMoved and friends) or call invalidateIndex.
+#
 
 ##
 # legalCoord
@@ -114,6 +120,10 @@ def getConstrList(currentState,
 #
 # Return:  the construct at the coordinate or None if there is none
 def getConstrAt(state, coords):
+    #a GameState knows where its constructs are
+    if isinstance(state, GameState):
+        return state.getConstrAt(coords)
+
     #get a list of all constructs
     allConstrs = getConstrList(state)
 
@@ -135,7 +145,11 @@ def getConstrAt(state, coords):
 #
 # Return:  the ant at the coordinate or None if there is none
 def getAntAt(state, coords):
-    #get a list of all constructs
+    #a GameState knows where its ants are
+    if isinstance(state, GameState):
+        return state.getAntAt(coords)
+
+    #get a list of all ants
     allAnts = getAntList(state)
 
     #search for one at the given coord
@@ -259,12 +273,156 @@ def listAllMovementPaths(currentState, coords, movement):
 
     return validMoves
 
+##
+# listCheapestMovementPaths
+#
+# calculates one cheapest path to each cell that a single ant can move to
+# from a given position.  Paths that end on the same cell lead to the same
+# state, so this lists every distinct outcome of moving the ant exactly
+# once.  Like listAllMovementPaths, the ant doesn't actually have to be
+# there.
+#
+# Parameters:
+#    currentState - current game state
+#    coords       - where the ant is
+#    movement     - movement points ant has
+#    isQueen      - if True, only paths that keep a queen in her territory
+#                   are considered (see isPathOkForQueen)
+#
+# Return: a list of lists of coords (tuples). Each sub-list of tuples is an
+# acceptable set of coords for a Move object
+def listCheapestMovementPaths(currentState, coords, movement, isQueen = False):
+    start = tuple(coords)
+
+    #the cheapest known cost and path to each cell reached so far
+    costs = { start : 0 }
+    paths = { start : [coords] }
+    #the cells in the order they were reached (so the result is repeatable)
+    reached = []
+
+    #Dijkstra's algorithm over the move costs of the cells entered
+    queue = [ (0, start) ]
+    while (len(queue) > 0):
+        cost, cell = heapq.heappop(queue)
+        #skip cells that have since been reached more cheaply
+        if (cost > costs[cell]): continue
+
+        for newCell in listAdjacent(cell):
+            if (isQueen and not isPathOkForQueen([newCell])): continue
+            if (getAntAt(currentState, newCell) != None): continue
+            constrAtDest = getConstrAt(currentState, newCell)
+            newCost = cost + 1  #default
+            if constrAtDest != None:
+                newCost = cost + CONSTR_STATS[constrAtDest.type][MOVE_COST]
+            if (newCost > movement): continue
+
+            if (not costs.has_key(newCell)):
+                reached.append(newCell)
+            elif (newCost >= costs[newCell]):
+                continue
+            costs[newCell] = newCost
+            paths[newCell] = paths[cell] + [newCell]
+            heapq.heappush(queue, (newCost, newCell))
+
+    result = [paths[cell] for cell in reached]
+    #Append the zero-step move (used to activate attack on adjacent foe)
+    result.append([coords])
+
+    return result
+
+
+##
+# terrainKey
+#
+# describes the cells of a state that cost more (or less) than one movement
+# point to enter.  States with the same key have the same distances between
+# every pair of cells.
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#
+# Return: a hashable description of the terrain (a tuple)
+def terrainKey(currentState):
+    key = []
+    for inv in currentState.inventories:
+        for constr in inv.constrs:
+            cost = CONSTR_STATS[constr.type][MOVE_COST]
+            if (cost != 1):
+                key.append((constr.coords[0], constr.coords[1], cost))
+    key.sort()
+    return tuple(key)
+
+#The distance tables built so far, by terrain key (see getDistanceTable).
+#Grass and food never move after setup so a game needs one per player view.
+distanceTables = {}
+#how many distance tables to keep before starting over
+MAX_DISTANCE_TABLES = 16
+
+##
+# getDistanceTable
+#
+# finds the shortest distance between every pair of cells, taking movement
+# costs into account.  The distances are computed once for each terrain
+# (see terrainKey) and then shared by every state with that terrain.  A
+# GameState remembers its table, and so do its clones.
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#
+# Return: an array of BOARD_LENGTH**4 distances.  The distance from (sx, sy)
+# to (dx, dy) is at index
+#   (dx * BOARD_LENGTH + dy) * BOARD_LENGTH**2 + sx * BOARD_LENGTH + sy
+def getDistanceTable(currentState):
+    isGameState = isinstance(currentState, GameState)
+    if (isGameState and currentState.distanceTable != None):
+        return currentState.distanceTable
+
+    key = terrainKey(currentState)
+    table = distanceTables.get(key)
+    if (table != None):
+        if (isGameState):
+            currentState.distanceTable = table
+        return table
+
+    numCells = BOARD_LENGTH * BOARD_LENGTH
+    #the cost to enter each cell
+    costs = [1] * numCells
+    for x, y, cost in key:
+        costs[x * BOARD_LENGTH + y] = cost
+
+    table = array.array('B', [0] * (numCells * numCells))
+    for dst in xrange(0, numCells):
+        #Dijkstra's algorithm backwards from dst: stepping back from a cell
+        #costs what it took to enter that cell
+        dists = [None] * numCells
+        dists[dst] = 0
+        queue = [ (0, dst) ]
+        while (len(queue) > 0):
+            dist, cell = heapq.heappop(queue)
+            if (dist > dists[cell]): continue
+            newDist = dist + costs[cell]
+            x = cell / BOARD_LENGTH
+            y = cell % BOARD_LENGTH
+            for newX, newY in listAdjacent((x, y)):
+                newCell = newX * BOARD_LENGTH + newY
+                if (dists[newCell] == None) or (newDist < dists[newCell]):
+                    dists[newCell] = newDist
+                    heapq.heappush(queue, (newDist, newCell))
+        table[dst * numCells : (dst + 1) * numCells] = array.array('B', dists)
+
+    if (len(distanceTables) >= MAX_DISTANCE_TABLES):
+        distanceTables.clear()
+    distanceTables[key] = table
+    if (isGameState):
+        currentState.distanceTable = table
+    return table
 
 ##
 # stepsToReach
 #
-# estimates the shortest distance between two cells taking
-# movement costs into account.
+# finds the shortest distance between two cells taking movement costs into
+# account.  This is a lookup in the distance table for the state's terrain
+# (see getDistanceTable).
 #
 #Parameters:
 #   currentState   - The state of the game (GameState)
@@ -277,41 +435,31 @@ def stepsToReach(currentState, src, dst):
     if (not legalCoord(src)): return -1
     if (not legalCoord(dst)): return -1
 
-    #a dictionary of already visted cells and the corresponding cost to reach
-    visited = { src : 0 }
-    #a list of to be processed cells
-    queue = [ src ]
-
-    #this loops processes cells in the queue until it is empty
-    while(len(queue) > 0):
-        cell = queue.pop(0)
-
-        #if this cell is our destination we are done
-        if (cell == dst):
-            return visited[cell]
+    table = getDistanceTable(currentState)
+    return table[(dst[0] * BOARD_LENGTH + dst[1]) * BOARD_LENGTH * BOARD_LENGTH
+                 + src[0] * BOARD_LENGTH + src[1]]
 
-        #calc distance to all cells adj to this one assuming we reach them
-        #from this one
-        nextSteps = listAdjacent(cell)
-        for newCell in nextSteps:
-            constrAtDest = getConstrAt(currentState, newCell)
-            cost = 1  #default
-            if constrAtDest != None:
-                cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
-            dist = visited[cell] + cost
-
-            #if the new distance is best so far, update the visited dict
-            if (visited.has_key(newCell)):
-                if (dist < visited[newCell]):
-                    visited[newCell] = dist
-            #if we've never seen this cell before also update dict and
-            #enqueue this new cell to be processed at a future loop iteration
-            else:
-                visited[newCell] = dist
-                queue.append(newCell)
+##
+# distanceMap
+#
+# finds the shortest distance from every cell to a given cell taking
+# movement costs into account
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#   dst            - destination position (an x,y coord)
+#
+# Return: a list of lists of distances indexed like the board, so the
+# distance from (x, y) to dst is distanceMap(currentState, dst)[x][y].
+# None on invalid input.
+def distanceMap(currentState, dst):
+    #check for invalid input
+    if (not legalCoord(dst)): return None
 
-    #we should never reach this point
-    return -1
+    table = getDistanceTable(currentState)
+    base = (dst[0] * BOARD_LENGTH + dst[1]) * BOARD_LENGTH * BOARD_LENGTH
+    return [table[base + x * BOARD_LENGTH : base + (x + 1) * BOARD_LENGTH].tolist()
+            for x in xrange(0, BOARD_LENGTH)]
 
 ##
 # listAllBuildMoves
@@ -391,9 +539,12 @@ def isPathOkForQueen(path):
 #
 # Parameters:
 #   currentState - the current state
+#   cheapestOnly - if True, list only one (cheapest) move per ant and
+#                  destination instead of every path (see
+#                  listCheapestMovementPaths)
 #
 # Returns:  a list of Move objects
-def listAllMovementMoves(currentState):
+def listAllMovementMoves(currentState, cheapestOnly = False):
     result = []
 
     #first get all MOVE_ANT moves for each ant in the inventory
@@ -402,13 +553,20 @@ def listAllMovementMoves(currentState):
         #skip ants that have already moved
         if (ant.hasMoved): continue
 
-        #create a Move object for each valid movement path
-        allPaths = listAllMovementPaths(currentState,
-                                        ant.coords,
-                                        UNIT_STATS[ant.type][MOVEMENT])
+        if (cheapestOnly):
+            #one move for each place the ant can end up
+            allPaths = listCheapestMovementPaths(currentState,
+                                                 ant.coords,
+                                                 UNIT_STATS[ant.type][MOVEMENT],
+                                                 ant.type == QUEEN)
+        else:
+            #create a Move object for each valid movement path
+            allPaths = listAllMovementPaths(currentState,
+                                            ant.coords,
+                                            UNIT_STATS[ant.type][MOVEMENT])
 
         #remove moves that take the queen out of her territory
-        if (ant.type == QUEEN):
+        if (ant.type == QUEEN and not cheapestOnly):
             tmpList = []
             for path in allPaths:
                 if (isPathOkForQueen(path)):
@@ -430,11 +588,18 @@ def listAllMovementMoves(currentState):
 #
 # Parameters:
 #   currentState - the current state
+#   cheapestOnly - if True, list only one MOVE_ANT move per ant and
+#                  destination (see listAllMovementMoves)
 #
 # Returns:  a list of Move objects
-def listAllLegalMoves(currentState):
+def listAllLegalMoves(currentState, cheapestOnly = False):
+    #work on an indexed copy of a state that isn't indexed, as this makes
+    #many lookups (see GameState.buildIndex)
+    if isinstance(currentState, GameState) and currentState.antIndex == None:
+        currentState = currentState.fastclone()
+        currentState.buildIndex()
     result = []
-    result.extend(listAllMovementMoves(currentState))
+    result.extend(listAllMovementMoves(currentState, cheapestOnly))
     result.extend(listAllBuildMoves(currentState))
     result.append(Move(END, None, None))
     return result
@@ -0,0 +1,382 @@
+import time
+from Constants import *
+from AIPlayerUtils import listAllLegalMoves
+from TranspositionTable import *
+from PackedState import PackedState
+
+#
+# AlphaBetaSearch.py
+#
+# A reusable game tree search for AI players: negamax with alpha-beta
+# pruning, move ordering and iterative deepening under a time limit.
+#
+# A turn in Antics is a series of moves by the same player that ends with
+# an END move, so the search counts depth in moves, not turns, and only
+# switches sides when a move hands the turn to the other player.
+#
+
+#How long a search may take by default, in seconds.  This leaves the rest
+#of AI_MOVE_TIMEOUT for everything else the player does in getMove.
+DEFAULT_TIME_LIMIT = AI_MOVE_TIMEOUT / 10.0
+
+#The deepest the search goes by default, in moves
+DEFAULT_MAX_DEPTH = 20
+
+#A score better than any evaluation
+INFINITY = float("inf")
+
+#The score of a game that is won.  Evaluations are between -WIN_SCORE and
+#WIN_SCORE, and only reach them once the game is decided.
+WIN_SCORE = 1.0
+
+##
+#SearchTimeout
+#Description: Raised inside a search when its time is up
+##
+class SearchTimeout(Exception):
+    pass
+
+##
+#AlphaBetaSearch
+#Description: Finds the best move for the player whose turn it is.  The
+#   search only knows the game through the functions it is given, so it
+#   works with any evaluation and any way of making moves.
+#
+#Variables:
+#   evaluate - A function (state, playerId) -> float that scores a state for
+#       the given player.  It must be zero sum: the score for one player is
+#       the negative of the score for the other.  It must be between
+#       -WIN_SCORE and WIN_SCORE.
+#   getChild - A function (state, move) -> GameState that returns the state
+#       after the move, leaving the given state alone
+#   applyMove, undoMove - Functions that make a move in a state in place and
+#       take it back (see GameEngine.applyMove).  If given they are used
+#       instead of getChild so the search needs only one state.
+#   listMoves - A function (state) -> Move[] listing the moves to search
+#   isOver - A function (state) -> bool that says whether the game is over,
+#       or None if the evaluation takes care of that
+#   evaluateBatch - A function (PackedState[], playerId) -> float[] that
+#       scores many states at once like evaluate does, or None.  If given it
+#       scores the children being ordered and the leaves below the last
+#       searched move in one call per parent.
+#   table - A TranspositionTable to remember searched states in, or None.
+#       getChild or applyMove must keep the states' hashes up to date to
+#       use one (see GameState.hashAnt).
+#   nodeCount - The number of states visited by the last search
+#   depthReached - The deepest search that finished in the last search
+##
+class AlphaBetaSearch(object):
+
+    ##
+    #__init__
+    #Description: Creates a new AlphaBetaSearch
+    #
+    #Parameters:
+    #   evaluate - see above ((GameState, int) -> float)
+    #   getChild - see above ((GameState, Move) -> GameState)
+    #   listMoves - see above, defaults to one move per ant and destination
+    #       (GameState -> Move[])
+    #   isOver - see above (GameState -> bool)
+    #   table - see above (TranspositionTable)
+    #   applyMove - see above ((GameState, Move) -> undo record)
+    #   undoMove - see above ((GameState, undo record) -> None)
+    #   evaluateBatch - see above ((PackedState[], int) -> float[])
+    ##
+    def __init__(self, evaluate, getChild=None, listMoves=None, isOver=None, table=None,
+                 applyMove=None, undoMove=None, evaluateBatch=None):
+        self.evaluate = evaluate
+        self.evaluateBatch = evaluateBatch
+        self.getChild = getChild
+        self.applyMove = applyMove
+        self.undoMove = undoMove
+        if listMoves == None:
+            listMoves = lambda state: listAllLegalMoves(state, True)
+        self.listMoves = listMoves
+        self.isOver = isOver
+        self.table = table
+        self.nodeCount = 0
+        self.depthReached = 0
+        self.deadline = None
+
+    ##
+    #search
+    #Description: Searches one move deeper at a time until the time runs out
+    #   or maxDepth is reached.  Each search starts with the best move of the
+    #   one before, so an unfinished search still improves on it.
+    #
+    #Parameters:
+    #   state - The state to find a move for (GameState)
+    #   timeLimit - How long the search may take in seconds (float)
+    #   maxDepth - The deepest to search, in moves (int)
+    #
+    #Return: The best Move found
+    ##
+    def search(self, state, timeLimit=DEFAULT_TIME_LIMIT, maxDepth=DEFAULT_MAX_DEPTH):
+        self.deadline = time.time() + timeLimit
+        self.nodeCount = 0
+        self.depthReached = 0
+        if self.applyMove != None:
+            #work on a copy, which a search that runs out of time can
+            #abandon in the middle of a move.  Only applyMove changes it, so
+            #it can be indexed.
+            state = state.fastclone()
+            state.buildIndex()
+        if self.table != None:
+            self.table.newSearch()
+            #hash the root so its children inherit the hash instead of
+            #each hashing themselves from scratch
+            state.getHash()
+
+        children = self.orderChildren(state, self.listMoves(state))
+        bestMove = children[0][0]
+        for depth in xrange(1, maxDepth + 1):
+            try:
+                move, score = self.searchRoot(state, children, depth)
+            except SearchTimeout as timeout:
+                #the best move of the unfinished search, which started with
+                #the previous best, is at least as good
+                if timeout.args:
+                    bestMove = timeout.args[0]
+                break
+            bestMove = move
+            self.depthReached = depth
+            #search the best move first next time
+            for i in xrange(0, len(children)):
+                if children[i][0] is move:
+                    children.insert(0, children.pop(i))
+                    break
+            #nothing left to find out once the game is decided
+            if abs(score) >= WIN_SCORE:
+                break
+
+        return bestMove
+
+    ##
+    #searchRoot
+    #Description: Searches every move from the root to the given depth
+    #
+    #Parameters:
+    #   state - The state to find a move for (GameState)
+    #   children - The moves from state and the states they lead to, best
+    #       first (see orderChildren)
+    #   depth - How deep to search, in moves (int)
+    #
+    #Return: A tuple of (best Move, its score)
+    ##
+    def searchRoot(self, state, children, depth):
+        bestMove = None
+        alpha = -INFINITY
+        for move, child in children:
+            try:
+                score = self.scoreChild(state, move, child, depth - 1, alpha, INFINITY)
+            except SearchTimeout:
+                raise SearchTimeout(bestMove) if bestMove != None else SearchTimeout()
+            if bestMove == None or score > alpha:
+                bestMove = move
+                alpha = score
+        return (bestMove, alpha)
+
+    ##
+    #negamax
+    #Description: Scores a state for the player whose turn it is by searching
+    #   the moves from it, skipping any that can't change the result
+    #
+    #Parameters:
+    #   state - The state to score (GameState)
+    #   depth - How many more moves to search (int)
+    #   alpha - The score the player to move is already sure of (float)
+    #   beta - The score the other player will not allow more than (float)
+    #
+    #Return: The score of the state for the player whose turn it is
+    ##
+    def negamax(self, state, depth, alpha, beta):
+        self.nodeCount += 1
+        if time.time() > self.deadline:
+            raise SearchTimeout()
+
+        #use what an earlier search of this state found out
+        alphaBefore = alpha
+        entry = None
+        if self.table != None:
+            entry = self.table.lookup(state.getHash())
+            if entry != None and entry[ENTRY_DEPTH] >= depth:
+                score = entry[ENTRY_SCORE]
+                if entry[ENTRY_BOUND] == EXACT:
+                    return score
+                elif entry[ENTRY_BOUND] == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        if depth == 0 or (self.isOver != None and self.isOver(state)):
+            score = self.evaluate(state, state.whoseTurn)
+            if self.table != None:
+                self.table.store(state.getHash(), depth, score, EXACT, None)
+            return score
+
+        moves = self.listMoves(state)
+        #ordering only pays off when there is something to prune below
+        if depth >= 2:
+            children = self.orderChildren(state, moves)
+        else:
+            children = [(move, self.makeChild(state, move)) for move in moves]
+        #the best move last time is the most likely to be best again
+        if entry != None and entry[ENTRY_MOVE] != None:
+            for i in xrange(0, len(children)):
+                if sameMove(children[i][0], entry[ENTRY_MOVE]):
+                    children.insert(0, children.pop(i))
+                    break
+
+        best = -INFINITY
+        bestMove = None
+        if depth == 1 and self.evaluateBatch != None:
+            #the children are all leaves, so score them together
+            scores = self.evaluateChildren(state, children)
+            for i in xrange(0, len(children)):
+                if scores[i] > best:
+                    best = scores[i]
+                    bestMove = children[i][0]
+            self.nodeCount += len(children)
+        else:
+            for move, child in children:
+                score = self.scoreChild(state, move, child, depth - 1, alpha, beta)
+                if score > best:
+                    best = score
+                    bestMove = move
+                    if best > alpha:
+                        alpha = best
+                        if alpha >= beta:
+                            break
+
+        if self.table != None:
+            if best <= alphaBefore:
+                bound = UPPER_BOUND
+            elif best >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.table.store(state.getHash(), depth, best, bound, bestMove)
+        return best
+
+    ##
+    #makeChild
+    #Description: Returns the state a move leads to, or None when moves are
+    #   made in place (the move is then made when the child is searched)
+    ##
+    def makeChild(self, state, move):
+        if self.applyMove != None:
+            return None
+        return self.getChild(state, move)
+
+    ##
+    #scoreChild
+    #Description: Scores the child that a move leads to for the player whose
+    #   turn it is in the parent, which is only the child's player to move if
+    #   the move didn't end the turn
+    #
+    #Parameters:
+    #   state - The parent state (GameState)
+    #   move - The move that leads to the child (Move)
+    #   child - The child state, or None to make the move in place
+    #   depth, alpha, beta - As for negamax, from the parent's point of view
+    #
+    #Return: The score of child for the parent's player to move
+    ##
+    def scoreChild(self, state, move, child, depth, alpha, beta):
+        player = state.whoseTurn
+        record = None
+        if child == None:
+            record = self.applyMove(state, move)
+            child = state
+        if child.whoseTurn == player:
+            score = self.negamax(child, depth, alpha, beta)
+        else:
+            score = -self.negamax(child, depth, -beta, -alpha)
+        if record != None:
+            self.undoMove(state, record)
+        return score
+
+    ##
+    #orderChildren
+    #Description: Makes the children of a state and sorts them by how good
+    #   they look for the player to move, so the search prunes more
+    #
+    #Parameters:
+    #   state - The parent state (GameState)
+    #   moves - The moves to make from state (Move[])
+    #
+    #Return: A list of (Move, child) tuples, best first.  The child is the
+    #   state the move leads to, or None when moves are made in place.
+    ##
+    def orderChildren(self, state, moves):
+        children = [(move, self.makeChild(state, move)) for move in moves]
+        scores = self.evaluateChildren(state, children)
+        #sort on the score only (and stably) so ties keep the listed order
+        order = sorted(xrange(0, len(children)), key=lambda i: scores[i], reverse=True)
+        return [children[i] for i in order]
+
+    ##
+    #evaluateChildren
+    #Description: Evaluates the children of a state for the player whose
+    #   turn it is in the parent, with evaluateBatch if there is one
+    #
+    #Parameters:
+    #   state - The parent state (GameState)
+    #   children - (Move, child) tuples as made by makeChild
+    #
+    #Return: The score of each child (float[])
+    ##
+    def evaluateChildren(self, state, children):
+        player = state.whoseTurn
+        results = []
+        if self.evaluateBatch != None:
+            #the children are packed by updating copies of the parent
+            packedState = PackedState(state)
+        for move, child in children:
+            record = None
+            if child == None:
+                record = self.applyMove(state, move)
+                child = state
+            if self.evaluateBatch != None:
+                packedChild = packedState.clone()
+                packedChild.update(child)
+                results.append(packedChild)
+            else:
+                results.append(self.evaluate(child, player))
+            if record != None:
+                self.undoMove(state, record)
+        if self.evaluateBatch != None:
+            results = self.evaluateBatch(results, player)
+        return results
+
+##
+#sameMove
+#Description: Checks whether two Moves do the same thing.  Whole turns (see
+#   TurnGenerator) are compared move by move.
+#
+#Parameters:
+#   move1 - A Move or a list of them (Move)
+#   move2 - Another Move or list of them (Move)
+#
+#Return: True if the moves are the same
+##
+def sameMove(move1, move2):
+    if type(move1) is list or type(move2) is list:
+        if type(move1) is not list or type(move2) is not list or len(move1) != len(move2):
+            return False
+        for turnMove1, turnMove2 in zip(move1, move2):
+            if not sameMove(turnMove1, turnMove2):
+                return False
+        return True
+    if move1.moveType != move2.moveType or move1.buildType != move2.buildType:
+        return False
+    if move1.coordList == None or move2.coordList == None:
+        return move1.coordList == move2.coordList
+    if len(move1.coordList) != len(move2.coordList):
+        return False
+    for coord1, coord2 in zip(move1.coordList, move2.coordList):
+        if tuple(coord1) != tuple(coord2):
+            return False
+    return True
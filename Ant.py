@@ -25,8 +25,13 @@ UNIT_STATS.append((1, 2, 1, 3, 2)) #Ranged soldier
 #   hasMoved - A boolean representing if the ant has moved yet this turn
 #   carrying - A boolean representing if the Ant's carrying food or not.
 #   player - The id of the player that owns the Ant
+#   health - The number of hits the Ant can take before it dies
 ##
 class Ant(object):
+
+    #Ants are made by the thousand during a search, so they keep their
+    #attributes in slots rather than a dict
+    __slots__ = ('coords', 'type', 'hasMoved', 'carrying', 'player', 'health')
     
     ##
     #__init__
@@ -45,8 +50,16 @@ class Ant(object):
         self.player = inputPlayer
         self.health = UNIT_STATS[self.type][HEALTH]
 
+    ##
+    #clone
+    #Description: Returns a copy of this Ant.  The attributes are copied
+    #   directly instead of going through __init__.
+    ##
     def clone(self):
-        rtnAnt = Ant(self.coords, self.type, self.player)
+        rtnAnt = Ant.__new__(Ant)
+        rtnAnt.coords = self.coords
+        rtnAnt.type = self.type
+        rtnAnt.player = self.player
         rtnAnt.hasMoved = self.hasMoved
         rtnAnt.carrying = self.carrying
         rtnAnt.health = self.health
@@ -0,0 +1,426 @@
+import os, sys, gc, json, time, random, platform
+from Constants import *
+from Ant import UNIT_STATS
+from Player import Player
+from PackedState import PackedState
+from GameEngine import GameEngine
+from AIPlayerUtils import listAllLegalMoves, listAllMovementPaths, listAllBuildMoves, stepsToReach, \
+    getConstrList
+
+#
+# Benchmark.py
+#
+# Times the code that AI players lean on (move generation, cloning, state
+# lookups and a whole getMove) over a fixed corpus of game states, and
+# writes the results as JSON so the runs before and after a change can be
+# compared.  Usage:
+#     python Benchmark.py [-o <results.json>] [-c <baseline.json>] [-r <repeat>] [<benchmark> ...]
+#     python Benchmark.py --make-corpus
+#
+# The corpus is kept in BenchmarkCorpus.txt so that it stays the same when
+# the game code changes.  --make-corpus makes it again by playing seeded
+# games and picking states from early, middle and late in each game.  One
+# side plays randomly.  The other is BENCHMARK_AI on a short time limit,
+# which gathers the food the random AI never does and spends it on tunnels
+# whenever it can, so the corpus has a range of ant and tunnel counts.
+#
+
+#Where the corpus is kept
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "BenchmarkCorpus.txt")
+
+#The games the corpus is taken from
+CORPUS_SEEDS = range(0, 8)
+
+#The stages of a game the corpus takes states from, as the number of moves
+#made so far
+CORPUS_STAGES = (("early", 10), ("mid", 50), ("late", 110))
+
+#How long BENCHMARK_AI searches for in the corpus games, in seconds
+CORPUS_SEARCH_TIME = 0.05
+
+#The shortest time to run an operation for in one sample, in seconds.  Fast
+#operations are run many times per sample so the clock can time them.
+MIN_SAMPLE_TIME = 0.001
+
+#The number of times each operation is sampled by default
+DEFAULT_REPEAT = 3
+
+#The number of times each operation is called before it is timed, so
+#caches it fills on its first call (such as distance tables) aren't timed
+WARM_UP_CALLS = 2
+
+#The number of calls the allocations of an operation are counted over
+ALLOCATION_CALLS = 10
+
+#The AI whose getMove is timed
+BENCHMARK_AI = "studentAIPlayer"
+
+##
+#CorpusPlayer
+#Description: A player that makes the moves of another player and keeps
+#   the states it was asked to move in at the stages of CORPUS_STAGES
+#
+#Variables:
+#   player - The player that makes the moves (Player)
+#   states - The (name, PackedState) pairs kept so far, shared by both
+#       players of a game
+#   counter - The number of moves made so far in the game, shared by both
+#       players as a one item list
+#   prefix - The start of the names of the states kept
+#   buildsTunnels - Whether to build a tunnel whenever the player can
+##
+class CorpusPlayer(Player):
+
+    def __init__(self, player, states, counter, prefix, buildsTunnels=False):
+        super(CorpusPlayer, self).__init__(player.playerId, player.author)
+        self.player = player
+        self.states = states
+        self.counter = counter
+        self.prefix = prefix
+        self.buildsTunnels = buildsTunnels
+
+    def getPlacement(self, currentState):
+        return self.player.getPlacement(currentState)
+
+    def getMove(self, currentState):
+        for stage, moves in CORPUS_STAGES:
+            if self.counter[0] == moves:
+                self.states.append(("%s-%s" % (self.prefix, stage), PackedState(currentState)))
+        self.counter[0] += 1
+        if self.buildsTunnels:
+            for move in listAllBuildMoves(currentState):
+                if move.buildType == TUNNEL:
+                    return move
+        return self.player.getMove(currentState)
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.player.getAttack(currentState, attackingAnt, enemyLocations)
+
+##
+#makeCorpus
+#Description: Plays seeded games and keeps states from each stage of each
+#   game (see the top of this file)
+#
+#Return: The corpus as (name, PackedState) pairs
+##
+def makeCorpus():
+    module = loadBenchmarkAI()
+    #the random AI, which is in the AI directory too
+    import AIPlayer
+    searchTime = module.SEARCH_TIME_LIMIT
+    module.SEARCH_TIME_LIMIT = CORPUS_SEARCH_TIME
+    corpus = []
+    try:
+        for seed in CORPUS_SEEDS:
+            random.seed(seed)
+            counter = [0]
+            prefix = "seed%d" % seed
+            #the AI takes turns going first
+            builder = seed % 2
+            players = [None, None]
+            players[builder] = CorpusPlayer(module.AIPlayer(builder), corpus, counter, prefix, True)
+            players[1 - builder] = CorpusPlayer(AIPlayer.AIPlayer(1 - builder), corpus, counter, prefix)
+            GameEngine(False).play(players[0], players[1], CORPUS_STAGES[-1][1] + 1)
+    finally:
+        module.SEARCH_TIME_LIMIT = searchTime
+    return corpus
+
+##
+#saveCorpus / loadCorpus
+#Description: Write and read the corpus file, which has one state per line:
+#   its name and its packed bytes in hex
+##
+def saveCorpus(corpus, path=CORPUS_FILE):
+    with open(path, "w") as corpusFile:
+        for name, packedState in corpus:
+            corpusFile.write("%s %s\n" % (name, str(packedState.data).encode("hex")))
+
+def loadCorpus(path=CORPUS_FILE):
+    corpus = []
+    with open(path) as corpusFile:
+        for line in corpusFile:
+            name, data = line.split()
+            corpus.append((name, PackedState(data=bytearray(data.decode("hex")))))
+    return corpus
+
+##
+#The benchmarks.  Each is a function (state) -> callable[] that returns the
+#operations to time in a state: functions that take no arguments and do
+#one call each.
+##
+
+def listAllLegalMovesOps(state):
+    return [lambda: listAllLegalMoves(state)]
+
+def listAllMovementPathsOps(state):
+    return [(lambda ant=ant: listAllMovementPaths(state, ant.coords, UNIT_STATS[ant.type][MOVEMENT]))
+            for ant in state.inventories[state.whoseTurn].ants]
+
+def stepsToReachOps(state):
+    #from each of the player's ants to each food and building
+    goals = [constr.coords for constr in getConstrList(state, None, (ANTHILL, TUNNEL, FOOD))]
+    return [(lambda src=ant.coords, dst=dst: stepsToReach(state, src, dst))
+            for ant in state.inventories[state.whoseTurn].ants for dst in goals]
+
+def cloneOps(state):
+    return [state.clone]
+
+def fastcloneOps(state):
+    return [state.fastclone]
+
+def getAntAtOps(state):
+    #an indexed copy, as searches use
+    state = state.fastclone()
+    state.buildIndex()
+    #the cells of the ants and a few that are usually empty
+    cells = [ant.coords for inventory in state.inventories for ant in inventory.ants]
+    cells += [(0, 0), (BOARD_LENGTH / 2, BOARD_LENGTH / 2), (BOARD_LENGTH - 1, BOARD_LENGTH - 1)]
+    return [(lambda coords=coords: state.getAntAt(coords)) for coords in cells]
+
+def getMoveOps(state):
+    module = loadBenchmarkAI()
+    #the player is made once, as it is for a game, so loading its opening
+    #book and allocating its tables isn't timed
+    player = module.AIPlayer(state.whoseTurn)
+    return [lambda: player.getMove(state)]
+
+##
+#loadBenchmarkAI
+#Description: Imports the module of BENCHMARK_AI from the AI directory
+#
+#Return: The module
+##
+def loadBenchmarkAI():
+    if BENCHMARK_AI not in sys.modules:
+        if "AI" not in sys.path:
+            sys.path.insert(0, "AI")
+        __import__(BENCHMARK_AI)
+    return sys.modules[BENCHMARK_AI]
+
+BENCHMARKS = [
+    ("listAllLegalMoves", listAllLegalMovesOps),
+    ("listAllMovementPaths", listAllMovementPathsOps),
+    ("stepsToReach", stepsToReachOps),
+    ("clone", cloneOps),
+    ("fastclone", fastcloneOps),
+    ("getAntAt", getAntAtOps),
+    ("getMove", getMoveOps),
+]
+
+##
+#timeOperation
+#Description: Times an operation, calling it as many times per sample as
+#   it takes to fill MIN_SAMPLE_TIME, after WARM_UP_CALLS calls that aren't
+#   timed
+#
+#Parameters:
+#   operation - The operation (callable)
+#   repeat - The number of samples to take (int)
+#
+#Return: A tuple of (the time per call of each sample in seconds, the
+#   number of calls made)
+##
+def timeOperation(operation, repeat):
+    for i in xrange(0, WARM_UP_CALLS):
+        operation()
+    number = 1
+    while True:
+        start = time.time()
+        for i in xrange(0, number):
+            operation()
+        elapsed = time.time() - start
+        if elapsed >= MIN_SAMPLE_TIME:
+            break
+        number *= 2
+
+    samples = [elapsed / number]
+    for sample in xrange(1, repeat):
+        start = time.time()
+        for i in xrange(0, number):
+            operation()
+        samples.append((time.time() - start) / number)
+    return (samples, number * repeat)
+
+##
+#countAllocations
+#Description: Counts the objects an operation leaves allocated, including
+#   what it returns.  Python 2 has no tracemalloc, so this counts the objects
+#   the garbage collector tracks (lists, dicts, class instances and so on)
+#   with the collector turned off.  Objects the operation makes and frees
+#   again are not counted.
+#
+#Parameters:
+#   operation - The operation (callable)
+#
+#Return: The objects allocated per call (float)
+##
+def countAllocations(operation):
+    results = [None] * ALLOCATION_CALLS
+    enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        before = gc.get_count()[0]
+        for i in xrange(0, ALLOCATION_CALLS):
+            results[i] = operation()
+        after = gc.get_count()[0]
+    finally:
+        if enabled:
+            gc.enable()
+    return float(after - before) / ALLOCATION_CALLS
+
+##
+#percentile
+#Description: Returns a percentile of some sorted numbers
+#
+#Parameters:
+#   values - The numbers, sorted (float[])
+#   fraction - Which percentile, from 0 to 1 (float)
+#
+#Return: The percentile (float)
+##
+def percentile(values, fraction):
+    index = min(int(fraction * len(values)), len(values) - 1)
+    return values[index]
+
+##
+#runBenchmark
+#Description: Times the operations of a benchmark in every state of the corpus
+#
+#Parameters:
+#   makeOps - The benchmark ((GameState) -> callable[])
+#   states - The states of the corpus (GameState[])
+#   repeat - The number of samples to take of each operation (int)
+#
+#Return: The results (dict).  The times are per call, averaged over each
+#   sample, and the percentiles are of the samples.  The operations per
+#   second are those of the median sample, as the mean would be swamped
+#   by the slowest operations.
+##
+def runBenchmark(makeOps, states, repeat):
+    samples = []
+    calls = 0
+    allocations = []
+    for state in states:
+        for operation in makeOps(state):
+            opSamples, opCalls = timeOperation(operation, repeat)
+            samples.extend(opSamples)
+            calls += opCalls
+            allocations.append(countAllocations(operation))
+    if len(samples) == 0:
+        return {"calls": 0}
+
+    #every operation counts the same, however many times it was called
+    samples.sort()
+    return {
+        "calls": calls,
+        "opsPerSec": 1.0 / percentile(samples, 0.5),
+        "meanUs": 1e6 * sum(samples) / len(samples),
+        "p50Us": 1e6 * percentile(samples, 0.5),
+        "p90Us": 1e6 * percentile(samples, 0.9),
+        "p99Us": 1e6 * percentile(samples, 0.99),
+        "allocations": sum(allocations) / len(allocations),
+    }
+
+##
+#runBenchmarks
+#Description: Runs benchmarks over the corpus
+#
+#Parameters:
+#   names - The names of the benchmarks to run, or None for all (str[])
+#   repeat - The number of samples to take of each operation (int)
+#
+#Return: The results, ready to be written as JSON (dict)
+##
+def runBenchmarks(names=None, repeat=DEFAULT_REPEAT):
+    corpus = loadCorpus()
+    states = [packedState.toGameState() for name, packedState in corpus]
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "repeat": repeat,
+        "corpus": [{"name": name,
+                    "ants": len(state.inventories[PLAYER_ONE].ants) + len(state.inventories[PLAYER_TWO].ants),
+                    "tunnels": len(getConstrList(state, None, (TUNNEL,)))}
+                   for (name, packedState), state in zip(corpus, states)],
+        "benchmarks": {},
+    }
+    for name, makeOps in BENCHMARKS:
+        if names and name not in names:
+            continue
+        sys.stderr.write("%s...\n" % name)
+        #each benchmark starts from fresh states, with no lookup indexes or
+        #distance tables left over from the ones before
+        freshStates = [packedState.toGameState() for corpusName, packedState in corpus]
+        results["benchmarks"][name] = runBenchmark(makeOps, freshStates, repeat)
+    return results
+
+##
+#printResults
+#Description: Prints a table of benchmark results, next to earlier results
+#   if there are any
+#
+#Parameters:
+#   results - The results (dict)
+#   baseline - Earlier results to compare with, or None (dict)
+##
+def printResults(results, baseline=None):
+    print "%-22s %12s %10s %10s %10s %8s %10s" % \
+        ("Benchmark", "Ops/sec", "p50 us", "p90 us", "p99 us", "Allocs", "Speedup")
+    for name, makeOps in BENCHMARKS:
+        if name not in results["benchmarks"] or results["benchmarks"][name]["calls"] == 0:
+            continue
+        result = results["benchmarks"][name]
+        speedup = ""
+        if baseline != None and name in baseline["benchmarks"] and \
+           baseline["benchmarks"][name].get("opsPerSec"):
+            speedup = "%.2fx" % (result["opsPerSec"] / baseline["benchmarks"][name]["opsPerSec"])
+        print "%-22s %12.1f %10.1f %10.1f %10.1f %8.1f %10s" % \
+            (name, result["opsPerSec"], result["p50Us"], result["p90Us"], result["p99Us"],
+             result["allocations"], speedup)
+
+##
+#main
+#Description: Runs the benchmarks from the command line (see the top of
+#   this file)
+##
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the game code AIs use.")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("-o", "--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("-c", "--compare", default=None, help="compare with results in this JSON file")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="samples to take of each operation")
+    parser.add_argument("--make-corpus", action="store_true",
+                        help="make the corpus of states again and exit")
+    args = parser.parse_args(argv)
+
+    if args.make_corpus:
+        corpus = makeCorpus()
+        saveCorpus(corpus)
+        print "Saved %d states to %s" % (len(corpus), CORPUS_FILE)
+        return 0
+
+    for name in args.benchmarks:
+        if name not in [benchmark[0] for benchmark in BENCHMARKS]:
+            print "ERROR:  no benchmark named '" + name + "'."
+            print "Please specify one of the following:"
+            for benchmark in BENCHMARKS:
+                print "    " + benchmark[0]
+            return 1
+
+    results = runBenchmarks(args.benchmarks, args.repeat)
+    if args.output != None:
+        with open(args.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=2, sort_keys=True)
+    baseline = None
+    if args.compare != None:
+        with open(args.compare) as baselineFile:
+            baseline = json.load(baselineFile)
+    printResults(results, baseline)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
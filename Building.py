@@ -14,6 +14,8 @@ from Constants import *
 ##
 class Building(Construction):
 
+    __slots__ = ('player', 'captureHealth')
+
     ##
     #__init__
     #Description: Creates a new Building
@@ -27,5 +29,16 @@ class Building(Construction):
         self.player = inputPlayer
         self.captureHealth = CONSTR_STATS[inputType][CAP_HEALTH]
     
+    ##
+    #clone
+    #Description: Returns a copy of this Building, including any damage
+    #   done to its captureHealth
+    ##
     def clone(self):
-        return Building(self.coords, self.type, self.player)
+        rtnBuilding = Building.__new__(Building)
+        rtnBuilding.coords = self.coords
+        rtnBuilding.type = self.type
+        rtnBuilding.movementCost = self.movementCost
+        rtnBuilding.player = self.player
+        rtnBuilding.captureHealth = self.captureHealth
+        return rtnBuilding
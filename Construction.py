@@ -22,6 +22,8 @@ CONSTR_STATS.append((1,None,None)) #Food
 ##
 class Construction(object):
 
+    __slots__ = ('coords', 'type', 'movementCost')
+
     ##
     #__init__
     #Description: Creates a new Construction. Only ever called by subclasses.
@@ -35,5 +37,14 @@ class Construction(object):
         self.type = inputType
         self.movementCost = CONSTR_STATS[inputType][MOVE_COST]
     
+    ##
+    #clone
+    #Description: Returns a copy of this Construction without going
+    #   through __init__
+    ##
     def clone(self):
-        return Construction(self.coords, self.type)
\ No newline at end of file
+        rtnConstr = Construction.__new__(Construction)
+        rtnConstr.coords = self.coords
+        rtnConstr.type = self.type
+        rtnConstr.movementCost = self.movementCost
+        return rtnConstr
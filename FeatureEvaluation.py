@@ -0,0 +1,432 @@
+from Constants import *
+from Construction import Construction
+from Ant import Ant
+
+#
+# FeatureEvaluation.py
+#
+# Scores states as a weighted sum of features.  An AI registers its features
+# and their weights with a FeatureEvaluation.  A feature's value for a player
+# comes from adding up what each of the player's ants and constructions and
+# its food count contribute to it, so when one ant changes only that ant's
+# part needs working out again.
+#
+# The totals are kept on the state (see GameState.featureValues) and follow
+# it through the same hooks that keep its hash up to date: GameState.hashAnt
+# and friends, which are called before and after every change, and undoMove,
+# which takes the changes back.  Scoring a state after a move therefore costs
+# about as much as the ants that the move changed.
+#
+
+##
+#overrides
+#Description: Checks whether a feature overrides one of Feature's methods
+#
+#Parameters:
+#   feature - The feature (Feature)
+#   methodName - The name of the method (string)
+#
+#Return: True if the feature's class has its own version of the method
+##
+def overrides(feature, methodName):
+    return getattr(type(feature), methodName).im_func is not getattr(Feature, methodName).im_func
+
+##
+#Feature
+#Description: One term of a FeatureEvaluation.  Subclasses override the
+#   methods for the things the feature depends on; the others contribute
+#   nothing and are never called.  The contributions must only depend on the
+#   thing they are given, or on things that don't change during a search.
+#
+#Variables:
+#   name - A short name for the feature (string)
+##
+class Feature(object):
+
+    ##
+    #__init__
+    #Description: Creates a new Feature
+    #
+    #Parameters:
+    #   name - A short name for the feature (string)
+    ##
+    def __init__(self, name):
+        self.name = name
+
+    ##
+    #antValue
+    #Description: Returns what an ant adds to its owner's total
+    #
+    #Parameters:
+    #   ant - The ant (Ant)
+    ##
+    def antValue(self, ant):
+        return 0
+
+    ##
+    #constrValue
+    #Description: Returns what a construction adds to its owner's total.
+    #   Grass and food add to NEUTRAL's total.
+    #
+    #Parameters:
+    #   constr - The construction (Construction)
+    ##
+    def constrValue(self, constr):
+        return 0
+
+    ##
+    #foodValue
+    #Description: Returns what a player's food count adds to its total
+    #
+    #Parameters:
+    #   foodCount - The player's food count (int)
+    ##
+    def foodValue(self, foodCount):
+        return 0
+
+    ##
+    #finish
+    #Description: Turns a player's total into the feature's value, for
+    #   features that aren't just a sum (such as "has exactly one worker")
+    #
+    #Parameters:
+    #   total - The sum of the player's contributions
+    #
+    #Return: The value of the feature for the player
+    ##
+    def finish(self, total):
+        return total
+
+##
+#FeatureEvaluation
+#Description: A set of weighted features that scores states for a player.
+#   What an ant, construction or food count contributes is worked out once
+#   for each way it can be (type, owner, coords, ...) and cached, with the
+#   weighted features that are plain sums folded into a single number.
+#
+#Variables:
+#   features - The registered features (Feature[])
+#   weights - The weight of each feature (float[])
+#   antFeatures, constrFeatures, foodFeatures - The indexes of the features
+#       that ants, constructions and food counts contribute to (int[])
+#   finishedFeatures - The indexes of the features that override finish,
+#       which have to be totalled separately (int[])
+#   antCache, constrCache, foodCache - The contributions worked out so far
+#       (see getContribution)
+#   version - Goes up whenever the features change their minds, which makes
+#       the totals kept on states out of date (see invalidate)
+##
+class FeatureEvaluation(object):
+
+    ##
+    #__init__
+    #Description: Creates a new FeatureEvaluation with no features
+    ##
+    def __init__(self):
+        self.features = []
+        self.weights = []
+        self.antFeatures = []
+        self.constrFeatures = []
+        self.foodFeatures = []
+        self.finishedFeatures = []
+        self.version = 0
+        self.invalidate()
+
+    ##
+    #addFeature
+    #Description: Registers a feature
+    #
+    #Parameters:
+    #   feature - The feature (Feature)
+    #   weight - What the feature's value is multiplied by in a score (float)
+    ##
+    def addFeature(self, feature, weight):
+        index = len(self.features)
+        self.features.append(feature)
+        self.weights.append(weight)
+        if overrides(feature, "antValue"):
+            self.antFeatures.append(index)
+        if overrides(feature, "constrValue"):
+            self.constrFeatures.append(index)
+        if overrides(feature, "foodValue"):
+            self.foodFeatures.append(index)
+        if overrides(feature, "finish"):
+            self.finishedFeatures.append(index)
+        self.invalidate()
+
+    ##
+    #invalidate
+    #Description: Forgets the cached contributions and makes every state work
+    #   its totals out again the next time it is scored.  Call it when the
+    #   features' contributions change, such as when the goals they measure
+    #   against move.
+    ##
+    def invalidate(self):
+        self.version += 1
+        self.antCache = {}
+        self.constrCache = {}
+        self.foodCache = {}
+
+    ##
+    #getContribution
+    #Description: Works out what something contributes to its owner's totals
+    #
+    #Parameters:
+    #   thing - The ant, construction or food count
+    #   indexes - The indexes of the features it contributes to (int[])
+    #   method - The name of the Feature method that works it out (string)
+    #
+    #Return: A tuple of (the weighted sum of the plain features, the values
+    #   of the finishedFeatures or None if they are all 0, indexes, the value
+    #   of each feature in indexes)
+    ##
+    def getContribution(self, thing, indexes, method):
+        values = [getattr(self.features[index], method)(thing) for index in indexes]
+        linear = 0
+        finished = [0] * len(self.finishedFeatures)
+        for index, value in zip(indexes, values):
+            if index in self.finishedFeatures:
+                finished[self.finishedFeatures.index(index)] = value
+            else:
+                linear += self.weights[index] * value
+        if not any(finished):
+            finished = None
+        return (linear, finished, indexes, values)
+
+    ##
+    #getAntPart / getConstrPart / getFoodPart
+    #Description: Return what an ant, a construction or a food count
+    #   contributes, from the cache if it has been worked out before
+    #
+    #Return: The contribution (see getContribution)
+    ##
+    def getAntPart(self, ant):
+        key = (ant.type, ant.player, tuple(ant.coords), ant.carrying, ant.hasMoved, ant.health)
+        contribution = self.antCache.get(key)
+        if contribution == None:
+            contribution = self.getContribution(ant, self.antFeatures, "antValue")
+            self.antCache[key] = contribution
+        return contribution
+
+    def getConstrPart(self, constr, owner):
+        captureHealth = None
+        if owner != NEUTRAL:
+            captureHealth = constr.captureHealth
+        key = (constr.type, owner, tuple(constr.coords), captureHealth)
+        contribution = self.constrCache.get(key)
+        if contribution == None:
+            contribution = self.getContribution(constr, self.constrFeatures, "constrValue")
+            self.constrCache[key] = contribution
+        return contribution
+
+    def getFoodPart(self, foodCount):
+        contribution = self.foodCache.get(foodCount)
+        if contribution == None:
+            contribution = self.getContribution(foodCount, self.foodFeatures, "foodValue")
+            self.foodCache[foodCount] = contribution
+        return contribution
+
+    ##
+    #getValues
+    #Description: Returns the up to date feature totals of a state, working
+    #   them out and keeping them on the state if it doesn't have any
+    #
+    #Parameters:
+    #   state - The state (GameState)
+    #
+    #Return: The state's FeatureValues
+    ##
+    def getValues(self, state):
+        values = state.featureValues
+        if values == None or values.evaluation is not self or values.version != self.version:
+            values = FeatureValues(self, state)
+            state.featureValues = values
+        else:
+            values.update(state)
+        return values
+
+    ##
+    #score
+    #Description: Scores a state for a player
+    #
+    #Parameters:
+    #   state - The state to score (GameState)
+    #   playerId - The player to score it for (int)
+    #
+    #Return: The weighted sum of the features' values for the player
+    ##
+    def score(self, state, playerId):
+        return self.getValues(state).score(playerId)
+
+##
+#FeatureValues
+#Description: The totals of a FeatureEvaluation's features for one state.
+#   Ants and constructions are toggled in and out of the totals as they
+#   change, but the toggles are only counted until the state is scored, and
+#   only then is what changed worked out again.  Moves that are taken back
+#   before the state is scored therefore cost next to nothing.
+#
+#Variables:
+#   evaluation - The FeatureEvaluation the totals are for
+#   version - The evaluation's version when the totals were worked out
+#   linear - The weighted sum of the plain features, by owner (PLAYER_ONE,
+#       PLAYER_TWO, NEUTRAL)
+#   totals - The totals of the finishedFeatures, by owner
+#   parts - What each ant and construction in the totals contributed, as
+#       (owner, contribution)
+#   foodParts - What each player's food count contributed
+#   toggled - The ants and constructions toggled since the last update, and
+#       whether they were toggled an odd number of times (1) or not (0)
+#   foodChanged - Whether a food count changed since the last update
+##
+class FeatureValues(object):
+
+    ##
+    #__init__
+    #Description: Works out the totals of a state from scratch
+    #
+    #Parameters:
+    #   evaluation - The FeatureEvaluation (FeatureEvaluation)
+    #   state - The state (GameState)
+    ##
+    def __init__(self, evaluation, state):
+        self.evaluation = evaluation
+        self.version = evaluation.version
+        numFinished = len(evaluation.finishedFeatures)
+        self.linear = [0, 0, 0]
+        self.totals = [[0] * numFinished, [0] * numFinished, [0] * numFinished]
+        self.parts = {}
+        self.foodParts = [None, None]
+        self.toggled = {}
+        for inv in state.inventories:
+            for ant in inv.ants:
+                self.toggled[ant] = 1
+            for constr in inv.constrs:
+                self.toggled[constr] = 1
+        self.foodChanged = True
+        self.update(state)
+
+    ##
+    #toggleAnt
+    #Description: Toggles an ant in or out of the totals.  Call it before and
+    #   after changing an ant, after adding one and before removing one.
+    #
+    #Parameters:
+    #   ant - The ant (Ant)
+    ##
+    def toggleAnt(self, ant):
+        self.toggled[ant] = self.toggled.get(ant, 0) ^ 1
+
+    ##
+    #toggleConstr
+    #Description: Like toggleAnt, for a construction
+    #
+    #Parameters:
+    #   constr - The construction (Construction)
+    ##
+    def toggleConstr(self, constr):
+        self.toggled[constr] = self.toggled.get(constr, 0) ^ 1
+
+    ##
+    #toggleFood
+    #Description: Notes that a player's food count is about to change or
+    #   just has
+    #
+    #Parameters:
+    #   playerId - The player (int)
+    ##
+    def toggleFood(self, playerId):
+        self.foodChanged = True
+
+    ##
+    #add
+    #Description: Adds a contribution to, or takes it from, an owner's totals
+    #
+    #Parameters:
+    #   owner - Whose totals to change (int)
+    #   contribution - The contribution (see FeatureEvaluation.getContribution)
+    #   sign - 1 to add it, -1 to take it away (int)
+    ##
+    def add(self, owner, contribution, sign):
+        self.linear[owner] += sign * contribution[0]
+        if contribution[1] != None:
+            totals = self.totals[owner]
+            for position, value in enumerate(contribution[1]):
+                totals[position] += sign * value
+
+    ##
+    #update
+    #Description: Works the toggled ants and constructions and the food
+    #   counts out again.  Something that was in the totals is still in the
+    #   state if it was toggled an even number of times, and something that
+    #   wasn't is in the state now if it was toggled an odd number of times.
+    #
+    #Parameters:
+    #   state - The state the totals are for (GameState)
+    ##
+    def update(self, state):
+        evaluation = self.evaluation
+        for thing, odd in self.toggled.iteritems():
+            part = self.parts.pop(thing, None)
+            if part != None:
+                self.add(part[0], part[1], -1)
+            if (part != None) == (odd == 0):
+                if type(thing) is Ant:
+                    owner = thing.player
+                    contribution = evaluation.getAntPart(thing)
+                else:
+                    #grass and food are plain Constructions, which nobody owns
+                    owner = NEUTRAL
+                    if type(thing) is not Construction:
+                        owner = thing.player
+                    contribution = evaluation.getConstrPart(thing, owner)
+                self.add(owner, contribution, 1)
+                self.parts[thing] = (owner, contribution)
+        self.toggled.clear()
+
+        if self.foodChanged:
+            for playerId in (PLAYER_ONE, PLAYER_TWO):
+                if self.foodParts[playerId] != None:
+                    self.add(playerId, self.foodParts[playerId], -1)
+                self.foodParts[playerId] = evaluation.getFoodPart(state.inventories[playerId].foodCount)
+                self.add(playerId, self.foodParts[playerId], 1)
+            self.foodChanged = False
+
+    ##
+    #getValue
+    #Description: Returns the value of one feature for a player.  Only the
+    #   finishedFeatures are totalled separately, so this adds the others up
+    #   from the parts, which makes it for debugging rather than searching.
+    #
+    #Parameters:
+    #   playerId - The player (int)
+    #   index - The index of the feature (int)
+    ##
+    def getValue(self, playerId, index):
+        feature = self.evaluation.features[index]
+        if index in self.evaluation.finishedFeatures:
+            position = self.evaluation.finishedFeatures.index(index)
+            return feature.finish(self.totals[playerId][position])
+        contributions = [part[1] for part in self.parts.itervalues() if part[0] == playerId]
+        if playerId != NEUTRAL:
+            contributions.append(self.foodParts[playerId])
+        total = 0
+        for linear, finished, indexes, values in contributions:
+            if index in indexes:
+                total += values[indexes.index(index)]
+        return total
+
+    ##
+    #score
+    #Description: Returns the weighted sum of the features for a player
+    #
+    #Parameters:
+    #   playerId - The player (int)
+    ##
+    def score(self, playerId):
+        evaluation = self.evaluation
+        result = self.linear[playerId]
+        totals = self.totals[playerId]
+        for position, index in enumerate(evaluation.finishedFeatures):
+            result += evaluation.weights[index] * evaluation.features[index].finish(totals[position])
+        return result
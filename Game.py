@@ -1,5 +1,6 @@
 import os, re, sys, math, multiprocessing, time, random
 import HumanPlayer
+import Tournament
 from UserInterface import *
 from Construction import *
 from Constants import *
@@ -9,12 +10,20 @@ from Building import *
 from Location import *
 from Ant import *
 from Move import *
+from GameEngine import GameEngine
+from PlayerProcess import PlayerProcess, PlayerTimeoutError
+from Profiler import Profiler
+
+#How often a tournament's workers are polled while the menus are idle, in
+#seconds
+TOURNAMENT_POLL_INTERVAL = 0.1
 
 ##
 #Game
-#Description: Keeps track of game logic and manages the play loop.
+#Description: Keeps track of game logic and manages the play loop.  The
+#   rules themselves are enforced by the GameEngine this class extends.
 ##
-class Game(object):
+class Game(GameEngine):
 
 
     ##
@@ -25,7 +34,8 @@ class Game(object):
     def __init__(self):
         #Initialize the game variables
         self.players = []
-        self.initGame()
+        self.tournament = None
+        super(Game, self).__init__()
         #Initializes the UI variables
         self.ui = UserInterface((865,695))
         self.initUI()
@@ -36,26 +46,45 @@ class Game(object):
         #debug mode allows initial setup in human vs. AI to be automated
         self.debugMode = False
         self.randomSetup = False
+        #where the profile is written after each game and tournament, if
+        #the game is profiled (see processCommandLine)
+        self.profilePath = None
+        #how many moves per second AI vs. AI games are shown at once
+        #continue is clicked, or 0 for as fast as they're made
+        self.watchSpeed = 0
         
     ##
     #processCommandLine
     #
     # parses the command line arguments and configures the game
-    # appropriately.  Currently only "debug" arguments are supported. In this
-    # format: 
-    #            python Game.py debug [<myAIName>] [random]
+    # appropriately.  Currently "profile", "speed" and "debug" arguments are
+    # supported. In this format:
+    #   python Game.py [profile <file>] [speed <n>] [debug [<myAIName>] [random]]
+    # With "profile" the time spent in the players' calls, the engine's
+    # checks of them and the redraws is written to the file (JSON, or CSV
+    # if its name ends in .csv) after each game and tournament.  With
+    # "speed" AI vs. AI games are shown at n moves per second once continue
+    # is clicked.
     def processCommandLine(self):
+        argv = list(sys.argv)
+        if (len(argv) > 2) and (argv[1] == "profile"):
+            self.profiler = Profiler()
+            self.profilePath = argv[2]
+            del argv[1:3]
+        if (len(argv) > 2) and (argv[1] == "speed"):
+            self.watchSpeed = float(argv[2])
+            del argv[1:3]
         #process command line arguments
-        if (len(sys.argv) > 1):
+        if (len(argv) > 1):
             #player wants to go straight to AI vs. Human for a
             #specific AI
-            if sys.argv[1] == "debug":
+            if argv[1] == "debug":
                 self.debugMode = True
                 self.humanPathCallback()   #press the "Human vs. AI" button
                 #AI name should be specified as second command line arg
                 index = -1
-                if (len(sys.argv) > 2):
-                    ainame = sys.argv[2]
+                if (len(argv) > 2):
+                    ainame = argv[2]
                     for player in self.players:
                         if ainame == player[0].author:
                             index = self.players.index(player)
@@ -72,7 +101,7 @@ class Game(object):
                     self.startGameCallback()
                 #User may specify "random" as third argument to get a
                 #random layout.  
-                if (len(sys.argv) > 3) and (sys.argv[3] == "random"):
+                if (len(argv) > 3) and (argv[3] == "random"):
                     self.randomSetup = True
         
 
@@ -90,7 +119,11 @@ class Game(object):
         while True:
             #Determine current chosen game mode. Enter different execution paths
             #based on the mode, which must be chosen by clicking a button.
-            self.ui.drawBoard(self.state, self.mode)
+            self.redraw()
+
+            #tournament games are played in the background by worker processes
+            if self.tournament != None:
+                self.pollTournament()
             
             if not self.errorNotify:
                 if self.mode == None:
@@ -105,6 +138,12 @@ class Game(object):
                  
                 self.runGame()   
                 self.resolveEndGame()
+            elif self.tournament != None:
+                #keep polling the tournament's workers
+                self.ui.waitForEvent(TOURNAMENT_POLL_INTERVAL)
+            else:
+                #nothing happens in the menus until the user does something
+                self.ui.waitForEvent()
 
     ##
     # runGame
@@ -117,21 +156,17 @@ class Game(object):
     def runGame(self):
         #build a list of things to place for player 1 in setup phase 1
         #1 anthill/queen, 1 tunnel/worker, 9 obstacles
-        constrsToPlace = []
-        constrsToPlace += [Building(None, ANTHILL, PLAYER_ONE)]
-        constrsToPlace += [Building(None, TUNNEL, PLAYER_ONE)]
-        constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
+        constrsToPlace = self.homeConstrs(PLAYER_ONE)
     
         while not self.gameOver:
+            #whether a human player is yet to give their placement or move
+            waitingForHuman = False
             if self.state.phase == MENU_PHASE:
                 #if we are in menu phase at this point, a reset was requested so break
                 break
             else:
-                #create a copy of the state to share with the player
-                theState = self.state.clone()
-                #if the player is player two, flip the board
-                if theState.whoseTurn == PLAYER_TWO:
-                    theState.flipBoard()
+                #the copy of the state to share with the player
+                theState = self.playerView()
 
             if self.state.phase == SETUP_PHASE_1 or self.state.phase == SETUP_PHASE_2:
                 currentPlayer = self.currentPlayers[self.state.whoseTurn]
@@ -163,27 +198,20 @@ class Game(object):
                     theState.clearConstrs()
                     
                 #get the placement from the player
-                targets += currentPlayer.getPlacement(theState)
+                try:
+                    targets += self.profileCall(currentPlayer, "getPlacement", currentPlayer.getPlacement, theState)
+                except PlayerTimeoutError as timeout:
+                    self.error(AI_TIMEOUT, timeout)
+                    break
                 #only want to place as many targets as constructions to place
                 if len(targets) > len(constrsToPlace):
                     targets = targets[:len(constrsToPlace)]
 
-                validPlace = self.isValidPlacement(constrsToPlace, targets)
+                validPlace = self.profileCall(currentPlayer, "isValidPlacement", self.isValidPlacement,
+                                              constrsToPlace, targets)
+                waitingForHuman = not validPlace
                 if validPlace:
-                    for target in targets:
-                        #translate coords to match player
-                        target = self.state.coordLookup(target, self.state.whoseTurn)
-                        #get construction to place
-                        constr = constrsToPlace.pop(0)
-                        #give constr its coords
-                        constr.coords = target
-                        #put constr on board
-                        self.state.board[target[0]][target[1]].constr = constr
-                        if constr.type == ANTHILL or constr.type == TUNNEL:
-                            #update the inventory
-                            self.state.inventories[self.state.whoseTurn].constrs.append(constr)
-                        else:  #grass and food
-                            self.state.inventories[NEUTRAL].constrs.append(constr)
+                    self.placeConstrs(constrsToPlace, targets)
                     
                     #if AI mode, pause to observe move until next or continue is clicked
                     self.pauseForAIMode()
@@ -192,52 +220,7 @@ class Game(object):
                         break
                     
                     if not constrsToPlace:
-                        constrsToPlace = []
-                        if self.state.phase == SETUP_PHASE_1:
-                            if self.state.whoseTurn == PLAYER_ONE:
-                                constrsToPlace += [Building(None, ANTHILL, PLAYER_TWO)]
-                                constrsToPlace += [Building(None, TUNNEL, PLAYER_TWO)]
-                                constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
-                            elif self.state.whoseTurn == PLAYER_TWO:
-                                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
-                                self.state.phase = SETUP_PHASE_2
-                        elif self.state.phase == SETUP_PHASE_2:
-                            if self.state.whoseTurn == PLAYER_ONE:
-                                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
-                            elif self.state.whoseTurn == PLAYER_TWO:
-                                #if we're finished placing, add in queens and move to play phase
-                                p1inventory = self.state.inventories[PLAYER_ONE]
-                                p2inventory = self.state.inventories[PLAYER_TWO]
-                                #get anthill coords
-                                p1AnthillCoords = p1inventory.constrs[0].coords
-                                p2AnthillCoords = p2inventory.constrs[0].coords
-                                #get tunnel coords
-                                p1TunnelCoords = p1inventory.constrs[1].coords
-                                p2TunnelCoords = p2inventory.constrs[1].coords
-                                #create queen and worker ants
-                                p1Queen = Ant(p1AnthillCoords, QUEEN, PLAYER_ONE)
-                                p2Queen = Ant(p2AnthillCoords, QUEEN, PLAYER_TWO)
-                                p1Worker = Ant(p1TunnelCoords, WORKER, PLAYER_ONE)
-                                p2Worker = Ant(p2TunnelCoords, WORKER, PLAYER_TWO)
-                                #put ants on board
-                                self.state.board[p1Queen.coords[0]][p1Queen.coords[1]].ant = p1Queen
-                                self.state.board[p2Queen.coords[0]][p2Queen.coords[1]].ant = p2Queen
-                                self.state.board[p1Worker.coords[0]][p1Worker.coords[1]].ant = p1Worker
-                                self.state.board[p2Worker.coords[0]][p2Worker.coords[1]].ant = p2Worker
-                                #add the queens to the inventories
-                                p1inventory.ants.append(p1Queen)
-                                p2inventory.ants.append(p2Queen)
-                                p1inventory.ants.append(p1Worker)
-                                p2inventory.ants.append(p2Worker)
-                                #give the players the initial food
-                                p1inventory.foodCount = 1
-                                p2inventory.foodCount = 1
-                                #change to play phase
-                                self.ui.notify("")
-                                self.state.phase = PLAY_PHASE
-                                
-                        #change player turn in state
-                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+                        constrsToPlace = self.nextSetupConstrs()
                             
                 else:
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
@@ -270,7 +253,11 @@ class Game(object):
                             
                 #get the move from the current player in a separate
                 #process so that we can time it out
-                move = currentPlayer.getMove(theState)
+                try:
+                    move = self.profileCall(currentPlayer, "getMove", currentPlayer.getMove, theState)
+                except PlayerTimeoutError as timeout:
+                    self.error(AI_TIMEOUT, timeout)
+                    break
                 
                 if move != None and move.coordList != None:
                     for i in xrange(0,len(move.coordList)):
@@ -278,24 +265,14 @@ class Game(object):
                         move.coordList[i] = self.state.coordLookup(move.coordList[i], self.state.whoseTurn)
                 
                 #make sure it's a valid move
-                validMove = self.isValidMove(move)
+                validMove = self.profileCall(currentPlayer, "isValidMove", self.isValidMove, move)
+                waitingForHuman = not validMove
                 
                 #complete the move if valid
                 if validMove:
                     #check move type
                     if move.moveType == MOVE_ANT:
-                        startCoord = move.coordList[0]
-                        endCoord = move.coordList[-1]
-                        
-                        #take ant from start coord
-                        antToMove = self.state.board[startCoord[0]][startCoord[1]].ant
-                        #change ant's coords and hasMoved status
-                        antToMove.coords = (endCoord[0], endCoord[1])
-                        antToMove.hasMoved = True
-                        #remove ant from location
-                        self.state.board[startCoord[0]][startCoord[1]].ant = None
-                        #put ant at last loc in coordList
-                        self.state.board[endCoord[0]][endCoord[1]].ant = antToMove
+                        antToMove = self.moveAnt(move)
                         
                         #clear all highlights after move happens
                         self.ui.coordList = []
@@ -317,22 +294,7 @@ class Game(object):
                         self.ui.attackList = []
                         
                     elif move.moveType == BUILD:
-                        coord = move.coordList[0]
-                        currentPlayerInv = self.state.inventories[self.state.whoseTurn]
-                                                 
-                        #subtract the cost of the item from the player's food count
-                        if move.buildType == TUNNEL:
-                            currentPlayerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
-                            
-                            tunnel = Building(coord, TUNNEL, self.state.whoseTurn)
-                            self.state.board[coord[0]][coord[1]].constr = tunnel
-                        else:
-                            currentPlayerInv.foodCount -= UNIT_STATS[move.buildType][COST]
-                            
-                            ant = Ant(coord, move.buildType, self.state.whoseTurn)
-                            ant.hasMoved = True
-                            self.state.board[coord[0]][coord[1]].ant = ant
-                            self.state.inventories[self.state.whoseTurn].ants.append(ant)
+                        self.build(move)
                         
                         #if AI mode, pause to observe move until next or continue is clicked
                         self.pauseForAIMode()
@@ -345,31 +307,11 @@ class Game(object):
                         
                     elif move.moveType == END:
                         #take care of end of turn business for ants and contructions
-                        for ant in self.state.inventories[self.state.whoseTurn].ants:
-                            constrUnderAnt = self.state.board[ant.coords[0]][ant.coords[1]].constr
-                            if constrUnderAnt != None:
-                                #if constr is enemy's and ant hasnt moved, affect capture health of buildings
-                                if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == self.state.whoseTurn:
-                                    constrUnderAnt.captureHealth -= 1
-                                    if constrUnderAnt.captureHealth == 0 and constrUnderAnt.type != ANTHILL:
-                                        constrUnderAnt.player = self.state.whoseTurn
-                                        constrUnderAnt.captureHealth = CONSTR_STATS[constrUnderAnt.type][CAP_HEALTH]
-                                #have all worker ants on food sources gather food
-                                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
-                                    ant.carrying = True
-                                #deposit carried food (only workers carry)
-                                elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
-                                    self.state.inventories[self.state.whoseTurn].foodCount += 1
-                                    ant.carrying = False
-                            
-                            #reset hasMoved on all ants of player
-                            ant.hasMoved = False   
+                        #and switch whose turn it is
+                        self.endTurn()
                             
                         #clear any currently highlighted squares
                         self.ui.coordList = []
-                        
-                        #switch whose turn it is
-                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
 
                         #notify player which AI is acting
                         nextPlayerName = self.players[self.state.whoseTurn][0].author
@@ -391,22 +333,21 @@ class Game(object):
                         self.ui.coordList = []
           
             #determine if if someone is a winner.
-            if self.hasWon(PLAYER_ONE):
-                self.setWinner(PLAYER_ONE)
-                
-            elif self.hasWon(PLAYER_TWO):
-                self.setWinner(PLAYER_TWO)
+            self.checkWinner()
                 
             #redraw the board periodically and check for user input
-            self.ui.drawBoard(self.state, self.mode)
+            self.redraw()
+            if waitingForHuman:
+                self.ui.waitForEvent()
             
         #end game loop
     
     def resolveEndGame(self):
+        self.exportProfile()
         if self.state.phase != MENU_PHASE:
             #check mode for appropriate response to game over
             if self.mode == HUMAN_MODE:
-                self.state.phase = MENU_PHASE
+                self.state.setPhase(MENU_PHASE)
                                          
                 #notify the user of the winner
                 if self.winner == PLAYER_ONE:
@@ -417,72 +358,36 @@ class Game(object):
                 self.errorNotify = True
 
             if self.mode == AI_MODE:
-                self.state.phase = MENU_PHASE
+                self.state.setPhase(MENU_PHASE)
                                          
                 #notify the user of the winner
                 winnerName = self.players[self.winner][0].author
                 self.ui.notify(winnerName + " has won the game!")
                 self.errorNotify = True
 
-            elif self.mode == TOURNAMENT_MODE:               
-                #adjust the count of games to play for the current pair
-                currentPairing = (self.currentPlayers[PLAYER_ONE].playerId, self.currentPlayers[PLAYER_TWO].playerId)
-           
-                #give the new scores to the UI
-                self.ui.tournamentScores = self.playerScores
+    ##
+    #pollTournament
+    #Description: Merges the results of finished tournament games into the
+    #   scores and resets the tournament once every game has been played.
+    ##
+    def pollTournament(self):
+        if self.tournament.poll():
+            self.exportProfile()
+            #if no more games to play, reset tournament stuff
+            self.tournament = None
+            self.numGames = 0
+            self.playerScores = []
+            self.ui.tournamentInProgress = False
 
-                #adjust the wins and losses of players
-                self.playerScores[self.winner][1] += 1
-                self.playerScores[self.loser][2] += 1
-                
-                #reset the game
-                self.initGame()
-               
-                for i in range(0, len(self.gamesToPlay)):
-                    #if we found the current pairing
-                    if self.gamesToPlay[i][0] == currentPairing:
-                        #mark off another game for the pairing
-                        self.gamesToPlay[i][1] -= 1
-                        
-                        #if the pairing has no more games, then remove it
-                        if self.gamesToPlay[i][1] == 0:
-                            self.gamesToPlay.remove(self.gamesToPlay[i])
-                        break
-                        
-                if len(self.gamesToPlay) == 0:
-                    #if no more games to play, reset tournament stuff
-                    self.numGames = 0                               
-                    self.playerScores = []
-                    self.mode = TOURNAMENT_MODE
-                    self.ui.tournamentInProgress = False
-                else:
-                    #setup game to run again
-                    self.mode = TOURNAMENT_MODE
-                    self.state.phase = SETUP_PHASE_1
-                
-                    #get players from next pairing
-                    playerOneId = self.gamesToPlay[0][0][0]
-                    playerTwoId = self.gamesToPlay[0][0][1]
-                
-                    #set up new current players
-                    self.currentPlayers.append(self.players[playerOneId][0])
-                    self.currentPlayers.append(self.players[playerTwoId][0]) 
-    
     ##
-    #setWinner
-    #Description: Given a current player ID (0 or 1), sets that player to be the winner of the current game.
-    #
-    #Parameters:
-    #   id - the current player ID. (int)
+    #stopTournament
+    #Description: Abandons the games of a tournament that is in progress
     ##
-    def setWinner(self, id):
-        self.gameOver = True
-        self.winner = self.currentPlayers[id].playerId
-        self.loser = self.currentPlayers[(id + 1) % 2].playerId
-         
-        #tell the players if they won or lost
-        self.currentPlayers[id].registerWin(True)
-        self.currentPlayers[(id + 1) % 2].registerWin(False)
+    def stopTournament(self):
+        if self.tournament != None:
+            self.tournament.stop()
+            self.tournament = None
+            self.ui.tournamentInProgress = False
     
     ##
     #resolveAttack 
@@ -495,12 +400,9 @@ class Game(object):
     def resolveAttack(self, attackingAnt, currentPlayer):
         #check if player wants to attack
         validAttackCoords = []
-        opponentId = (self.state.whoseTurn + 1) % 2
-        range = UNIT_STATS[attackingAnt.type][RANGE]
-        for ant in self.state.inventories[opponentId].ants:
-            if self.isValidAttack(attackingAnt, ant.coords):
-                #keep track of valid attack coords (flipped for player two)
-                validAttackCoords.append(self.state.coordLookup(ant.coords, currentPlayer.playerId))
+        for coord in self.listAttackCoords(attackingAnt):
+            #keep track of valid attack coords (flipped for player two)
+            validAttackCoords.append(self.state.coordLookup(coord, currentPlayer.playerId))
         if validAttackCoords != []:
             #give instruction to human player
             if type(currentPlayer) is HumanPlayer.HumanPlayer:
@@ -520,30 +422,36 @@ class Game(object):
             #keep requesting coords until valid attack is given
             while attackCoord == None or not validAttack:               
                 #Draw the board again (to recognize user input inside loop)
-                self.ui.drawBoard(self.state, self.mode)
+                self.redraw()
                 
                 if self.state.phase == MENU_PHASE:
                     #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
                     return
                 
-                #Create a clone of the state to give to the player
-                theState = self.state.clone()
-                if theState.whoseTurn == PLAYER_TWO:
-                    theState.flipBoard()
+                #the copy of the state to give to the player
+                theState = self.playerView()
                         
                 #get the attack from the player (flipped for player two)
-                attackCoord = self.state.coordLookup(currentPlayer.getAttack(theState, attackingAnt.clone(), validAttackCoords), currentPlayer.playerId)
+                try:
+                    attackCoord = self.profileCall(currentPlayer, "getAttack", currentPlayer.getAttack,
+                                                   theState, attackingAnt.clone(), validAttackCoords)
+                except PlayerTimeoutError as timeout:
+                    self.error(AI_TIMEOUT, timeout)
+                    return
+                attackCoord = self.state.coordLookup(attackCoord, currentPlayer.playerId)
                 
                 #check for the move's validity
-                validAttack = self.isValidAttack(attackingAnt, attackCoord)
+                validAttack = self.profileCall(currentPlayer, "isValidAttack", self.isValidAttack,
+                                               attackingAnt, attackCoord)
                 if not validAttack:
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
                         #if an ai submitted an invalid attack, exit
                         self.error(INVALID_ATTACK, attackCoord)
-                        break
+                        return
                     else:
                         #if a human submitted an invalid attack, reset coordList
                         currentPlayer.coordList = []
+                        self.ui.waitForEvent()
 
             #if we reached this point though loop, we must have a valid attack
             #if a human player, let it know an attack is expected (to affect location clicked context)
@@ -551,16 +459,8 @@ class Game(object):
                 self.expectingAttack = False
                 currentPlayer.coordList = []
             
-            #decrement ants health
-            attackedAnt = self.state.board[attackCoord[0]][attackCoord[1]].ant
-            attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
-            
-            #check for dead ant
-            if attackedAnt.health <= 0:
-                #remove dead ant from board
-                self.state.board[attackCoord[0]][attackCoord[1]].ant = None
-                #remove dead ant from inventory
-                self.state.inventories[opponentId].ants.remove(attackedAnt)
+            #decrement ants health, removing it if it dies
+            self.applyAttack(attackingAnt, attackCoord)
                 
             #if AI mode, pause to observe attack until next or continue is clicked
             self.pauseForAIMode()
@@ -571,17 +471,10 @@ class Game(object):
     #
     ##
     def initGame(self):
-        board = [[Location((col, row)) for row in xrange(0,BOARD_LENGTH)] for col in xrange(0,BOARD_LENGTH)]
-        p1Inventory = Inventory(PLAYER_ONE, [], [], 0)
-        p2Inventory = Inventory(PLAYER_TWO, [], [], 0)
-        neutralInventory = Inventory(NEUTRAL, [], [], 0)
-        self.state = GameState(board, [p1Inventory, p2Inventory, neutralInventory], MENU_PHASE, PLAYER_ONE)
-        self.currentPlayers = []
+        super(Game, self).initGame()
+        self.stopTournament()
         self.mode = None
         self.errorNotify = False
-        self.gameOver = False
-        self.winner = None
-        self.loser = None
         #Human vs AI mode
         self.expectingAttack = False
         #AI vs AI mode: used for stepping through moves
@@ -624,6 +517,10 @@ class Game(object):
     #           offset by 1 to account for the human player as player one.
     ##
     def loadAIs(self, humanMode):
+        #Stop the processes of any AIs that were loaded before
+        for player in self.players:
+            if isinstance(player[0], PlayerProcess):
+                player[0].stop()
         #Reset the player list in case some have been loaded already
         self.players = []
         self.ui.allAIs = self.players
@@ -644,7 +541,12 @@ class Game(object):
                 if temp == None:
                     temp = reload(globals()[moduleName])
                 #Create an instance of Player from temp
-                self.players.append([temp.AIPlayer(-1), INACTIVE])
+                player = temp.AIPlayer(-1)
+                #Run the AI in its own process so that it can be timed out.
+                #In debug mode it runs in this process so it can be debugged.
+                if not self.debugMode:
+                    player = PlayerProcess(player)
+                self.players.append([player, INACTIVE])
         #Remove current directory from python's import search order.
         sys.path.pop(0)
         #Revert working directory to parent.
@@ -672,413 +574,28 @@ class Game(object):
         if type(currentPlayer) is HumanPlayer.HumanPlayer:
             return
         print msg
-        
-    ##
-    #isValidMove(Move)
-    #Description: Checks to see if the move is valid for the current player.
-    # 
-    #Parameters:
-    #   move - The Move to check (Move)
-    #
-    #Returns: None if no move is given, true if the given move is valid, or false if the given move is invalid
-    ##
-    def isValidMove(self, move):
-        #check for no move
-        if move == None:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            return None
-        
-        #check that the move is well-formed typewise (tuples, ints, etc)
-        if type(move) != Move:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("ERROR:  player did not supply an object of type 'Move'")
-            return False
-        if type(move.moveType) != int:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("       Move type must be an integer.")
-            return False
-        #for END type moves, lots we don't need to check
-        if move.moveType == END:
-            return True
-        if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("       The coordinate list is empty!")
-            return False
-        index = 0
-        for coord in move.coordList:
-            if (type(coord) != tuple):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " is not a tuple.")
-                return False
-            if (len(coord) != 2):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " has " + str(len(coord)) + "entries instead of 2.")
-                return False
-            if (type(coord[0]) != int) or (type(coord[1]) != int):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " contains a value that is not an int.")
-                return False
-            index += 1
-        if type(move.buildType) != type(None) and type(move.buildType) != int:
-            return False
-
-        #for MOVE_ANT and BUILD type moves
-        if move.moveType == MOVE_ANT:
-            firstCoord = move.coordList[0]
-            #check valid start location (good coords and ant ownership)
-            if self.checkMoveStart(firstCoord):
-                #get ant to move
-                antToMove = self.state.board[firstCoord[0]][firstCoord[1]].ant
-                movePoints = UNIT_STATS[antToMove.type][MOVEMENT]             
-                previousCoord = None
-
-                index = 0
-                for coord in move.coordList:
-                    #if first runthough, need to set up previous coord
-                    if previousCoord == None:
-                        previousCoord = coord
-                        continue  
-                    #if any to-coords are invalid, return invalid move
-                    if not self.checkMovePath(previousCoord, coord):
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Illegal movement path at index" + str(index))
-                        return False
-                        
-                    #subtract cost of loc from movement points
-                    constrAtLoc = self.state.board[coord[0]][coord[1]].constr
-                    if constrAtLoc == None or antToMove.type == DRONE:
-                        movePoints -= 1
-                    else:
-                        movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
-                        
-                    previousCoord = coord
-                    index += 1
-                    
-                #Check for Queen ant trying to leave her territory
-                if (antToMove.type == QUEEN):
-                    for coord in move.coordList:
-                        if (coord[1] == BOARD_LENGTH / 2 - 1) \
-                        or (coord[1] == BOARD_LENGTH / 2):
-                            self.errorReport("ERROR: Invalid Move: " + str(move))
-                            self.errorReport("       Queen ant may not leave her own territory")
-                            return False
-                            
-                #within movement range and hasn't moved yet?
-                if (movePoints < 0):
-                    self.errorReport("ERROR: Invalid Move: " + str(move))
-                    self.errorReport("       Ant has insufficient movement points for this move")
-                    return False
-                if antToMove.hasMoved:
-                    self.errorReport("ERROR: Invalid Move: " + str(move))
-                    self.errorReport("       Ant has already made a move this turn")
-                    return False
-                else:
-                    return True
-                        
-        elif move.moveType == BUILD:
-            #coord list must contain one point for build
-            if len(move.coordList) != 1:
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       for a BUILD move, the coordinate list should contain exactly 1 coordinate")
-                return False
-        
-            buildCoord = move.coordList[0]
-            #check valid start location
-            if self.checkBuildStart(buildCoord):
-                #we're building either an ant or constr for sure
-               
-                if self.state.board[buildCoord[0]][buildCoord[1]].ant == None:
-                #we know we're building an ant
-                    buildCost = None
-                    #check buildType for valid ant
-                    if move.buildType == WORKER:
-                        buildCost = UNIT_STATS[WORKER][COST]
-                    elif move.buildType == DRONE:
-                        buildCost = UNIT_STATS[DRONE][COST]
-                    elif move.buildType == SOLDIER:
-                        buildCost = UNIT_STATS[SOLDIER][COST]
-                    elif move.buildType == R_SOLDIER:
-                        buildCost = UNIT_STATS[R_SOLDIER][COST]
-                    else:
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
-                        return False
-                    
-                    #check the player has enough food
-                    currFood = self.state.inventories[self.state.whoseTurn].foodCount
-                    if currFood >= buildCost:
-                        self.ui.notify("")
-                        return True
-                    else:
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Player has " + str(currFood) + " food but needs " + str(buildCost) + " to build this ant")
-                        self.ui.notify("Requires " + str(buildCost) + " food.")
-                        self.errorNotify = True
-                        return False
-                else:
-                #we know we're building a construction
-                    adjacentCoords = []
-                    adjacentCoords.append(addCoords(buildCoord, (0, -1)))
-                    adjacentCoords.append(addCoords(buildCoord, (0, 1)))
-                    adjacentCoords.append(addCoords(buildCoord, (-1, 0)))
-                    adjacentCoords.append(addCoords(buildCoord, (1, 0)))
-                
-                    #check that there's no food in adjacent locations
-                    for aCoord in adjacentCoords:
-                        if aCoord[0] >= 0 and aCoord[0] < 10 and aCoord[1] >= 0 and aCoord[1] < 10:
-                            if (self.state.board[aCoord[0]][aCoord[1]].constr != None and
-                                    self.state.board[aCoord[0]][aCoord[1]].constr.type == FOOD):
-                                self.errorReport("ERROR: Invalid Move: " + str(move))
-                                self.errorReport("       Cannot tunnel build next to food.")
-                                self.ui.notify("Cannot tunnel build next to food.")
-                                self.errorNotify = True
-                                return False
-                 
-                    buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
-                    if self.state.inventories[self.state.whoseTurn].foodCount >= buildCost:
-                        self.ui.notify("")
-                        return True
-                    else:
-                        self.ui.notify("Requires "+ str(buildCost) + " food.")
-                        self.errorNotify = True
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Must have at least " + str(buildCost) + " food to build a tunnel.")
-                        return False
-            else:  #invalid build start
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Build location invalid.  Possible cause:")
-                loc = self.state.board[buildCoord[0]][buildCoord[1]]
-                if loc.ant == None:  #building ant
-                    self.errorReport("         - Anthill does not belong to current player")
-                else:
-                    if (move.buildType != TUNNEL):
-                        self.errorReport("         - Anthill is already occupied")
-                    elif (loc.ant.hasMoved):
-                        self.errorReport("         - Worker ant has already moved this turn")
-                    else:
-                        self.errorReport("         - Worker ant does not belong to current player")
-        else:
-            #invalid numeric move type
-            return False
-            
-    ##
-    #isValidPlacement
-    #Description: Checks that the given placement of Constructions is valid
-    #
-    #Paramters:
-    #   items - The items to place (Construction[])
-    #   targets - A list of the coordinates to place the items at ((int,int)[])
-    #
-    #Returns None if no target is given, true if it is a valid placement, or false if it is an invalid placement
-    ##
-    def isValidPlacement(self, items, targets):
-        #check for well-formed input of targets (from players)
-        if type(targets) == type(None) or type(targets) != list:
-            return False
-         #If no target, return None (human vs ai caught by caller)
-        if len(targets) == 0:
-            return None
-        for coord in targets:
-            if not self.isValidCoord(coord):
-                return False
 
-        for i in range(0, len(targets)):
-            #Nobody can place in the center two rows of the board or on their opponents side
-                 
-            #check item type
-            if items[i].type == ANTHILL or items[i].type == TUNNEL or items[i].type == GRASS:
-                #check targets[i] is within proper boundaries y-wise
-                #must be on own side
-                if not self.isInHomeTerritory(targets[i]):
-                    return False
-            #check item type
-            elif items[i].type == FOOD:
-                #check targets[i] is within proper boundaries y-wise
-                #must be on opponent's side
-                if not self.isInEnemyTerritory(targets[i]):
-                    return False
-            else:
-                #I don't know what this type is.
-                return False
-            
-            #change target to access appropriate players locations
-            aTarget = self.state.coordLookup(targets[i], self.state.whoseTurn)
-            #make sure nothing is there yet
-            if not self.state.board[aTarget[0]][aTarget[1]].constr == None:
-                return False
-                    
-        return True
-      
     ##
-    #isValidAttack
-    #Description: Determines whether the attack with the given parameters is valid
-    #   Attacking ant is assured to exist and belong to the player whose turn it is
+    #notify
+    #Description: Displays a message to the user through the UI
     #
     #Parameters:
-    #   attackingAnt - The Ant that is attacking (Ant)
-    #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
-    #
-    #Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
-    ##  
-    def isValidAttack(self, attackingAnt, attackCoord):
-        if attackCoord == None:
-            return None
-        
-        #check for well-formed input from players
-        if not self.isValidCoord(attackCoord):
-            return False
-    
-        attackLoc = self.state.board[attackCoord[0]][attackCoord[1]]
-        
-        if attackLoc.ant == None or attackLoc.ant.player == attackingAnt.player:
-            return False
-        
-        #we know we have an enemy ant
-        range = UNIT_STATS[attackingAnt.type][RANGE]
-        diffX = abs(attackingAnt.coords[0] - attackCoord[0])
-        diffY = abs(attackingAnt.coords[1] - attackCoord[1])
-        
-        #pythagoras would be proud
-        if range ** 2 >= diffX ** 2 + diffY ** 2:
-            #return True if within range
-            return True
-        else:
-            return False
-   
-    ##
-    #isValidCoord
-    #Description: Retruns whether this coord represents a valid board location. 
-    #
-    #Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    #Returns: True if the coordinate is between (0,0) and (9,9)
-    ##
-    def isValidCoord(self, coord):
-        #check for well-formed coord
-        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
-            return False
-        
-        #check boundaries
-        if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
-            return False
-            
-        return True
-   
-    ##
-    # isInHomeTerritory
-    #
-    # Description: determines whether the position is in the player's
-    # home territory
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if it is and False otherwise
-    #
+    #   msg - the message to display (string)
     ##
-    def isInHomeTerritory(self, coord):
-        if not self.isValidCoord(coord):
-            return False
-        if not (coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1):
-            return False
-        return True
+    def notify(self, msg):
+        self.ui.notify(msg)
 
     ##
-    # isInEnemyTerritory
-    #
-    # Description: determines whether the position is in the player's
-    # enemy's territory
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if it is and False otherwise
-    #
-    ##
-    def isInEnemyTerritory(self, coord):
-        if not self.isValidCoord(coord):
-            return False
-        if not (coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1):
-            return False
-        return True
-
-    ##
-    #checkMoveStart 
-    #Description: Checks if the location is valid to move from.
-    #  (bounds and ant ownership)
-    #
-    #Parameters:
-    #   coord - The starting point for the move ((int, int))
-    #
-    #Returns: True if it is a valid starting point for a move and false if not
-    ##
-    def checkMoveStart(self, coord):
-        #check location is on board
-        if self.isValidCoord(coord):
-            antToMove = self.state.board[coord[0]][coord[1]].ant
-            #check that an ant exists at the loc
-            if antToMove != None:
-                #check that it's the player's ant and that it hasn't moved
-                if antToMove.player == self.state.whoseTurn and not antToMove.hasMoved:
-                    return True
-                                      
-        return False
-
-    ##
-    #checkMovePath
-    #Description: Checks if the location is valid to move to.
-    #  (clear path, adjacent locations) 
+    #notifyError
+    #Description: Displays an error message to the user through the UI
     #
     #Parameters:
-    #   fromCoord - The Ant's current coordinate ((int, int))
-    #   toCoord - The coorinate to move the Ant to ((int, int))
-    #
-    #Returns: True if it is a valid move and false otherwise
-    #
-    #Note: fromCoord must always have been checked by the time it's passed
-    #  (either in checkMoveStart or previous checkMovePath call)
+    #   msg - the message to display (string)
     ##
-    def checkMovePath(self, fromCoord, toCoord):
-        #check location is on board
-        if self.isValidCoord(toCoord):
-            #check that squares are adjacent (difference on only one axis is 1)
-            if ((abs(fromCoord[0] - toCoord[0]) == 1 and abs(fromCoord[1] - toCoord[1]) == 0) or
-                    (abs(fromCoord[0] - toCoord[0]) == 0 and abs(fromCoord[1] - toCoord[1]) == 1)):
-                antAtLoc = self.state.board[toCoord[0]][toCoord[1]].ant
-                #check if an ant exists at the loc
-                if antAtLoc ==  None:
-                    return True
-                    
-        return False
-
-    ##
-    #checkBuildStart 
-    #Description: Checks if the location is valid to build from.
-    #  (bounds and building ownership)
-    #
-    #Parameters:
-    #   coord - The coordinate trying to be used to build ((int, int))
-    #
-    #Returns: True if it is a valid build location and false otherwise
-    ##    
-    def checkBuildStart(self, coord):
-        #check location is on board
-        if self.isValidCoord(coord):
-            loc = self.state.board[coord[0]][coord[1]]
-            #check that an empty anthill exists at the loc
-            if loc.constr != None and loc.constr.type == ANTHILL and loc.ant == None:
-                #check that it's the player's anthill
-                if loc.constr.player == self.state.whoseTurn:
-                    return True
-            #check that an ant exists at an empty location
-            elif loc.ant != None and loc.ant.type == WORKER and loc.constr == None:       
-                #check that it's the player's ant and it hasn't moved
-                if loc.ant.player == self.state.whoseTurn and not loc.ant.hasMoved:
-                    return True
-                    
-        return False
-    
+    def notifyError(self, msg):
+        self.ui.notify(msg)
+        self.errorNotify = True
+        
     ##
     #highlightValidMoves
     #Description: Highlights valid possible moves for the player when an ant is selected
@@ -1121,25 +638,22 @@ class Game(object):
 
     
     ##
-    #hasWon(int)
-    #Description: Determines whether the game has ended in victory for the given player.
+    #redraw
+    #Description: Draws the board and handles the user's input
     #
-    #Parameters:
-    #   playerId - The ID of the player being checked for winning (int)
-    #   
-    #Returns: True if the player with playerId has won the game.
     ##
-    def hasWon(self, playerId):
-        opponentId = (playerId + 1) % 2
-        
-        if ((self.state.phase == PLAY_PHASE) and 
-        ((self.state.inventories[opponentId].getQueen() == None) or
-        (self.state.inventories[opponentId].getAnthill().captureHealth <= 0) or
-        (self.state.inventories[playerId].foodCount >= FOOD_GOAL))):
-            return True
-        else:
-            return False
-     
+    def redraw(self):
+        self.profileCall(None, "drawBoard", self.ui.drawBoard, self.state, self.mode)
+
+    ##
+    #exportProfile
+    #Description: Writes the profile so far, if the game is profiled
+    #
+    ##
+    def exportProfile(self):
+        if self.profilePath != None:
+            self.profiler.export(self.profilePath)
+
     ##
     #pauseForAIMode
     #Description: Will pause the game if set to AI mode until user clicks next or continue
@@ -1147,58 +661,23 @@ class Game(object):
     ##    
     def pauseForAIMode(self):
         if self.mode == AI_MODE:
+            #show the move for as long as the watch speed allows
+            if self.continueClicked and self.watchSpeed > 0:
+                endTime = time.time() + 1.0 / self.watchSpeed
+                while time.time() < endTime:
+                    self.redraw()
+                    if self.state.phase == MENU_PHASE:
+                        return
+                    self.ui.waitForEvent(endTime - time.time())
             while not self.nextClicked and not self.continueClicked:
-                self.ui.drawBoard(self.state, self.mode)
+                self.redraw()
                 if self.state.phase == MENU_PHASE:
                     #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
                     return
+                self.ui.waitForEvent()
             #reset nextClicked to catch next move
             self.nextClicked = False
     
-    ##
-    #error
-    #Description: Called when an AI player makes an error. Gives a description
-    #    of what went wrong and exits the program.
-    #
-    #Parameters:
-    #   errorCode - A code indicating the type of error
-    #        info - the offending object that caused the error
-    ##
-    def error(self, errorCode, info):
-        errorMsg = "AI ERROR: "
-
-        if errorCode == INVALID_PLACEMENT:
-            #info is a coord list
-            errorMsg += "invalid placement\nCoords given: "
-            lastCoord = info.pop()
-            for coord in info:
-                errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
-            errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
-
-        elif errorCode == INVALID_MOVE:
-            #info is a move
-            errorMsg += "invalid move: " + str(info) + "\n"
-            if info == None:
-                errorMsg += "Move is non-move type: None"
-            elif type(info) != Move:
-                errorMsg += "Move is non-move type: " + str(type(info))
-            elif info.moveType == None:
-                errorMsg += "moveType is non-int type: None"
-            elif type(info.moveType) != int:
-                errorMsg += "moveType is non-int type: " + str(type(info.moveType))
-            elif info.moveType < MOVE_ANT or info.moveType > END:
-                errorMsg += "moveType not a recognized value: " + str(info.moveType)
-            elif info.moveType == MOVE_ANT:
-                pass
-
-        else: #INVALID_ATTACK
-            #info is a coord          
-            errorMsg += "invalid attack\n"
-            errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
-    
-        print errorMsg
-        self.setWinner((self.state.whoseTurn + 1) % 2)
-
     ############################################################# 
     #####  #####  #      #      ####   #####  #####  #   #  #####
     #      #   #  #      #      #   #  #   #  #      #  #   #
@@ -1227,7 +706,7 @@ class Game(object):
 
         #if we are resetting, set the phase to MENU_PHASE with no mode
         if reset:
-            self.state.phase = MENU_PHASE
+            self.state.setPhase(MENU_PHASE)
             self.mode = None
         
         if self.mode == None:
@@ -1246,7 +725,7 @@ class Game(object):
                 self.gamesToPlay = [] #((p1.id, p2.id), numGames)
                 self.numGames = None
                 #notify UI tournament has started
-                self.ui.tournamentStartTime = time.clock()
+                self.ui.tournamentStartTime = time.time()
                 self.ui.tournamentInProgress = True
     
                 if self.ui.textBoxContent != '':
@@ -1259,8 +738,6 @@ class Game(object):
                 if self.numGames <= 0:
                     return
                 
-                self.ui.tournamentScores = []
-                
                 for i in range(0, len(self.players)):
                     #initialize the player's win/loss scores
                     tempAuth = self.players[i][0].author
@@ -1269,7 +746,6 @@ class Game(object):
                         tempAuth = tempAuth[0:21] + "..."
                     
                     self.playerScores.append([tempAuth, 0, 0])
-                    self.ui.tournamentScores.append([tempAuth, 0, 0])
                     
                     for j in range(i, len(self.players)):
                         if self.players[i][0] != self.players[j][0]:
@@ -1279,6 +755,14 @@ class Game(object):
                 for i in range(0, numPairings):
                     #assign equal number of games to each pairing (rounds down)
                     self.gamesToPlay[i][1] = self.numGames
+
+                #play the games in parallel, the scores fill in as they finish
+                self.ui.tournamentScores = self.playerScores
+                players = [playerEntry[0] for playerEntry in self.players]
+                self.tournament = Tournament.ParallelTournament(players, self.gamesToPlay, self.playerScores,
+                                                                sandbox=not self.debugMode,
+                                                                profiler=self.profiler)
+                return
             
             #Make a temporary list to append to so that we may check how many AIs we have available.
             tempCurrent = []
@@ -1294,7 +778,7 @@ class Game(object):
             self.currentPlayers = tempCurrent
                  
             #change the phase to setup
-            self.state.phase = SETUP_PHASE_1
+            self.state.setPhase(SETUP_PHASE_1)
             
     ##
     #tourneyPathCallback
@@ -0,0 +1,1481 @@
+import os, re, sys, time, random
+from Construction import *
+from Constants import *
+from GameState import *
+from Inventory import *
+from Building import *
+from Location import *
+from Ant import *
+from Move import *
+from PlayerProcess import PlayerProcess, PlayerTimeoutError
+from Profiler import Profiler, profileCall
+
+#Maximum number of moves (both players combined) before a headless game is
+#called a draw.  Without a cap two passive AIs could play forever.
+MAX_GAME_MOVES = 10000
+
+##
+#GameResult
+#Description: The outcome of a single game played by the GameEngine
+#
+#Variables:
+#   winner - The id (PLAYER_ONE/PLAYER_TWO) of the winning player or None for
+#       a draw (int)
+#   loser - The id of the losing player or None for a draw (int)
+#   authors - The authors of player one and player two ([str, str])
+#   reason - The error code (see Constants.py) that ended the game or None if
+#       the game ended normally (int)
+#   numMoves - The number of moves made during the play phase (int)
+##
+class GameResult(object):
+
+    ##
+    #__init__
+    #Description: Creates a new GameResult
+    #
+    #Parameters:
+    #   winner - The id of the winning player (int)
+    #   loser - The id of the losing player (int)
+    #   authors - The authors of player one and two ([str, str])
+    #   reason - The error code that ended the game, if any (int)
+    #   numMoves - The number of moves made during the play phase (int)
+    ##
+    def __init__(self, winner, loser, authors, reason, numMoves):
+        self.winner = winner
+        self.loser = loser
+        self.authors = authors
+        self.reason = reason
+        self.numMoves = numMoves
+
+    ##
+    # try to print this object out in an easier-to-read manner
+    def __str__(self):
+        if self.winner == None:
+            outcome = "draw"
+        else:
+            outcome = self.authors[self.winner] + " won"
+        if self.reason != None:
+            outcome += " (opponent error " + str(self.reason) + ")"
+        return "<Game: " + self.authors[PLAYER_ONE] + " vs " + \
+            self.authors[PLAYER_TWO] + ": " + outcome + " after " + \
+            str(self.numMoves) + " moves>"
+
+##
+#GameEngine
+#Description: Enforces the rules of the game and applies moves to the game
+#   state.  The engine has no dependency on pygame so it can be used on its
+#   own to play AI vs. AI games as fast as the AIs allow.  Game extends this
+#   class to add the user interface.
+#
+#Variables:
+#   state - The GameState of the game being played
+#   currentPlayers - The two Players in the current game, indexed by player id
+#   gameOver - True once a winner has been determined
+#   winner - The playerId of the winner of the last game
+#   loser - The playerId of the loser of the last game
+#   errorCode - The error code that ended the last game (or None)
+#   verbose - If False, AI errors are not printed to the console
+#   view - The last copy of the state made by playerView, or None
+#   viewVersion - The state and its version when view was made
+##
+class GameEngine(object):
+
+    ##
+    #__init__
+    #Description: Creates a new GameEngine
+    #
+    #Parameters:
+    #   verbose - whether to print AI errors to the console (bool)
+    #   recorder - records the games played, or None (GameRecord.GameRecorder)
+    #   profiler - times the players' calls and the engine's checks of what
+    #       they return, or None (Profiler)
+    ##
+    def __init__(self, verbose=True, recorder=None, profiler=None):
+        self.verbose = verbose
+        self.recorder = recorder
+        self.profiler = profiler
+        self.initGame()
+
+    ##
+    #initGame
+    #Description: resets the game's attributes to their starting state
+    #
+    ##
+    def initGame(self):
+        board = [[Location((col, row)) for row in xrange(0,BOARD_LENGTH)] for col in xrange(0,BOARD_LENGTH)]
+        p1Inventory = Inventory(PLAYER_ONE, [], [], 0)
+        p2Inventory = Inventory(PLAYER_TWO, [], [], 0)
+        neutralInventory = Inventory(NEUTRAL, [], [], 0)
+        self.state = GameState(board, [p1Inventory, p2Inventory, neutralInventory], MENU_PHASE, PLAYER_ONE)
+        self.currentPlayers = []
+        self.gameOver = False
+        self.winner = None
+        self.loser = None
+        self.errorCode = None
+        self.numTurns = 0
+        self.view = None
+        self.viewVersion = None
+
+    ##
+    #notify
+    #Description: Displays a message to the user.  The engine has no user
+    #   so the message is discarded.
+    #
+    #Parameters:
+    #   msg - the message to display (string)
+    ##
+    def notify(self, msg):
+        pass
+
+    ##
+    #notifyError
+    #Description: Displays an error message to the user.  The engine has no
+    #   user so the message is discarded.
+    #
+    #Parameters:
+    #   msg - the message to display (string)
+    ##
+    def notifyError(self, msg):
+        pass
+
+    ##
+    # errorReport
+    #
+    # Description:  Notifies the user of an invalid move.  For AI
+    # players, this takes the form of a message on the console.
+    #
+    # Parameters:
+    #   msg - the message to send
+    #
+    def errorReport(self, msg):
+        if self.verbose:
+            print msg
+
+    ##
+    #play
+    #Description: Plays a complete game between two players without a user
+    #   interface.  The players' ids are set to their seat in the game.
+    #
+    #Parameters:
+    #   p1 - The Player that moves first (Player)
+    #   p2 - The Player that moves second (Player)
+    #   maxMoves - The number of play phase moves before the game is called
+    #       a draw (int)
+    #   seed - If given, random is seeded with it first so the game can be
+    #       played again (int)
+    #
+    #Return: The outcome of the game (GameResult)
+    ##
+    def play(self, p1, p2, maxMoves=MAX_GAME_MOVES, seed=None):
+        self.initGame()
+        if seed != None:
+            random.seed(seed)
+        p1.playerId = PLAYER_ONE
+        p2.playerId = PLAYER_TWO
+        self.currentPlayers = [p1, p2]
+        self.state.setPhase(SETUP_PHASE_1)
+
+        numMoves = 0
+        if self.recorder != None:
+            self.recorder.startGame([p1.author, p2.author], seed)
+        try:
+            self.playSetup()
+            if not self.gameOver:
+                numMoves = self.playMoves(maxMoves)
+        finally:
+            if self.recorder != None:
+                self.recorder.endGame(self.winner, self.errorCode, numMoves)
+
+        return GameResult(self.winner, self.loser, [p1.author, p2.author],
+                          self.errorCode, numMoves)
+
+    ##
+    #playSetup
+    #Description: Asks each player for their placements until the setup
+    #   phases are complete
+    #
+    ##
+    def playSetup(self):
+        constrsToPlace = self.homeConstrs(PLAYER_ONE)
+        while not self.gameOver and self.state.phase != PLAY_PHASE:
+            currentPlayer = self.currentPlayers[self.state.whoseTurn]
+            theState = self.playerView()
+            #hide the 1st player's set anthill and grass placement from the 2nd player
+            if theState.whoseTurn == PLAYER_TWO and self.state.phase == SETUP_PHASE_1:
+                theState.clearConstrs()
+
+            try:
+                targets = self.profileCall(currentPlayer, "getPlacement", currentPlayer.getPlacement, theState)
+            except PlayerTimeoutError as timeout:
+                self.error(AI_TIMEOUT, timeout)
+                break
+            #only want to place as many targets as constructions to place
+            if type(targets) == list and len(targets) > len(constrsToPlace):
+                targets = targets[:len(constrsToPlace)]
+
+            if not self.profileCall(currentPlayer, "isValidPlacement", self.isValidPlacement,
+                                    constrsToPlace, targets):
+                self.error(INVALID_PLACEMENT, targets)
+                break
+            self.placeConstrs(constrsToPlace, targets)
+
+            if not constrsToPlace:
+                constrsToPlace = self.nextSetupConstrs()
+
+    ##
+    #playMoves
+    #Description: Asks the players for moves until one of them wins
+    #
+    #Parameters:
+    #   maxMoves - The number of moves before the game is called a draw (int)
+    #
+    #Return: The number of moves made (int)
+    ##
+    def playMoves(self, maxMoves):
+        numMoves = 0
+        while not self.gameOver and numMoves < maxMoves:
+            currentPlayer = self.currentPlayers[self.state.whoseTurn]
+            try:
+                move = self.profileCall(currentPlayer, "getMove", currentPlayer.getMove, self.playerView())
+            except PlayerTimeoutError as timeout:
+                self.error(AI_TIMEOUT, timeout)
+                break
+            numMoves += 1
+
+            if isinstance(move, Move) and type(move.coordList) == list:
+                for i in xrange(0,len(move.coordList)):
+                    #translate coords of move to match player
+                    move.coordList[i] = self.state.coordLookup(move.coordList[i], self.state.whoseTurn)
+
+            if not self.profileCall(currentPlayer, "isValidMove", self.isValidMove, move):
+                self.error(INVALID_MOVE, move)
+                break
+
+            if move.moveType == MOVE_ANT:
+                antToMove = self.moveAnt(move)
+                self.playAttack(antToMove, currentPlayer)
+            elif move.moveType == BUILD:
+                self.build(move)
+            elif move.moveType == END:
+                self.endTurn()
+
+            self.checkWinner()
+        return numMoves
+
+    ##
+    #playAttack
+    #Description: Asks the player for an attack if the given ant has an
+    #   enemy in range and applies it
+    #
+    #Parameters:
+    #   attackingAnt - The Ant that just moved (Ant)
+    #   currentPlayer - The Player whose turn it currently is (Player)
+    ##
+    def playAttack(self, attackingAnt, currentPlayer):
+        whoseTurn = self.state.whoseTurn
+        validAttackCoords = [self.state.coordLookup(coord, whoseTurn)
+                             for coord in self.listAttackCoords(attackingAnt)]
+        if validAttackCoords == []:
+            return
+
+        try:
+            attackCoord = self.profileCall(currentPlayer, "getAttack", currentPlayer.getAttack,
+                                           self.playerView(), attackingAnt.clone(), validAttackCoords)
+        except PlayerTimeoutError as timeout:
+            self.error(AI_TIMEOUT, timeout)
+            return
+        attackCoord = self.state.coordLookup(attackCoord, whoseTurn)
+        if not self.profileCall(currentPlayer, "isValidAttack", self.isValidAttack, attackingAnt, attackCoord):
+            self.error(INVALID_ATTACK, attackCoord)
+            return
+        self.applyAttack(attackingAnt, attackCoord)
+
+    ##
+    #profileCall
+    #Description: Makes a call through the profiler, if there is one (see
+    #   Profiler.profileCall), in the current phase
+    #
+    #Parameters:
+    #   player - The Player the call is for, or None for the engine's own
+    #       calls (Player)
+    #   operation - The name the call is added up under (string)
+    #   function - The function to call
+    #   args - The arguments to call it with
+    #
+    #Return: What the function returns
+    ##
+    def profileCall(self, player, operation, function, *args):
+        author = None
+        if player != None:
+            author = player.author
+        return profileCall(self.profiler, author, self.state.phase, operation, function, *args)
+
+    ##
+    #playerView
+    #Description: Creates the copy of the state that is shared with the
+    #   player whose turn it is (flipped for player two).  The copy is only
+    #   made again once the state has changed, so loops waiting on a human
+    #   player, or asking again for an attack, hand out the same one.
+    #
+    #Return: A clone of the current state (GameState)
+    ##
+    def playerView(self):
+        if self.view == None or self.viewVersion != (self.state, self.state.version):
+            self.view = self.state.clone()
+            if self.view.whoseTurn == PLAYER_TWO:
+                self.view.flipBoard()
+            self.viewVersion = (self.state, self.state.version)
+        return self.view
+
+    ##
+    #checkWinner
+    #Description: Ends the game if either player has won
+    #
+    ##
+    def checkWinner(self):
+        if self.hasWon(PLAYER_ONE):
+            self.setWinner(PLAYER_ONE)
+        elif self.hasWon(PLAYER_TWO):
+            self.setWinner(PLAYER_TWO)
+
+    ##
+    #setWinner
+    #Description: Given a current player ID (0 or 1), sets that player to be the winner of the current game.
+    #
+    #Parameters:
+    #   id - the current player ID. (int)
+    ##
+    def setWinner(self, id):
+        self.gameOver = True
+        self.winner = self.currentPlayers[id].playerId
+        self.loser = self.currentPlayers[(id + 1) % 2].playerId
+
+        #tell the players if they won or lost
+        self.currentPlayers[id].registerWin(True)
+        self.currentPlayers[(id + 1) % 2].registerWin(False)
+
+    ##
+    #error
+    #Description: Called when an AI player makes an error. Gives a description
+    #    of what went wrong and ends the game in favor of the opponent.
+    #
+    #Parameters:
+    #   errorCode - A code indicating the type of error
+    #        info - the offending object that caused the error
+    ##
+    def error(self, errorCode, info):
+        errorMsg = "AI ERROR: "
+
+        if errorCode == INVALID_PLACEMENT:
+            #info is a coord list
+            errorMsg += "invalid placement\nCoords given: "
+            if type(info) == list and len(info) > 0:
+                lastCoord = info.pop()
+                for coord in info:
+                    errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
+                errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
+            else:
+                errorMsg += str(info)
+
+        elif errorCode == INVALID_MOVE:
+            #info is a move
+            errorMsg += "invalid move: " + str(info) + "\n"
+            if info == None:
+                errorMsg += "Move is non-move type: None"
+            elif type(info) != Move:
+                errorMsg += "Move is non-move type: " + str(type(info))
+            elif info.moveType == None:
+                errorMsg += "moveType is non-int type: None"
+            elif type(info.moveType) != int:
+                errorMsg += "moveType is non-int type: " + str(type(info.moveType))
+            elif info.moveType < MOVE_ANT or info.moveType > END:
+                errorMsg += "moveType not a recognized value: " + str(info.moveType)
+            elif info.moveType == MOVE_ANT:
+                pass
+
+        elif errorCode == AI_TIMEOUT:
+            #info is the PlayerTimeoutError
+            errorMsg += "timed out\n" + str(info)
+
+        else: #INVALID_ATTACK
+            #info is a coord
+            errorMsg += "invalid attack\n"
+            if type(info) == tuple and len(info) == 2:
+                errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
+            else:
+                errorMsg += str(info)
+
+        if self.verbose:
+            print errorMsg
+        if self.recorder != None:
+            self.recorder.recordError(errorCode, errorMsg)
+        self.errorCode = errorCode
+        self.setWinner((self.state.whoseTurn + 1) % 2)
+
+    ##
+    #homeConstrs
+    #Description: Lists the constructions a player places on their own side
+    #   during setup phase 1: 1 anthill, 1 tunnel and 9 grass
+    #
+    #Parameters:
+    #   playerId - The player doing the placing (int)
+    #
+    #Return: The Constructions to place (Construction[])
+    ##
+    def homeConstrs(self, playerId):
+        constrsToPlace = []
+        constrsToPlace += [Building(None, ANTHILL, playerId)]
+        constrsToPlace += [Building(None, TUNNEL, playerId)]
+        constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
+        return constrsToPlace
+
+    ##
+    #placeConstrs
+    #Description: Puts Constructions on the board at valid targets.  Placed
+    #   constructions are removed from the front of constrsToPlace.
+    #
+    #Parameters:
+    #   constrsToPlace - The Constructions still to be placed (Construction[])
+    #   targets - Valid coordinates for the current player ((int,int)[])
+    ##
+    def placeConstrs(self, constrsToPlace, targets):
+        #translate coords to match player
+        targets = [self.state.coordLookup(target, self.state.whoseTurn) for target in targets]
+        if self.recorder != None:
+            self.recorder.recordPlacement(self.state.whoseTurn, targets)
+        for target in targets:
+            #get construction to place
+            constr = constrsToPlace.pop(0)
+            #give constr its coords
+            constr.coords = target
+            #put constr on board
+            self.state.board[target[0]][target[1]].constr = constr
+            if constr.type == ANTHILL or constr.type == TUNNEL:
+                #update the inventory
+                self.state.inventories[self.state.whoseTurn].constrs.append(constr)
+            else:  #grass and food
+                self.state.inventories[NEUTRAL].constrs.append(constr)
+            self.state.noteConstrAdded(constr)
+            self.state.hashConstr(constr)
+
+    ##
+    #nextSetupConstrs
+    #Description: Advances the setup once the current player has placed
+    #   everything, starting the play phase when setup is complete.
+    #
+    #Return: The Constructions the next player must place (Construction[])
+    ##
+    def nextSetupConstrs(self):
+        constrsToPlace = []
+        if self.state.phase == SETUP_PHASE_1:
+            if self.state.whoseTurn == PLAYER_ONE:
+                constrsToPlace += self.homeConstrs(PLAYER_TWO)
+            elif self.state.whoseTurn == PLAYER_TWO:
+                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
+                self.state.setPhase(SETUP_PHASE_2)
+        elif self.state.phase == SETUP_PHASE_2:
+            if self.state.whoseTurn == PLAYER_ONE:
+                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
+            elif self.state.whoseTurn == PLAYER_TWO:
+                self.startPlayPhase()
+
+        #change player turn in state
+        self.state.hashTurn()
+        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+        self.state.hashTurn()
+        if self.state.phase == PLAY_PHASE and self.recorder != None:
+            self.recorder.recordTurn(self.numTurns, self.state)
+        return constrsToPlace
+
+    ##
+    #startPlayPhase
+    #Description: Adds the queens and starting workers once both players have
+    #   finished placing and moves to the play phase.
+    #
+    ##
+    def startPlayPhase(self):
+        p1inventory = self.state.inventories[PLAYER_ONE]
+        p2inventory = self.state.inventories[PLAYER_TWO]
+        #get anthill coords
+        p1AnthillCoords = p1inventory.constrs[0].coords
+        p2AnthillCoords = p2inventory.constrs[0].coords
+        #get tunnel coords
+        p1TunnelCoords = p1inventory.constrs[1].coords
+        p2TunnelCoords = p2inventory.constrs[1].coords
+        #create queen and worker ants
+        p1Queen = Ant(p1AnthillCoords, QUEEN, PLAYER_ONE)
+        p2Queen = Ant(p2AnthillCoords, QUEEN, PLAYER_TWO)
+        p1Worker = Ant(p1TunnelCoords, WORKER, PLAYER_ONE)
+        p2Worker = Ant(p2TunnelCoords, WORKER, PLAYER_TWO)
+        #put ants on board
+        self.state.board[p1Queen.coords[0]][p1Queen.coords[1]].ant = p1Queen
+        self.state.board[p2Queen.coords[0]][p2Queen.coords[1]].ant = p2Queen
+        self.state.board[p1Worker.coords[0]][p1Worker.coords[1]].ant = p1Worker
+        self.state.board[p2Worker.coords[0]][p2Worker.coords[1]].ant = p2Worker
+        #add the queens to the inventories
+        p1inventory.ants.append(p1Queen)
+        p2inventory.ants.append(p2Queen)
+        p1inventory.ants.append(p1Worker)
+        p2inventory.ants.append(p2Worker)
+        for ant in (p1Queen, p2Queen, p1Worker, p2Worker):
+            self.state.noteAntAdded(ant)
+            self.state.hashAnt(ant)
+        #give the players the initial food
+        self.state.hashFood(PLAYER_ONE)
+        self.state.hashFood(PLAYER_TWO)
+        p1inventory.foodCount = 1
+        p2inventory.foodCount = 1
+        self.state.hashFood(PLAYER_ONE)
+        self.state.hashFood(PLAYER_TWO)
+        #change to play phase
+        self.notify("")
+        self.state.setPhase(PLAY_PHASE)
+
+    ##
+    #moveAnt
+    #Description: Moves an ant along a valid MOVE_ANT move
+    #
+    #Parameters:
+    #   move - A valid MOVE_ANT move in board coordinates (Move)
+    #
+    #Return: The Ant that was moved (Ant)
+    ##
+    def moveAnt(self, move):
+        if self.recorder != None:
+            self.recorder.recordMove(self.state.whoseTurn, move)
+        startCoord = move.coordList[0]
+        endCoord = move.coordList[-1]
+
+        #take ant from start coord
+        antToMove = self.state.board[startCoord[0]][startCoord[1]].ant
+        #change ant's coords and hasMoved status
+        self.state.hashAnt(antToMove)
+        antToMove.coords = (endCoord[0], endCoord[1])
+        antToMove.hasMoved = True
+        self.state.noteAntMoved(antToMove, startCoord)
+        self.state.hashAnt(antToMove)
+        #remove ant from location
+        self.state.board[startCoord[0]][startCoord[1]].ant = None
+        #put ant at last loc in coordList
+        self.state.board[endCoord[0]][endCoord[1]].ant = antToMove
+        return antToMove
+
+    ##
+    #build
+    #Description: Builds an ant or tunnel for the current player
+    #
+    #Parameters:
+    #   move - A valid BUILD move in board coordinates (Move)
+    ##
+    def build(self, move):
+        if self.recorder != None:
+            self.recorder.recordMove(self.state.whoseTurn, move)
+        coord = move.coordList[0]
+        currentPlayerInv = self.state.inventories[self.state.whoseTurn]
+
+        #subtract the cost of the item from the player's food count
+        self.state.hashFood(self.state.whoseTurn)
+        if move.buildType == TUNNEL:
+            currentPlayerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
+            self.state.hashFood(self.state.whoseTurn)
+
+            tunnel = Building(coord, TUNNEL, self.state.whoseTurn)
+            self.state.board[coord[0]][coord[1]].constr = tunnel
+            currentPlayerInv.constrs.append(tunnel)
+            self.state.noteConstrAdded(tunnel)
+            self.state.hashConstr(tunnel)
+        else:
+            currentPlayerInv.foodCount -= UNIT_STATS[move.buildType][COST]
+            self.state.hashFood(self.state.whoseTurn)
+
+            ant = Ant(coord, move.buildType, self.state.whoseTurn)
+            ant.hasMoved = True
+            self.state.board[coord[0]][coord[1]].ant = ant
+            self.state.inventories[self.state.whoseTurn].ants.append(ant)
+            self.state.noteAntAdded(ant)
+            self.state.hashAnt(ant)
+
+    ##
+    #endTurn
+    #Description: Takes care of end of turn business for ants and
+    #   constructions and passes the turn to the other player
+    #
+    ##
+    def endTurn(self):
+        if self.recorder != None:
+            self.recorder.recordMove(self.state.whoseTurn, Move(END, None, None))
+        self.state.hashFood(self.state.whoseTurn)
+        for ant in self.state.inventories[self.state.whoseTurn].ants:
+            self.state.hashAnt(ant)
+            constrUnderAnt = self.state.board[ant.coords[0]][ant.coords[1]].constr
+            if constrUnderAnt != None:
+                #if constr is enemy's and ant hasnt moved, affect capture health of buildings
+                if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == self.state.whoseTurn:
+                    self.state.hashConstr(constrUnderAnt)
+                    constrUnderAnt.captureHealth -= 1
+                    if constrUnderAnt.captureHealth == 0 and constrUnderAnt.type != ANTHILL:
+                        constrUnderAnt.player = self.state.whoseTurn
+                        constrUnderAnt.captureHealth = CONSTR_STATS[constrUnderAnt.type][CAP_HEALTH]
+                    self.state.hashConstr(constrUnderAnt)
+                #have all worker ants on food sources gather food
+                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
+                    ant.carrying = True
+                #deposit carried food (only workers carry)
+                elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
+                    self.state.inventories[self.state.whoseTurn].foodCount += 1
+                    ant.carrying = False
+
+            #reset hasMoved on all ants of player
+            ant.hasMoved = False
+            self.state.hashAnt(ant)
+        self.state.hashFood(self.state.whoseTurn)
+
+        #switch whose turn it is
+        self.state.hashTurn()
+        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+        self.state.hashTurn()
+        self.numTurns += 1
+        if self.recorder != None:
+            self.recorder.recordTurn(self.numTurns, self.state)
+
+    ##
+    #listAttackCoords
+    #Description: Lists the (board) coordinates of the enemy ants that an ant
+    #   can attack
+    #
+    #Parameters:
+    #   attackingAnt - The ant that may attack (Ant)
+    #
+    #Return: A list of coordinates ((int,int)[])
+    ##
+    def listAttackCoords(self, attackingAnt):
+        attackCoords = []
+        opponentId = (self.state.whoseTurn + 1) % 2
+        for ant in self.state.inventories[opponentId].ants:
+            if self.isValidAttack(attackingAnt, ant.coords):
+                attackCoords.append(ant.coords)
+        return attackCoords
+
+    ##
+    #applyAttack
+    #Description: Damages the attacked ant, removing it if it dies
+    #
+    #Parameters:
+    #   attackingAnt - The Ant that is attacking (Ant)
+    #   attackCoord - The valid (board) coordinates being attacked ((int,int))
+    ##
+    def applyAttack(self, attackingAnt, attackCoord):
+        if self.recorder != None:
+            self.recorder.recordAttack(attackCoord)
+        opponentId = (self.state.whoseTurn + 1) % 2
+        #decrement ants health
+        attackedAnt = self.state.board[attackCoord[0]][attackCoord[1]].ant
+        self.state.hashAnt(attackedAnt)
+        attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
+
+        #check for dead ant
+        if attackedAnt.health <= 0:
+            #remove dead ant from board
+            self.state.board[attackCoord[0]][attackCoord[1]].ant = None
+            #remove dead ant from inventory
+            self.state.inventories[opponentId].ants.remove(attackedAnt)
+            self.state.noteAntRemoved(attackedAnt)
+        else:
+            self.state.hashAnt(attackedAnt)
+
+    ##
+    #isValidMove(Move)
+    #Description: Checks to see if the move is valid for the current player.
+    #
+    #Parameters:
+    #   move - The Move to check (Move)
+    #
+    #Returns: None if no move is given, true if the given move is valid, or false if the given move is invalid
+    ##
+    def isValidMove(self, move):
+        #check for no move
+        if move == None:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            return None
+
+        #check that the move is well-formed typewise (tuples, ints, etc)
+        if type(move) != Move:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("ERROR:  player did not supply an object of type 'Move'")
+            return False
+        if type(move.moveType) != int:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("       Move type must be an integer.")
+            return False
+        #for END type moves, lots we don't need to check
+        if move.moveType == END:
+            return True
+        if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("       The coordinate list is empty!")
+            return False
+        index = 0
+        for coord in move.coordList:
+            if (type(coord) != tuple):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " is not a tuple.")
+                return False
+            if (len(coord) != 2):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " has " + str(len(coord)) + "entries instead of 2.")
+                return False
+            if (type(coord[0]) != int) or (type(coord[1]) != int):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " contains a value that is not an int.")
+                return False
+            index += 1
+        if type(move.buildType) != type(None) and type(move.buildType) != int:
+            return False
+
+        #for MOVE_ANT and BUILD type moves
+        if move.moveType == MOVE_ANT:
+            firstCoord = move.coordList[0]
+            #check valid start location (good coords and ant ownership)
+            if self.checkMoveStart(firstCoord):
+                #get ant to move
+                antToMove = self.state.board[firstCoord[0]][firstCoord[1]].ant
+                movePoints = UNIT_STATS[antToMove.type][MOVEMENT]
+                previousCoord = None
+
+                index = 0
+                for coord in move.coordList:
+                    #if first runthough, need to set up previous coord
+                    if previousCoord == None:
+                        previousCoord = coord
+                        continue
+                    #if any to-coords are invalid, return invalid move
+                    if not self.checkMovePath(previousCoord, coord):
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Illegal movement path at index" + str(index))
+                        return False
+
+                    #subtract cost of loc from movement points
+                    constrAtLoc = self.state.board[coord[0]][coord[1]].constr
+                    if constrAtLoc == None or antToMove.type == DRONE:
+                        movePoints -= 1
+                    else:
+                        movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
+
+                    previousCoord = coord
+                    index += 1
+
+                #Check for Queen ant trying to leave her territory
+                if (antToMove.type == QUEEN):
+                    for coord in move.coordList:
+                        if (coord[1] == BOARD_LENGTH / 2 - 1) \
+                        or (coord[1] == BOARD_LENGTH / 2):
+                            self.errorReport("ERROR: Invalid Move: " + str(move))
+                            self.errorReport("       Queen ant may not leave her own territory")
+                            return False
+
+                #within movement range and hasn't moved yet?
+                if (movePoints < 0):
+                    self.errorReport("ERROR: Invalid Move: " + str(move))
+                    self.errorReport("       Ant has insufficient movement points for this move")
+                    return False
+                if antToMove.hasMoved:
+                    self.errorReport("ERROR: Invalid Move: " + str(move))
+                    self.errorReport("       Ant has already made a move this turn")
+                    return False
+                else:
+                    return True
+
+        elif move.moveType == BUILD:
+            #coord list must contain one point for build
+            if len(move.coordList) != 1:
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       for a BUILD move, the coordinate list should contain exactly 1 coordinate")
+                return False
+
+            buildCoord = move.coordList[0]
+            #check valid start location
+            if self.checkBuildStart(buildCoord):
+                #we're building either an ant or constr for sure
+
+                if self.state.board[buildCoord[0]][buildCoord[1]].ant == None:
+                #we know we're building an ant
+                    buildCost = None
+                    #check buildType for valid ant
+                    if move.buildType == WORKER:
+                        buildCost = UNIT_STATS[WORKER][COST]
+                    elif move.buildType == DRONE:
+                        buildCost = UNIT_STATS[DRONE][COST]
+                    elif move.buildType == SOLDIER:
+                        buildCost = UNIT_STATS[SOLDIER][COST]
+                    elif move.buildType == R_SOLDIER:
+                        buildCost = UNIT_STATS[R_SOLDIER][COST]
+                    else:
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
+                        return False
+
+                    #check the player has enough food
+                    currFood = self.state.inventories[self.state.whoseTurn].foodCount
+                    if currFood >= buildCost:
+                        self.notify("")
+                        return True
+                    else:
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Player has " + str(currFood) + " food but needs " + str(buildCost) + " to build this ant")
+                        self.notifyError("Requires " + str(buildCost) + " food.")
+                        return False
+                else:
+                #we know we're building a construction
+                    adjacentCoords = []
+                    adjacentCoords.append(addCoords(buildCoord, (0, -1)))
+                    adjacentCoords.append(addCoords(buildCoord, (0, 1)))
+                    adjacentCoords.append(addCoords(buildCoord, (-1, 0)))
+                    adjacentCoords.append(addCoords(buildCoord, (1, 0)))
+
+                    #check that there's no food in adjacent locations
+                    for aCoord in adjacentCoords:
+                        if aCoord[0] >= 0 and aCoord[0] < 10 and aCoord[1] >= 0 and aCoord[1] < 10:
+                            if (self.state.board[aCoord[0]][aCoord[1]].constr != None and
+                                    self.state.board[aCoord[0]][aCoord[1]].constr.type == FOOD):
+                                self.errorReport("ERROR: Invalid Move: " + str(move))
+                                self.errorReport("       Cannot tunnel build next to food.")
+                                self.notifyError("Cannot tunnel build next to food.")
+                                return False
+
+                    buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
+                    if self.state.inventories[self.state.whoseTurn].foodCount >= buildCost:
+                        self.notify("")
+                        return True
+                    else:
+                        self.notifyError("Requires "+ str(buildCost) + " food.")
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Must have at least " + str(buildCost) + " food to build a tunnel.")
+                        return False
+            else:  #invalid build start
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Build location invalid.  Possible cause:")
+                loc = self.state.board[buildCoord[0]][buildCoord[1]]
+                if loc.ant == None:  #building ant
+                    self.errorReport("         - Anthill does not belong to current player")
+                else:
+                    if (move.buildType != TUNNEL):
+                        self.errorReport("         - Anthill is already occupied")
+                    elif (loc.ant.hasMoved):
+                        self.errorReport("         - Worker ant has already moved this turn")
+                    else:
+                        self.errorReport("         - Worker ant does not belong to current player")
+        else:
+            #invalid numeric move type
+            return False
+
+    ##
+    #isValidPlacement
+    #Description: Checks that the given placement of Constructions is valid
+    #
+    #Paramters:
+    #   items - The items to place (Construction[])
+    #   targets - A list of the coordinates to place the items at ((int,int)[])
+    #
+    #Returns None if no target is given, true if it is a valid placement, or false if it is an invalid placement
+    ##
+    def isValidPlacement(self, items, targets):
+        #check for well-formed input of targets (from players)
+        if type(targets) == type(None) or type(targets) != list:
+            return False
+         #If no target, return None (human vs ai caught by caller)
+        if len(targets) == 0:
+            return None
+        for coord in targets:
+            if not self.isValidCoord(coord):
+                return False
+
+        for i in range(0, len(targets)):
+            #Nobody can place in the center two rows of the board or on their opponents side
+
+            #check item type
+            if items[i].type == ANTHILL or items[i].type == TUNNEL or items[i].type == GRASS:
+                #check targets[i] is within proper boundaries y-wise
+                #must be on own side
+                if not self.isInHomeTerritory(targets[i]):
+                    return False
+            #check item type
+            elif items[i].type == FOOD:
+                #check targets[i] is within proper boundaries y-wise
+                #must be on opponent's side
+                if not self.isInEnemyTerritory(targets[i]):
+                    return False
+            else:
+                #I don't know what this type is.
+                return False
+
+            #change target to access appropriate players locations
+            aTarget = self.state.coordLookup(targets[i], self.state.whoseTurn)
+            #make sure nothing is there yet
+            if not self.state.board[aTarget[0]][aTarget[1]].constr == None:
+                return False
+
+        return True
+
+    ##
+    #isValidAttack
+    #Description: Determines whether the attack with the given parameters is valid
+    #   Attacking ant is assured to exist and belong to the player whose turn it is
+    #
+    #Parameters:
+    #   attackingAnt - The Ant that is attacking (Ant)
+    #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
+    #
+    #Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
+    ##
+    def isValidAttack(self, attackingAnt, attackCoord):
+        if attackCoord == None:
+            return None
+
+        #check for well-formed input from players
+        if not self.isValidCoord(attackCoord):
+            return False
+
+        attackLoc = self.state.board[attackCoord[0]][attackCoord[1]]
+
+        if attackLoc.ant == None or attackLoc.ant.player == attackingAnt.player:
+            return False
+
+        #we know we have an enemy ant
+        range = UNIT_STATS[attackingAnt.type][RANGE]
+        diffX = abs(attackingAnt.coords[0] - attackCoord[0])
+        diffY = abs(attackingAnt.coords[1] - attackCoord[1])
+
+        #pythagoras would be proud
+        if range ** 2 >= diffX ** 2 + diffY ** 2:
+            #return True if within range
+            return True
+        else:
+            return False
+
+    ##
+    #isValidCoord
+    #Description: Retruns whether this coord represents a valid board location.
+    #
+    #Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    #Returns: True if the coordinate is between (0,0) and (9,9)
+    ##
+    def isValidCoord(self, coord):
+        #check for well-formed coord
+        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
+            return False
+
+        #check boundaries
+        if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
+            return False
+
+        return True
+
+    ##
+    # isInHomeTerritory
+    #
+    # Description: determines whether the position is in the player's
+    # home territory
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if it is and False otherwise
+    #
+    ##
+    def isInHomeTerritory(self, coord):
+        if not self.isValidCoord(coord):
+            return False
+        if not (coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1):
+            return False
+        return True
+
+    ##
+    # isInEnemyTerritory
+    #
+    # Description: determines whether the position is in the player's
+    # enemy's territory
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if it is and False otherwise
+    #
+    ##
+    def isInEnemyTerritory(self, coord):
+        if not self.isValidCoord(coord):
+            return False
+        if not (coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1):
+            return False
+        return True
+
+    ##
+    #checkMoveStart
+    #Description: Checks if the location is valid to move from.
+    #  (bounds and ant ownership)
+    #
+    #Parameters:
+    #   coord - The starting point for the move ((int, int))
+    #
+    #Returns: True if it is a valid starting point for a move and false if not
+    ##
+    def checkMoveStart(self, coord):
+        #check location is on board
+        if self.isValidCoord(coord):
+            antToMove = self.state.board[coord[0]][coord[1]].ant
+            #check that an ant exists at the loc
+            if antToMove != None:
+                #check that it's the player's ant and that it hasn't moved
+                if antToMove.player == self.state.whoseTurn and not antToMove.hasMoved:
+                    return True
+
+        return False
+
+    ##
+    #checkMovePath
+    #Description: Checks if the location is valid to move to.
+    #  (clear path, adjacent locations)
+    #
+    #Parameters:
+    #   fromCoord - The Ant's current coordinate ((int, int))
+    #   toCoord - The coorinate to move the Ant to ((int, int))
+    #
+    #Returns: True if it is a valid move and false otherwise
+    #
+    #Note: fromCoord must always have been checked by the time it's passed
+    #  (either in checkMoveStart or previous checkMovePath call)
+    ##
+    def checkMovePath(self, fromCoord, toCoord):
+        #check location is on board
+        if self.isValidCoord(toCoord):
+            #check that squares are adjacent (difference on only one axis is 1)
+            if ((abs(fromCoord[0] - toCoord[0]) == 1 and abs(fromCoord[1] - toCoord[1]) == 0) or
+                    (abs(fromCoord[0] - toCoord[0]) == 0 and abs(fromCoord[1] - toCoord[1]) == 1)):
+                antAtLoc = self.state.board[toCoord[0]][toCoord[1]].ant
+                #check if an ant exists at the loc
+                if antAtLoc ==  None:
+                    return True
+
+        return False
+
+    ##
+    #checkBuildStart
+    #Description: Checks if the location is valid to build from.
+    #  (bounds and building ownership)
+    #
+    #Parameters:
+    #   coord - The coordinate trying to be used to build ((int, int))
+    #
+    #Returns: True if it is a valid build location and false otherwise
+    ##
+    def checkBuildStart(self, coord):
+        #check location is on board
+        if self.isValidCoord(coord):
+            loc = self.state.board[coord[0]][coord[1]]
+            #check that an empty anthill exists at the loc
+            if loc.constr != None and loc.constr.type == ANTHILL and loc.ant == None:
+                #check that it's the player's anthill
+                if loc.constr.player == self.state.whoseTurn:
+                    return True
+            #check that an ant exists at an empty location
+            elif loc.ant != None and loc.ant.type == WORKER and loc.constr == None:
+                #check that it's the player's ant and it hasn't moved
+                if loc.ant.player == self.state.whoseTurn and not loc.ant.hasMoved:
+                    return True
+
+        return False
+
+    ##
+    #hasWon(int)
+    #Description: Determines whether the game has ended in victory for the given player.
+    #
+    #Parameters:
+    #   playerId - The ID of the player being checked for winning (int)
+    #
+    #Returns: True if the player with playerId has won the game.
+    ##
+    def hasWon(self, playerId):
+        opponentId = (playerId + 1) % 2
+
+        if ((self.state.phase == PLAY_PHASE) and
+        ((self.state.inventories[opponentId].getQueen() == None) or
+        (self.state.inventories[opponentId].getAnthill().captureHealth <= 0) or
+        (self.state.inventories[playerId].foodCount >= FOOD_GOAL))):
+            return True
+        else:
+            return False
+
+
+#Kinds of changes recorded by applyMove (see undoMove)
+UNDO_ANT = 0
+UNDO_ADD_ANT = 1
+UNDO_REMOVE_ANT = 2
+UNDO_CONSTR = 3
+UNDO_ADD_CONSTR = 4
+UNDO_FOOD = 5
+UNDO_TURN = 6
+
+##
+#applyMove
+#Description: Makes a move in a state in place, following the same rules as
+#   the GameEngine, and returns what undoMove needs to take it back.  This
+#   lets a search walk the game tree with a single state instead of cloning
+#   one for every child.  The state needs no board (see GameState.fastclone),
+#   but if it has one the board is kept up to date too, as are the state's
+#   index and hash.
+#
+#Parameters:
+#   state - The state to change (GameState)
+#   move - A valid Move for the player whose turn it is (Move)
+#   attackCoord - Where a moved ant with an enemy in range attacks.  None
+#       attacks the first enemy in range (int,int)
+#
+#Return: An undo record for undoMove
+##
+def applyMove(state, move, attackCoord=None):
+    #the changes in the order they were made
+    changes = []
+    record = (state.hash, changes)
+    me = state.whoseTurn
+
+    if move.moveType == MOVE_ANT:
+        startCoord = move.coordList[0]
+        endCoord = move.coordList[-1]
+        ant = state.getAntAt(startCoord)
+        changes.append((UNDO_ANT, ant, ant.coords, ant.hasMoved, ant.carrying, ant.health))
+        state.hashAnt(ant)
+        ant.coords = (endCoord[0], endCoord[1])
+        ant.hasMoved = True
+        state.noteAntMoved(ant, startCoord)
+        state.hashAnt(ant)
+        if state.board != None:
+            state.board[startCoord[0]][startCoord[1]].ant = None
+            state.board[endCoord[0]][endCoord[1]].ant = ant
+        applyAttack(state, ant, attackCoord, changes)
+
+    elif move.moveType == BUILD:
+        coord = move.coordList[0]
+        inventory = state.inventories[me]
+        changes.append((UNDO_FOOD, me, inventory.foodCount))
+        state.hashFood(me)
+        if move.buildType == TUNNEL:
+            inventory.foodCount -= CONSTR_STATS[TUNNEL][BUILD_COST]
+            tunnel = Building(coord, TUNNEL, me)
+            inventory.constrs.append(tunnel)
+            changes.append((UNDO_ADD_CONSTR, tunnel, me))
+            state.noteConstrAdded(tunnel)
+            state.hashConstr(tunnel)
+            if state.board != None:
+                state.board[coord[0]][coord[1]].constr = tunnel
+        else:
+            inventory.foodCount -= UNIT_STATS[move.buildType][COST]
+            ant = Ant(coord, move.buildType, me)
+            ant.hasMoved = True
+            inventory.ants.append(ant)
+            changes.append((UNDO_ADD_ANT, ant, me))
+            state.noteAntAdded(ant)
+            state.hashAnt(ant)
+            if state.board != None:
+                state.board[coord[0]][coord[1]].ant = ant
+        state.hashFood(me)
+
+    elif move.moveType == END:
+        inventory = state.inventories[me]
+        changes.append((UNDO_FOOD, me, inventory.foodCount))
+        state.hashFood(me)
+        for ant in inventory.ants:
+            changes.append((UNDO_ANT, ant, ant.coords, ant.hasMoved, ant.carrying, ant.health))
+            state.hashAnt(ant)
+            constrUnderAnt = state.getConstrAt(ant.coords)
+            if constrUnderAnt != None:
+                #ants that stay on an enemy building wear it down
+                if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == me:
+                    changes.append((UNDO_CONSTR, constrUnderAnt, constrUnderAnt.player, constrUnderAnt.captureHealth))
+                    state.hashConstr(constrUnderAnt)
+                    constrUnderAnt.captureHealth -= 1
+                    if constrUnderAnt.captureHealth == 0 and constrUnderAnt.type != ANTHILL:
+                        constrUnderAnt.player = me
+                        constrUnderAnt.captureHealth = CONSTR_STATS[constrUnderAnt.type][CAP_HEALTH]
+                    state.hashConstr(constrUnderAnt)
+                #workers on food pick it up
+                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
+                    ant.carrying = True
+                #and drop it off at anthills and tunnels
+                elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
+                    inventory.foodCount += 1
+                    ant.carrying = False
+            ant.hasMoved = False
+            state.hashAnt(ant)
+        state.hashFood(me)
+        changes.append((UNDO_TURN, me))
+        state.hashTurn()
+        state.whoseTurn = (me + 1) % 2
+        state.hashTurn()
+
+    return record
+
+##
+#applyAttack
+#Description: The attack part of applyMove.  Damages an enemy in range of
+#   an ant that just moved, removing it if it dies.
+#
+#Parameters:
+#   state - The state to change (GameState)
+#   attackingAnt - The ant that moved (Ant)
+#   attackCoord - Where to attack, or None for the first enemy in range (int,int)
+#   changes - The changes made so far, which this adds to
+##
+def applyAttack(state, attackingAnt, attackCoord, changes):
+    opponentId = (attackingAnt.player + 1) % 2
+    range = UNIT_STATS[attackingAnt.type][RANGE]
+    attackedAnt = None
+    if attackCoord != None:
+        attackedAnt = state.getAntAt(attackCoord)
+    else:
+        for ant in state.inventories[opponentId].ants:
+            diffX = attackingAnt.coords[0] - ant.coords[0]
+            diffY = attackingAnt.coords[1] - ant.coords[1]
+            if range ** 2 >= diffX ** 2 + diffY ** 2:
+                attackedAnt = ant
+                break
+    if attackedAnt == None:
+        return
+
+    changes.append((UNDO_ANT, attackedAnt, attackedAnt.coords, attackedAnt.hasMoved,
+                    attackedAnt.carrying, attackedAnt.health))
+    state.hashAnt(attackedAnt)
+    attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
+    if attackedAnt.health > 0:
+        state.hashAnt(attackedAnt)
+        return
+
+    #the ant is dead
+    ants = state.inventories[opponentId].ants
+    index = ants.index(attackedAnt)
+    del ants[index]
+    changes.append((UNDO_REMOVE_ANT, attackedAnt, opponentId, index))
+    state.noteAntRemoved(attackedAnt)
+    if state.board != None:
+        state.board[attackedAnt.coords[0]][attackedAnt.coords[1]].ant = None
+
+##
+#undoMove
+#Description: Takes back a move made by applyMove, leaving the state exactly
+#   as it was.  Moves must be taken back in the reverse order they were made.
+#
+#Parameters:
+#   state - The state the move was made in (GameState)
+#   record - The undo record that applyMove returned
+##
+def undoMove(state, record):
+    oldHash, changes = record
+    #the hash is put back all at once, the feature totals change by change
+    values = state.featureValues
+    for change in reversed(changes):
+        kind = change[0]
+        if kind == UNDO_ANT:
+            ant = change[1]
+            if values != None:
+                values.toggleAnt(ant)
+            oldCoords = ant.coords
+            if state.board != None and oldCoords != change[2] and \
+               state.board[oldCoords[0]][oldCoords[1]].ant is ant:
+                state.board[oldCoords[0]][oldCoords[1]].ant = None
+                state.board[change[2][0]][change[2][1]].ant = ant
+            ant.coords = change[2]
+            ant.hasMoved = change[3]
+            ant.carrying = change[4]
+            ant.health = change[5]
+            if values != None:
+                values.toggleAnt(ant)
+            if oldCoords != ant.coords:
+                state.noteAntMoved(ant, oldCoords)
+        elif kind == UNDO_ADD_ANT:
+            ant = change[1]
+            if values != None:
+                values.toggleAnt(ant)
+            state.inventories[change[2]].ants.remove(ant)
+            state.noteAntRemoved(ant)
+            if state.board != None:
+                state.board[ant.coords[0]][ant.coords[1]].ant = None
+        elif kind == UNDO_REMOVE_ANT:
+            ant = change[1]
+            state.inventories[change[2]].ants.insert(change[3], ant)
+            state.noteAntAdded(ant)
+            if values != None:
+                values.toggleAnt(ant)
+            if state.board != None:
+                state.board[ant.coords[0]][ant.coords[1]].ant = ant
+        elif kind == UNDO_CONSTR:
+            if values != None:
+                values.toggleConstr(change[1])
+            change[1].player = change[2]
+            change[1].captureHealth = change[3]
+            if values != None:
+                values.toggleConstr(change[1])
+        elif kind == UNDO_ADD_CONSTR:
+            constr = change[1]
+            if values != None:
+                values.toggleConstr(constr)
+            state.inventories[change[2]].constrs.remove(constr)
+            state.noteConstrRemoved(constr)
+            if state.board != None:
+                state.board[constr.coords[0]][constr.coords[1]].constr = None
+        elif kind == UNDO_FOOD:
+            state.inventories[change[1]].foodCount = change[2]
+            if values != None:
+                values.toggleFood(change[1])
+        elif kind == UNDO_TURN:
+            state.whoseTurn = change[1]
+    state.hash = oldHash
+    #the changes were put back without the hash hooks
+    state.version += 1
+
+
+##
+#loadAIs
+#Description: Creates an instance of every AIPlayer in the AI subdirectory
+#
+#Parameters:
+#   aiDir - the directory to load the AIs from (string)
+#
+#Return: A list of AIPlayers (Player[])
+##
+def loadAIs(aiDir="AI"):
+    players = []
+    #Add the AI directory in python's import search order.
+    if aiDir not in sys.path:
+        sys.path.insert(0, aiDir)
+    for file in sorted(os.listdir(aiDir)):
+        if re.match(".*\.py$", file):
+            module = __import__(file[:-3])
+            players.append(module.AIPlayer(-1))
+    return players
+
+##
+#playRoundRobin
+#Description: Plays every pairing of the given players a number of times
+#   and tallies the results
+#
+#Parameters:
+#   players - The players taking part (Player[])
+#   numGames - The number of games to play per pairing (int)
+#   engine - The GameEngine to play the games on (GameEngine)
+#   seed - If given, each game is seeded with seed + the number of games
+#       played before it, as in Tournament.scheduleGames (int)
+#
+#Return: The scores of the players as [[author, wins, losses], ...] in the
+#   same order as players
+##
+def playRoundRobin(players, numGames, engine, seed=None):
+    playerScores = [[player.author, 0, 0] for player in players]
+    gameSeed = seed
+    for i in range(0, len(players)):
+        for j in range(i + 1, len(players)):
+            for game in range(0, numGames):
+                result = engine.play(players[i], players[j], seed=gameSeed)
+                if seed != None:
+                    gameSeed += 1
+                if result.winner == None:
+                    continue
+                #translate the seats back to indexes into players
+                indexes = (i, j)
+                playerScores[indexes[result.winner]][1] += 1
+                playerScores[indexes[result.loser]][2] += 1
+    return playerScores
+
+##
+#printScores
+#Description: Prints a table of the tournament results
+#
+#Parameters:
+#   playerScores - The scores as [[author, wins, losses], ...]
+##
+def printScores(playerScores):
+    print "%-24s %8s %8s" % ("AI", "Wins", "Losses")
+    for author, wins, losses in playerScores:
+        print "%-24s %8d %8d" % (author[:24], wins, losses)
+
+##
+#main
+#Description: Plays a round robin tournament between AIs without the user
+#   interface and prints the results.  Usage:
+#       python GameEngine.py [-n <numGames>] [-s <seed>] [-q] [-t] [-j <processes>] [-l <log>]
+#                            [-p <profile> [--profile-memory]] [<AI author> ...]
+#   If no authors are given every AI in the AI directory takes part.  With
+#   -j the games are spread across that many processes (0 = one per core).
+#   With -t each AI is sandboxed in a process of its own and forfeits the
+#   game if it takes longer than AI_MOVE_TIMEOUT to answer.  With -l every
+#   game is appended to a log that GameRecord.py can replay.  With -p the
+#   time spent in each player's calls and the engine's checks of them is
+#   written to a JSON (or, if the name ends in .csv, CSV) file.
+##
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Play headless AI vs. AI games.")
+    parser.add_argument("authors", nargs="*", help="authors of the AIs to play (default: all)")
+    parser.add_argument("-n", "--num-games", type=int, default=1, help="games per pairing")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="random seed")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print AI errors")
+    parser.add_argument("-t", "--sandbox", action="store_true",
+                        help="run each AI in its own process and enforce AI_MOVE_TIMEOUT")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="play games in parallel on this many processes (0 = one per core)")
+    parser.add_argument("-l", "--log", default=None, help="append a record of each game to this file")
+    parser.add_argument("-p", "--profile", default=None,
+                        help="write the time spent in each call to this JSON or CSV file")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="record how much each call raises the peak memory use too (Unix only)")
+    args = parser.parse_args(argv)
+
+    if args.seed != None:
+        random.seed(args.seed)
+
+    players = loadAIs()
+    if args.authors:
+        selected = []
+        for author in args.authors:
+            matches = [player for player in players if player.author == author]
+            if not matches:
+                print "ERROR:  AI '" + author + "' not found."
+                print "Please specify one of the following:"
+                for player in players:
+                    print '    "' + player.author + '"'
+                return 1
+            #use a fresh instance so an AI can play against itself
+            selected.append(matches[0].__class__(-1))
+        players = selected
+    if len(players) < 2:
+        print "ERROR:  at least two AIs are needed to play."
+        return 1
+
+    profiler = None
+    if args.profile != None:
+        profiler = Profiler(args.profile_memory)
+    startTime = time.time()
+    if args.processes != None:
+        import Tournament
+        processes = args.processes if args.processes > 0 else None
+        playerScores = Tournament.runRoundRobin(players, args.num_games, processes, args.seed, args.sandbox,
+                                                args.log, profiler)
+    else:
+        if args.sandbox:
+            players = [PlayerProcess(player) for player in players]
+        recorder = None
+        if args.log != None:
+            from GameRecord import GameRecorder
+            recorder = GameRecorder(args.log)
+        playerScores = playRoundRobin(players, args.num_games, GameEngine(not args.quiet, recorder, profiler),
+                                      args.seed)
+        if args.sandbox:
+            for player in players:
+                player.stop()
+    printScores(playerScores)
+    if profiler != None:
+        profiler.export(args.profile)
+    print "Played in %.2f seconds" % (time.time() - startTime)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
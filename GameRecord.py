@@ -0,0 +1,302 @@
+import os, sys, json
+from Constants import *
+from Move import Move
+from PackedState import PackedState
+from GameEngine import GameEngine
+
+#
+# GameRecord.py
+#
+# Records games to a log and replays them.  A log holds any number of
+# games, one after the other, with one JSON list per line:
+#   ["start", version, [author 1, author 2], seed]
+#   ["place", player, [[x, y], ...]]        setup placements
+#   ["move", player, moveType, [[x, y], ...] or null, buildType]
+#   ["attack", [x, y]]                      the attack after the last move
+#   ["snapshot", turn, packed state in hex] the state at the start of a turn
+#   ["error", errorCode, description]       the error that ended the game
+#   ["end", winner, reason, number of moves]
+# All coordinates are board coordinates, as GameEngine.state has them, not
+# flipped for player two.  A turn ends with each END move, and turn 0 starts
+# when the play phase does.
+#
+# Only moves the engine accepted are recorded, so replaying them with the
+# engine rebuilds every state of the game.  Snapshots are taken every
+# SNAPSHOT_INTERVAL turns, so a state is rebuilt from the nearest one
+# instead of from the start.  Usage:
+#     python GameRecord.py <log> [-g <game>] [-t <turn>]
+#
+
+#The version of the log format
+RECORD_VERSION = 1
+
+#How often the state is snapshotted, in turns
+SNAPSHOT_INTERVAL = 10
+
+##
+#encodeMove / decodeMove
+#Description: Convert a Move to and from the lists it is logged as
+##
+def encodeMove(playerId, move):
+    coordList = None
+    if move.coordList != None:
+        coordList = [list(coords) for coords in move.coordList]
+    return ["move", playerId, move.moveType, coordList, move.buildType]
+
+def decodeMove(entry):
+    coordList = entry[3]
+    if coordList != None:
+        coordList = [tuple(coords) for coords in coordList]
+    return Move(entry[2], coordList, entry[4])
+
+##
+#GameRecorder
+#Description: Records the games a GameEngine plays (see GameEngine.recorder).
+#   Each game is kept in memory and appended to the log in one write when
+#   it ends, so processes playing games in parallel can share a log.
+#
+#Variables:
+#   path - The log to append to (string)
+#   snapshotInterval - How often to snapshot the state, in turns (int)
+#   lines - The lines of the game being recorded
+##
+class GameRecorder(object):
+
+    ##
+    #__init__
+    #Description: Creates a new GameRecorder
+    #
+    #Parameters:
+    #   path - see above (string)
+    #   snapshotInterval - see above (int)
+    ##
+    def __init__(self, path, snapshotInterval=SNAPSHOT_INTERVAL):
+        self.path = path
+        self.snapshotInterval = snapshotInterval
+        self.lines = []
+
+    ##
+    #record
+    #Description: Adds an entry to the game being recorded
+    #
+    #Parameters:
+    #   entry - The entry (list)
+    ##
+    def record(self, entry):
+        self.lines.append(json.dumps(entry, separators=(',', ':')) + "\n")
+
+    ##
+    #startGame
+    #Description: Starts recording a game
+    #
+    #Parameters:
+    #   authors - The authors of player one and two ([str, str])
+    #   seed - The random seed the game was played with, or None (int)
+    ##
+    def startGame(self, authors, seed):
+        self.lines = []
+        self.record(["start", RECORD_VERSION, authors, seed])
+
+    def recordPlacement(self, playerId, targets):
+        self.record(["place", playerId, [list(coords) for coords in targets]])
+
+    def recordMove(self, playerId, move):
+        self.record(encodeMove(playerId, move))
+
+    def recordAttack(self, coords):
+        self.record(["attack", list(coords)])
+
+    ##
+    #recordTurn
+    #Description: Notes the start of a turn, snapshotting the state every
+    #   snapshotInterval turns
+    #
+    #Parameters:
+    #   turn - The number of the turn (int)
+    #   state - The state at the start of the turn (GameState)
+    ##
+    def recordTurn(self, turn, state):
+        if turn % self.snapshotInterval == 0:
+            self.record(["snapshot", turn, str(PackedState(state).data).encode("hex")])
+
+    def recordError(self, errorCode, info):
+        self.record(["error", errorCode, str(info)])
+
+    ##
+    #endGame
+    #Description: Appends the game to the log
+    #
+    #Parameters:
+    #   winner - The id of the winner, or None for a draw (int)
+    #   reason - The error code that ended the game, or None (int)
+    #   numMoves - The number of moves made in the play phase (int)
+    ##
+    def endGame(self, winner, reason, numMoves):
+        self.record(["end", winner, reason, numMoves])
+        #a single write to a file opened for appending is never split up
+        #by the writes of other processes
+        logFile = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0644)
+        try:
+            os.write(logFile, "".join(self.lines))
+        finally:
+            os.close(logFile)
+        self.lines = []
+
+##
+#GameLog
+#Description: A recorded game read back from a log
+#
+#Variables:
+#   authors - The authors of player one and two ([str, str])
+#   seed - The random seed the game was played with, or None (int)
+#   winner - The id of the winner, or None for a draw or unfinished game
+#   reason - The error code that ended the game, or None (int)
+#   numMoves - The number of moves made in the play phase, or None if the
+#       game didn't finish
+#   error - The description of the error that ended the game, or None
+#   entries - The entries of the game, as logged (list[])
+#   snapshots - The (turn, index of the entry) of each snapshot
+#   numTurns - The number of turns that were started
+##
+class GameLog(object):
+
+    ##
+    #__init__
+    #Description: Creates a GameLog from its entries
+    #
+    #Parameters:
+    #   entries - The entries, starting with the "start" entry (list[])
+    ##
+    def __init__(self, entries):
+        self.authors = entries[0][2]
+        self.seed = entries[0][3]
+        self.winner = None
+        self.reason = None
+        self.numMoves = None
+        self.error = None
+        self.entries = entries
+        self.snapshots = []
+        self.numTurns = 0
+        for index in xrange(0, len(entries)):
+            entry = entries[index]
+            if entry[0] == "snapshot":
+                self.snapshots.append((entry[1], index))
+            elif entry[0] == "move" and entry[2] == END:
+                self.numTurns += 1
+            elif entry[0] == "error":
+                self.error = entry[2]
+            elif entry[0] == "end":
+                self.winner, self.reason, self.numMoves = entry[1:4]
+        if len(self.snapshots) > 0:
+            #turn 0 is started with the play phase, not with an END
+            self.numTurns += 1
+
+    ##
+    #getState
+    #Description: Rebuilds the state of the game at the start of a turn by
+    #   replaying it from the last snapshot before the turn
+    #
+    #Parameters:
+    #   turn - The turn, or None for the end of the game (int)
+    #
+    #Return: The state (GameState)
+    ##
+    def getState(self, turn=None):
+        engine = GameEngine(False)
+        start = 0
+        for snapshotTurn, index in self.snapshots:
+            if turn != None and snapshotTurn > turn:
+                break
+            start = index
+            engine.numTurns = snapshotTurn
+        if start > 0:
+            engine.state = PackedState(data=bytearray(self.entries[start][2].decode("hex"))).toGameState()
+            start += 1
+        else:
+            engine.state.setPhase(SETUP_PHASE_1)
+
+        #as in GameEngine.playSetup and playMoves
+        constrsToPlace = engine.homeConstrs(PLAYER_ONE)
+        movedAnt = None
+        for entry in self.entries[start:]:
+            if turn != None and engine.numTurns == turn and engine.state.phase == PLAY_PHASE:
+                break
+            kind = entry[0]
+            if kind == "place":
+                whoseTurn = engine.state.whoseTurn
+                #placeConstrs takes the coordinates as the player sees them
+                engine.placeConstrs(constrsToPlace, [engine.state.coordLookup(tuple(coords), whoseTurn)
+                                                     for coords in entry[2]])
+                if not constrsToPlace:
+                    constrsToPlace = engine.nextSetupConstrs()
+            elif kind == "move":
+                move = decodeMove(entry)
+                if move.moveType == MOVE_ANT:
+                    movedAnt = engine.moveAnt(move)
+                elif move.moveType == BUILD:
+                    engine.build(move)
+                elif move.moveType == END:
+                    engine.endTurn()
+            elif kind == "attack":
+                engine.applyAttack(movedAnt, tuple(entry[1]))
+        return engine.state
+
+##
+#readGameLogs
+#Description: Reads the games in a log one at a time, so logs of many
+#   games can be searched without holding them all
+#
+#Parameters:
+#   path - The log (string)
+#
+#Return: A generator of GameLogs.  A game that was cut off by the end of
+#   the log is left out.
+##
+def readGameLogs(path):
+    entries = None
+    with open(path) as logFile:
+        for line in logFile:
+            entry = json.loads(line)
+            if entry[0] == "start":
+                entries = []
+            if entries == None:
+                continue
+            entries.append(entry)
+            if entry[0] == "end":
+                yield GameLog(entries)
+                entries = None
+
+##
+#main
+#Description: Prints the games in a log, or the state of one of them at the
+#   start of a turn (see the top of this file)
+##
+def main(argv):
+    import argparse
+    from AIPlayerUtils import asciiPrintState
+    parser = argparse.ArgumentParser(description="Replay recorded games.")
+    parser.add_argument("log", help="the log to read")
+    parser.add_argument("-g", "--game", type=int, default=None, help="the game to replay, from 0")
+    parser.add_argument("-t", "--turn", type=int, default=None,
+                        help="the turn to show the start of (default: the end of the game)")
+    args = parser.parse_args(argv)
+
+    for index, game in enumerate(readGameLogs(args.log)):
+        if args.game == None:
+            outcome = "draw"
+            if game.winner != None:
+                outcome = game.authors[game.winner] + " won"
+            if game.error != None:
+                outcome += " (" + game.error.replace("\n", " ") + ")"
+            print "%d: %s vs %s, %s after %d turns" % \
+                (index, game.authors[PLAYER_ONE], game.authors[PLAYER_TWO], outcome, game.numTurns)
+        elif index == args.game:
+            asciiPrintState(game.getState(args.turn))
+            return 0
+    if args.game != None:
+        print "ERROR:  the log has no game " + str(args.game) + "."
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -2,7 +2,9 @@ import copy
 from Constants import *
 from Inventory import Inventory
 from Building import Building
+from Construction import CONSTR_STATS
 from Location import *
+import Zobrist
 
 def addCoords(tuple1, tuple2):
     if len(tuple1) != len(tuple2):
@@ -26,6 +28,18 @@ def subtractCoords(tuple1, tuple2):
 #   inventories - A tuple containing the Inventory for each player.
 #   phase - The current phase of the game.
 #    whoseTurn - The ID of the Player who's turn it currently is.
+#   antIndex - Maps coords to the ant there, or None if the state isn't indexed
+#       (see buildIndex).
+#   constrIndex - Maps coords to the construction there, or None if the state
+#       isn't indexed.
+#   distanceTable - The distances between cells for this state's terrain, or
+#       None until it is needed (see AIPlayerUtils.getDistanceTable)
+#   hash - The Zobrist hash of the state, or None until it is needed (see getHash)
+#   featureValues - The totals of a FeatureEvaluation's features for this
+#       state, or None until the state is scored (see FeatureEvaluation.getValues)
+#   version - Goes up each time the state is changed (see hashAnt, setPhase
+#       and GameEngine.undoMove), so copies of it can tell when they are out
+#       of date (see GameEngine.playerView)
 ##
 class GameState(object):
 
@@ -45,6 +59,13 @@ class GameState(object):
         self.inventories = inputInventories
         self.phase = inputPhase
         self.whoseTurn = inputTurn
+        #only built for states that ask for it (see buildIndex)
+        self.antIndex = None
+        self.constrIndex = None
+        self.distanceTable = None
+        self.hash = None
+        self.featureValues = None
+        self.version = 0
 
     ##
     #coordLookup
@@ -78,7 +99,245 @@ class GameState(object):
                 ant.coords = self.coordLookup(ant.coords, PLAYER_TWO)
             for constr in inv.constrs:
                 constr.coords = self.coordLookup(constr.coords, PLAYER_TWO)
+        self.invalidateIndex()
+        self.distanceTable = None
+        self.hash = None
+        self.featureValues = None
+        self.version += 1
+
+    ##
+    #buildIndex
+    #Description: Indexes the ants and constructions in the inventories by
+    #   their coords, so getAntAt and getConstrAt don't have to search them.
+    #   Works without a board, so fastclone states can have it too, and
+    #   fastclone copies it.
+    #
+    #   Only index a state whose every change goes through the engine,
+    #   GameEngine.applyMove or the note* methods below.  Code that moves an
+    #   ant by setting its coords leaves the index wrong.  The states the
+    #   engine gives to players aren't indexed, so AIs that change them
+    #   directly get the right answers.
+    ##
+    def buildIndex(self):
+        self.antIndex = {}
+        self.constrIndex = {}
+        for inv in self.inventories:
+            for ant in inv.ants:
+                self.antIndex.setdefault(tuple(ant.coords), ant)
+            for constr in inv.constrs:
+                self.constrIndex.setdefault(tuple(constr.coords), constr)
+
+    ##
+    #invalidateIndex
+    #Description: Throws the index away, so lookups search the inventories
+    #   again.  Call this after changing an indexed state in a way the note*
+    #   methods below don't cover.
+    #
+    ##
+    def invalidateIndex(self):
+        self.antIndex = None
+        self.constrIndex = None
+
+    ##
+    #getAntAt
+    #Description: Returns the ant at the given coords, in constant time if
+    #   the state is indexed.  An index that turns out to be out of date is
+    #   thrown away.
+    #
+    #Parameters:
+    #   coords - The coords to look at ((int,int))
+    #
+    #Return: The Ant at coords or None if there is none
+    ##
+    def getAntAt(self, coords):
+        if type(coords) is not tuple:
+            coords = tuple(coords)
+        if self.antIndex != None:
+            ant = self.antIndex.get(coords)
+            if ant == None or tuple(ant.coords) == coords:
+                return ant
+            self.invalidateIndex()
+        for inv in self.inventories:
+            for ant in inv.ants:
+                if tuple(ant.coords) == coords:
+                    return ant
+        return None
+
+    ##
+    #getConstrAt
+    #Description: Like getAntAt, for constructions
+    #
+    #Parameters:
+    #   coords - The coords to look at ((int,int))
+    #
+    #Return: The Construction at coords or None if there is none
+    ##
+    def getConstrAt(self, coords):
+        if type(coords) is not tuple:
+            coords = tuple(coords)
+        if self.constrIndex != None:
+            constr = self.constrIndex.get(coords)
+            if constr == None or tuple(constr.coords) == coords:
+                return constr
+            self.invalidateIndex()
+        for inv in self.inventories:
+            for constr in inv.constrs:
+                if tuple(constr.coords) == coords:
+                    return constr
+        return None
+
+    ##
+    #noteAntMoved
+    #Description: Keeps the index up to date after an ant's coords changed
+    #
+    #Parameters:
+    #   ant - The Ant that moved (Ant)
+    #   oldCoords - Where the ant was before ((int,int))
+    ##
+    def noteAntMoved(self, ant, oldCoords):
+        if self.antIndex == None:
+            return
+        oldCoords = tuple(oldCoords)
+        if self.antIndex.get(oldCoords) is ant:
+            del self.antIndex[oldCoords]
+        self.antIndex[tuple(ant.coords)] = ant
+
+    ##
+    #noteAntAdded
+    #Description: Keeps the index up to date after an ant was added to an inventory
+    #
+    #Parameters:
+    #   ant - The new Ant (Ant)
+    ##
+    def noteAntAdded(self, ant):
+        if self.antIndex != None:
+            self.antIndex[tuple(ant.coords)] = ant
+
+    ##
+    #noteAntRemoved
+    #Description: Keeps the index up to date after an ant was removed from an inventory
+    #
+    #Parameters:
+    #   ant - The removed Ant (Ant)
+    ##
+    def noteAntRemoved(self, ant):
+        if self.antIndex == None:
+            return
+        coords = tuple(ant.coords)
+        if self.antIndex.get(coords) is ant:
+            del self.antIndex[coords]
+
+    ##
+    #noteConstrAdded
+    #Description: Keeps the index up to date after a construction was added
+    #   to an inventory
+    #
+    #Parameters:
+    #   constr - The new Construction (Construction)
+    ##
+    def noteConstrAdded(self, constr):
+        if self.constrIndex != None:
+            self.constrIndex.setdefault(tuple(constr.coords), constr)
+        #only constructions that change the cost of moving change distances
+        if CONSTR_STATS[constr.type][MOVE_COST] != 1:
+            self.distanceTable = None
+
+    ##
+    #noteConstrRemoved
+    #Description: Keeps the index up to date after a construction was
+    #   removed from an inventory
+    #
+    #Parameters:
+    #   constr - The removed Construction (Construction)
+    ##
+    def noteConstrRemoved(self, constr):
+        if self.constrIndex != None:
+            coords = tuple(constr.coords)
+            if self.constrIndex.get(coords) is constr:
+                del self.constrIndex[coords]
+        if CONSTR_STATS[constr.type][MOVE_COST] != 1:
+            self.distanceTable = None
       
+    ##
+    #getHash
+    #Description: Returns the Zobrist hash of the state.  It is computed the
+    #   first time it is needed and then kept up to date by the code that
+    #   changes the state (see hashAnt below).
+    #
+    #Return: The hash (int)
+    ##
+    def getHash(self):
+        if self.hash == None:
+            self.hash = Zobrist.hashState(self)
+        return self.hash
+
+    ##
+    #hashAnt
+    #Description: XORs an ant into the hash, which takes it back out if it
+    #   was already in.  Call it before and after changing an ant, after
+    #   adding one and before removing one.  The ant is toggled in and out of
+    #   the feature totals the same way, and the version goes up.
+    #
+    #Parameters:
+    #   ant - The Ant (Ant)
+    ##
+    def hashAnt(self, ant):
+        self.version += 1
+        if self.hash != None:
+            self.hash ^= Zobrist.hashAnt(ant)
+        if self.featureValues != None:
+            self.featureValues.toggleAnt(ant)
+
+    ##
+    #hashConstr
+    #Description: Like hashAnt, for a construction
+    #
+    #Parameters:
+    #   constr - The Construction (Construction)
+    ##
+    def hashConstr(self, constr):
+        self.version += 1
+        if self.hash != None:
+            self.hash ^= Zobrist.hashConstr(constr)
+        if self.featureValues != None:
+            self.featureValues.toggleConstr(constr)
+
+    ##
+    #hashFood
+    #Description: Like hashAnt, for a player's food count.  Call it before
+    #   and after changing the count.
+    #
+    #Parameters:
+    #   playerId - The player whose food count changes (int)
+    ##
+    def hashFood(self, playerId):
+        self.version += 1
+        if self.hash != None:
+            self.hash ^= Zobrist.hashFood(playerId, self.inventories[playerId].foodCount)
+        if self.featureValues != None:
+            self.featureValues.toggleFood(playerId)
+
+    ##
+    #hashTurn
+    #Description: Like hashAnt, for whose turn it is.  Call it before and
+    #   after changing whoseTurn.
+    ##
+    def hashTurn(self):
+        self.version += 1
+        if self.hash != None:
+            self.hash ^= Zobrist.hashTurn(self.whoseTurn)
+
+    ##
+    #setPhase
+    #Description: Changes the phase of the game, and the version with it
+    #
+    #Parameters:
+    #   phase - The new phase (int)
+    ##
+    def setPhase(self, phase):
+        self.phase = phase
+        self.version += 1
+
     ##
     #clearConstrs
     #Description: Clears the board of all constructions (so Player Two doesn't see Player One's setup)
@@ -88,6 +347,7 @@ class GameState(object):
         for col in self.board:
             for loc in col:
                 loc.constr = None
+        self.version += 1
 
     ##
     #clone
@@ -124,7 +384,12 @@ class GameState(object):
         newInventories = [Inventory(PLAYER_ONE, ants1, cons1, food1),
                           Inventory(PLAYER_TWO, ants2, cons2, food2),
                           Inventory(NEUTRAL, [], cons3, 0) ]
-        return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState = GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        #the clone isn't indexed, as it may go to a player that changes it
+        #directly (see buildIndex).  The terrain is the same, so the
+        #distances are too.
+        newState.distanceTable = self.distanceTable
+        return newState
 
 
     ##
@@ -174,4 +439,11 @@ class GameState(object):
                            Inventory(PLAYER_TWO, ants2, cons2, food2),
                            Inventory(NEUTRAL, [], cons3, 0) ]
         
-        return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState = GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        #an indexed state is changed through the note* methods, and so are
+        #its fastclones
+        if self.antIndex != None:
+            newState.buildIndex()
+        newState.distanceTable = self.distanceTable
+        newState.hash = self.hash
+        return newState
@@ -14,6 +14,8 @@ from Constants import *
 ##
 class Inventory(object):
 
+    __slots__ = ('player', 'ants', 'constrs', 'foodCount')
+
     ##
     #__init__
     #Description: Creates a new Inventory
@@ -67,4 +69,9 @@ class Inventory(object):
     ##
     # duplicate this inventory
     def clone(self):
-        return Inventory(self.player,self.ants,self.constrs,self.foodCount)
+        rtnInv = Inventory.__new__(Inventory)
+        rtnInv.player = self.player
+        rtnInv.ants = self.ants
+        rtnInv.constrs = self.constrs
+        rtnInv.foodCount = self.foodCount
+        return rtnInv
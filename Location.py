@@ -9,6 +9,8 @@
 ##
 class Location(object):
 
+    __slots__ = ('ant', 'constr', 'coords')
+
     ##
     #__init__
     #Description: Creates a new Location
@@ -28,7 +30,10 @@ class Location(object):
             return self.constr.movementCost
     
     def clone(self):
-        newLoc = Location(self.coords)
+        newLoc = Location.__new__(Location)
+        newLoc.coords = self.coords
+        newLoc.ant = None
+        newLoc.constr = None
         if self.ant != None:
             newLoc.ant = self.ant.clone()
         if self.constr != None:
@@ -0,0 +1,433 @@
+import math, random, time
+from Constants import *
+from Construction import CONSTR_STATS
+from Ant import UNIT_STATS
+from Move import Move
+from AIPlayerUtils import listAllLegalMoves
+from AlphaBetaSearch import DEFAULT_TIME_LIMIT
+
+#
+# MonteCarloSearch.py
+#
+# A Monte Carlo tree search for AI players.  Each simulation walks down the
+# tree by UCT, adds one new state to it and plays the game on from there
+# with fast random moves (see randomPlayoutMove).  The results of the
+# playouts build up in the tree, and the move from the root that was
+# simulated the most is the one chosen.
+#
+# Like AlphaBetaSearch, the tree is made of single moves rather than whole
+# turns, so a player's turn is several levels deep.  Moves are made in place
+# on one state, and the tree that is left from one search is reused by the
+# next as long as it reached the state the next search starts from.
+#
+
+#The number of turns a playout plays before the state is evaluated
+DEFAULT_PLAYOUT_TURNS = 4
+
+#How much UCT favors moves that have been tried less
+DEFAULT_EXPLORATION = math.sqrt(2)
+
+#How fast progressive widening lets a node grow children (see
+#MonteCarloSearch.canExpand)
+DEFAULT_WIDENING_EXPONENT = 0.5
+
+#The chance a playout builds an ant when it can
+PLAYOUT_BUILD_CHANCE = 0.25
+
+#Steps in each direction
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+##
+#MonteCarloNode
+#Description: A state in the search tree.  The state itself isn't kept,
+#   only the move that leads to it from its parent.
+#
+#Variables:
+#   parent - The node this one's move is made from, or None for the root
+#   move - The Move that leads here from the parent
+#   player - The player that made the move, or None for the root
+#   hash - The Zobrist hash of the state (see GameState.getHash)
+#   over - Whether the game is over in this state
+#   children - The nodes that have been added below this one
+#   untried - The moves from this state that have no node yet, or None
+#       until the node is first walked through
+#   visits - The number of simulations that passed through this node
+#   wins - The total result of those simulations for player, counting a win
+#       as 1, a loss as 0 and anything else in between
+##
+class MonteCarloNode(object):
+    __slots__ = ('parent', 'move', 'player', 'hash', 'over', 'children', 'untried',
+                 'visits', 'wins')
+
+    def __init__(self, parent, move, player, hash, over=False):
+        self.parent = parent
+        self.move = move
+        self.player = player
+        self.hash = hash
+        self.over = over
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+
+##
+#MonteCarloSearch
+#Description: Finds a good move for the player whose turn it is by
+#   simulating games from the state.  Like AlphaBetaSearch, the search only
+#   knows the game through the functions it is given.
+#
+#Variables:
+#   hasWon - A function (state, playerId) -> bool that says whether a player
+#       has won in a state
+#   applyMove, undoMove - Functions that make a move in a state in place and
+#       take it back (see GameEngine.applyMove)
+#   evaluate - A function (state, playerId) -> float between -1 and 1 that
+#       scores a state for the given player, with -1 and 1 for a lost and a
+#       won game.  It scores the states that playouts end in.  If it is None
+#       a playout that doesn't finish the game counts as a draw.
+#   listMoves - A function (state) -> Move[] listing the moves to add to the
+#       tree
+#   playoutMove - A function (state) -> Move that picks the next move of a
+#       playout.  It must end the turn sooner or later.
+#   playoutTurns - The number of turns a playout plays
+#   exploration - How much UCT favors moves that have been tried less
+#   wideningConstant, wideningExponent - A node with n visits may have at
+#       most wideningConstant * n ** wideningExponent children (progressive
+#       widening).  If wideningConstant is None every move is tried before
+#       any is tried twice.
+#   verbose - Whether to print how fast each search went
+#   root - The root of the tree left by the last search, or None
+#   simulationCount - The number of simulations in the last search
+#   simulationsPerSecond - How fast the last search simulated
+#   reusedVisits - The number of simulations the last search started with
+#       from the one before
+##
+class MonteCarloSearch(object):
+
+    ##
+    #__init__
+    #Description: Creates a new MonteCarloSearch
+    #
+    #Parameters:
+    #   hasWon - see above ((GameState, int) -> bool)
+    #   applyMove - see above ((GameState, Move) -> undo record)
+    #   undoMove - see above ((GameState, undo record) -> None)
+    #   evaluate - see above ((GameState, int) -> float)
+    #   listMoves - see above, defaults to one move per ant and destination
+    #       (GameState -> Move[])
+    #   playoutMove - see above, defaults to randomPlayoutMove (GameState -> Move)
+    #   playoutTurns - see above (int)
+    #   exploration - see above (float)
+    #   wideningConstant - see above (float)
+    #   wideningExponent - see above (float)
+    #   verbose - see above (bool)
+    ##
+    def __init__(self, hasWon, applyMove, undoMove, evaluate=None, listMoves=None,
+                 playoutMove=None, playoutTurns=DEFAULT_PLAYOUT_TURNS,
+                 exploration=DEFAULT_EXPLORATION, wideningConstant=None,
+                 wideningExponent=DEFAULT_WIDENING_EXPONENT, verbose=False):
+        self.hasWon = hasWon
+        self.applyMove = applyMove
+        self.undoMove = undoMove
+        self.evaluate = evaluate
+        if listMoves == None:
+            listMoves = lambda state: listAllLegalMoves(state, True)
+        self.listMoves = listMoves
+        if playoutMove == None:
+            playoutMove = randomPlayoutMove
+        self.playoutMove = playoutMove
+        self.playoutTurns = playoutTurns
+        self.exploration = exploration
+        self.wideningConstant = wideningConstant
+        self.wideningExponent = wideningExponent
+        self.verbose = verbose
+        self.root = None
+        self.simulationCount = 0
+        self.simulationsPerSecond = 0.0
+        self.reusedVisits = 0
+
+    ##
+    #search
+    #Description: Simulates games from a state until the time runs out or
+    #   enough simulations have been made
+    #
+    #Parameters:
+    #   state - The state to find a move for (GameState)
+    #   timeLimit - How long the search may take in seconds (float)
+    #   maxSimulations - The most simulations to make, or None for no limit (int)
+    #
+    #Return: The Move from state that was simulated the most
+    ##
+    def search(self, state, timeLimit=DEFAULT_TIME_LIMIT, maxSimulations=None):
+        start = time.time()
+        deadline = start + timeLimit
+        #the simulations make their moves on a copy, through applyMove, so
+        #it can be indexed
+        state = state.fastclone()
+        state.buildIndex()
+        state.getHash()
+
+        root = self.findRoot(state)
+        if root == None:
+            root = MonteCarloNode(None, None, None, state.hash, self.isOver(state))
+        #let go of the rest of the old tree
+        root.parent = None
+        self.root = root
+        self.reusedVisits = root.visits
+
+        count = 0
+        while time.time() < deadline and (maxSimulations == None or count < maxSimulations):
+            self.simulate(state, root)
+            count += 1
+
+        elapsed = time.time() - start
+        self.simulationCount = count
+        self.simulationsPerSecond = 0.0
+        if elapsed > 0:
+            self.simulationsPerSecond = count / elapsed
+        if self.verbose:
+            print "MonteCarloSearch: %d simulations in %.2fs (%.0f/s), %d reused" % \
+                (count, elapsed, self.simulationsPerSecond, self.reusedVisits)
+
+        if len(root.children) == 0:
+            #there was no time to simulate anything
+            return self.listMoves(state)[0]
+        return max(root.children, key=lambda child: child.visits).move
+
+    ##
+    #findRoot
+    #Description: Looks through the tree left by the last search for the
+    #   state a new search starts from
+    #
+    #Parameters:
+    #   state - The state the new search starts from, hashed (GameState)
+    #
+    #Return: The node of the state (MonteCarloNode), or None if the tree
+    #   never reached it
+    ##
+    def findRoot(self, state):
+        if self.root == None:
+            return None
+        nodes = [self.root]
+        for node in nodes:
+            if node.hash == state.hash:
+                return node
+            nodes.extend(node.children)
+        return None
+
+    ##
+    #simulate
+    #Description: Makes one simulation: walks down the tree, adds a node to
+    #   it, plays the game on from there and counts the result in every node
+    #   on the way.  The state is left as it was.
+    #
+    #Parameters:
+    #   state - The state of root (GameState)
+    #   root - The root of the tree (MonteCarloNode)
+    ##
+    def simulate(self, state, root):
+        records = []
+        node = root
+        while not node.over:
+            if node.untried == None:
+                node.untried = self.listMoves(state)
+                random.shuffle(node.untried)
+            if len(node.untried) > 0 and self.canExpand(node):
+                move = node.untried.pop()
+                player = state.whoseTurn
+                records.append(self.applyMove(state, move))
+                child = MonteCarloNode(node, move, player, state.hash, self.isOver(state))
+                node.children.append(child)
+                node = child
+                break
+            node = self.selectChild(node)
+            records.append(self.applyMove(state, node.move))
+
+        if node.over:
+            result = self.getResult(state)
+        else:
+            result = self.playout(state)
+
+        while node != None:
+            node.visits += 1
+            if node.player == PLAYER_ONE:
+                node.wins += result
+            else:
+                node.wins += 1.0 - result
+            node = node.parent
+        for record in reversed(records):
+            self.undoMove(state, record)
+
+    ##
+    #canExpand
+    #Description: Checks whether progressive widening lets a node have
+    #   another child
+    #
+    #Parameters:
+    #   node - The node (MonteCarloNode)
+    #
+    #Return: True if a child may be added
+    ##
+    def canExpand(self, node):
+        if self.wideningConstant == None or len(node.children) == 0:
+            return True
+        return len(node.children) < self.wideningConstant * node.visits ** self.wideningExponent
+
+    ##
+    #selectChild
+    #Description: Picks the child of a node to walk down to by UCT, which
+    #   weighs how well each child has done against how little it has been
+    #   tried
+    #
+    #Parameters:
+    #   node - The node, which must have children (MonteCarloNode)
+    #
+    #Return: The child (MonteCarloNode)
+    ##
+    def selectChild(self, node):
+        scale = self.exploration * math.sqrt(math.log(node.visits))
+        bestChild = None
+        bestValue = None
+        for child in node.children:
+            value = child.wins / child.visits + scale / math.sqrt(child.visits)
+            if bestChild == None or value > bestValue:
+                bestChild = child
+                bestValue = value
+        return bestChild
+
+    ##
+    #playout
+    #Description: Plays the game on from a state with playoutMove for
+    #   playoutTurns turns or until it is over
+    #
+    #Parameters:
+    #   state - The state to play from, which is left as it was (GameState)
+    #
+    #Return: The result for PLAYER_ONE, between 0 and 1 (see getResult)
+    ##
+    def playout(self, state):
+        records = []
+        turns = 0
+        #the states of a playout aren't looked up, so they needn't be hashed
+        hash = state.hash
+        state.hash = None
+        while turns < self.playoutTurns:
+            move = self.playoutMove(state)
+            records.append(self.applyMove(state, move))
+            #only check for the end of the game once a turn, which may let
+            #a player finish a turn the game ended in
+            if move.moveType == END:
+                turns += 1
+                if self.isOver(state):
+                    break
+        result = self.getResult(state)
+        for record in reversed(records):
+            self.undoMove(state, record)
+        state.hash = hash
+        return result
+
+    ##
+    #isOver
+    #Description: Checks whether either player has won
+    #
+    #Parameters:
+    #   state - The state to check (GameState)
+    #
+    #Return: True if the game is over
+    ##
+    def isOver(self, state):
+        return self.hasWon(state, PLAYER_ONE) or self.hasWon(state, PLAYER_TWO)
+
+    ##
+    #getResult
+    #Description: Scores the state a simulation ends in for PLAYER_ONE
+    #
+    #Parameters:
+    #   state - The state (GameState)
+    #
+    #Return: 1 if PLAYER_ONE has won, 0 if PLAYER_TWO has, and the
+    #   evaluation mapped to between 0 and 1 otherwise (float)
+    ##
+    def getResult(self, state):
+        if self.evaluate != None:
+            return (self.evaluate(state, PLAYER_ONE) + 1.0) / 2.0
+        if self.hasWon(state, PLAYER_ONE):
+            return 1.0
+        if self.hasWon(state, PLAYER_TWO):
+            return 0.0
+        return 0.5
+
+##
+#randomPlayoutMove
+#Description: Picks a random move for the player whose turn it is, much
+#   faster than choosing from listAllLegalMoves.  An ant that hasn't moved
+#   walks randomly as far as it can go, one ant at a time.  Once every ant
+#   has moved the player may build an ant, and then ends the turn.  The
+#   state needs no board.
+#
+#Parameters:
+#   state - The state to move in (GameState)
+#
+#Return: A valid Move
+##
+def randomPlayoutMove(state):
+    me = state.whoseTurn
+    inventory = state.inventories[me]
+    ants = [ant for ant in inventory.ants if not ant.hasMoved]
+    random.shuffle(ants)
+    for ant in ants:
+        path = randomPath(state, ant)
+        if path != None:
+            return Move(MOVE_ANT, path, None)
+
+    if random.random() < PLAYOUT_BUILD_CHANCE:
+        hill = inventory.getAnthill()
+        if hill != None and state.getAntAt(hill.coords) == None:
+            types = [antType for antType in xrange(WORKER, R_SOLDIER + 1)
+                     if UNIT_STATS[antType][COST] <= inventory.foodCount]
+            if len(types) > 0:
+                return Move(BUILD, [hill.coords], random.choice(types))
+    return Move(END, None, None)
+
+##
+#randomPath
+#Description: Walks an ant randomly one cell at a time, without going back
+#   to a cell it has been on, until it runs out of movement or has nowhere
+#   to go
+#
+#Parameters:
+#   state - The state the ant is in (GameState)
+#   ant - The ant (Ant)
+#
+#Return: The path as a list of coords, or None if the ant can't move at all
+##
+def randomPath(state, ant):
+    coords = tuple(ant.coords)
+    path = [coords]
+    movement = UNIT_STATS[ant.type][MOVEMENT]
+    while movement > 0:
+        steps = []
+        for dx, dy in DIRECTIONS:
+            x = coords[0] + dx
+            y = coords[1] + dy
+            if x < 0 or x >= BOARD_LENGTH or y < 0 or y >= BOARD_LENGTH:
+                continue
+            #the queen must stay in her territory
+            if ant.type == QUEEN and (y == BOARD_LENGTH / 2 - 1 or y == BOARD_LENGTH / 2):
+                continue
+            if (x, y) in path or state.getAntAt((x, y)) != None:
+                continue
+            cost = 1
+            constr = state.getConstrAt((x, y))
+            if constr != None and ant.type != DRONE:
+                cost = CONSTR_STATS[constr.type][MOVE_COST]
+            if cost <= movement:
+                steps.append(((x, y), cost))
+        if len(steps) == 0:
+            break
+        coords, cost = random.choice(steps)
+        path.append(coords)
+        movement -= cost
+    if len(path) == 1:
+        return None
+    return path
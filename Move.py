@@ -11,6 +11,8 @@ from Constants import *
 ##
 class Move(object):
 
+    __slots__ = ('moveType', 'coordList', 'buildType')
+
     ##
     #__init__
     #Description: Creates a new Move
@@ -0,0 +1,386 @@
+import os, sys, random, itertools
+from Constants import *
+from Player import Player
+from GameEngine import GameEngine
+
+#
+# OpeningBook.py
+#
+# A book of setup placements worked out ahead of time, so an AI can place
+# its constructions well without searching during the game.  The book has:
+#   home layouts - where to put the anthill, tunnel and 9 grass in
+#       SETUP_PHASE_1, best first.  Nothing of the enemy's can be seen yet,
+#       so these are the same in every game.
+#   food cells - where to put food in SETUP_PHASE_2, keyed by where the
+#       enemy put their anthill and tunnel.  The cells are ranked by how far
+#       the enemy's workers must carry food from them, farthest first.  The
+#       enemy's grass may cover some, so FOOD_CELLS are kept for each key,
+#       enough that two are always free.
+# Both are in the coordinates the player sees, which are the same for both
+# seats.  Usage:
+#     python OpeningBook.py [-c <candidates>] [-g <games>]
+# works the book out again and saves it.  The home layouts are tried by
+# playing games with the headless engine, which takes a few minutes.
+#
+
+#Where the book is kept
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "OpeningBook.txt")
+
+#The number of food cells kept for each placement of the enemy's anthill
+#and tunnel: the 2 placed plus the 9 the enemy's grass could cover
+FOOD_CELLS = 11
+
+#The number of home layouts kept
+HOME_LAYOUTS = 4
+
+#The number of home layouts tried in games by default
+DEFAULT_CANDIDATES = 24
+
+#The number of games each home layout is tried in by default
+DEFAULT_TRIAL_GAMES = 8
+
+#The AI that plays the trial games
+BOOK_AI = "studentAIPlayer"
+
+#How long BOOK_AI searches for in the trial games, in seconds
+TRIAL_SEARCH_TIME = 0.02
+
+#The number of play phase moves a trial game is cut off after
+TRIAL_MOVES = 150
+
+#The rows of each side of the board, as a player sees it
+HOME_ROWS = range(0, 4)
+ENEMY_ROWS = range(BOARD_LENGTH - 4, BOARD_LENGTH)
+
+#The books loaded so far, by path (see loadOpeningBook)
+loadedBooks = {}
+
+##
+#OpeningBook
+#Description: The placements in a book file, and the lookup AIs call in
+#   getPlacement
+#
+#Variables:
+#   homeLayouts - The (score, coords) of each home layout, best first.  The
+#       coords are of the anthill, the tunnel and the grass, in that order.
+#   foodCells - The cells to put food on, best first, keyed by the enemy's
+#       anthill and tunnel coords in sorted order
+##
+class OpeningBook(object):
+
+    ##
+    #__init__
+    #Description: Loads a book.  If the file doesn't exist the book is empty
+    #   and every lookup misses.
+    #
+    #Parameters:
+    #   path - The book file (string)
+    ##
+    def __init__(self, path=BOOK_FILE):
+        self.homeLayouts = []
+        self.foodCells = {}
+        if path == None or not os.path.exists(path):
+            return
+        with open(path) as bookFile:
+            for line in bookFile:
+                fields = line.split()
+                if fields[0] == "home":
+                    self.homeLayouts.append((float(fields[1]), [decodeCoords(field) for field in fields[2:]]))
+                elif fields[0] == "food":
+                    key = (decodeCoords(fields[1]), decodeCoords(fields[2]))
+                    self.foodCells[key] = [decodeCoords(field) for field in fields[3:]]
+
+    ##
+    #save
+    #Description: Writes the book to a file, and makes it the book
+    #   loadOpeningBook returns for that file
+    #
+    #Parameters:
+    #   path - The book file (string)
+    ##
+    def save(self, path=BOOK_FILE):
+        with open(path, "w") as bookFile:
+            for score, coordList in self.homeLayouts:
+                bookFile.write("home %.3f %s\n" % (score, " ".join([encodeCoords(coords) for coords in coordList])))
+            for key in sorted(self.foodCells):
+                bookFile.write("food %s %s %s\n" % (encodeCoords(key[0]), encodeCoords(key[1]),
+                                                    " ".join([encodeCoords(coords) for coords in self.foodCells[key]])))
+        loadedBooks[path] = self
+
+    ##
+    #getPlacement
+    #Description: Looks up the placement for a setup phase
+    #
+    #Parameters:
+    #   currentState - The state the player was given in getPlacement (GameState)
+    #
+    #Return: The coordinates to place at, in the form getPlacement returns
+    #   them, or None if the book has no placement for the state
+    ##
+    def getPlacement(self, currentState):
+        if currentState.phase == SETUP_PHASE_1:
+            if len(self.homeLayouts) == 0:
+                return None
+            return list(self.homeLayouts[0][1])
+        elif currentState.phase == SETUP_PHASE_2:
+            cells = self.foodCells.get(getFoodKey(currentState))
+            if cells == None:
+                return None
+            targets = [coords for coords in cells if currentState.board[coords[0]][coords[1]].constr == None]
+            if len(targets) < 2:
+                return None
+            return targets[:2]
+        return None
+
+##
+#loadOpeningBook
+#Description: Returns the book in a file, reading the file only the first
+#   time, so every player constructed shares one copy.  Lookups don't change
+#   a book, so it is safe to share.
+#
+#Parameters:
+#   path - The book file (string)
+#
+#Return: The book (OpeningBook)
+##
+def loadOpeningBook(path=BOOK_FILE):
+    if path not in loadedBooks:
+        loadedBooks[path] = OpeningBook(path)
+    return loadedBooks[path]
+
+##
+#encodeCoords / decodeCoords
+#Description: Convert coordinates to and from the two digits they are kept
+#   as in the book file
+##
+def encodeCoords(coords):
+    return "%d%d" % (coords[0], coords[1])
+
+def decodeCoords(field):
+    return (int(field[0]), int(field[1]))
+
+##
+#getFoodKey
+#Description: Returns the key of the food cells for a state in SETUP_PHASE_2:
+#   the coords of the enemy's anthill and tunnel in sorted order.  Only how
+#   far food is from them matters, so which is which is left out.
+#
+#Parameters:
+#   currentState - The state, as the player sees it (GameState)
+#
+#Return: The key, or None if the enemy hasn't placed them ((int,int) pair)
+##
+def getFoodKey(currentState):
+    buildings = [tuple(constr.coords) for constr in currentState.inventories[1 - currentState.whoseTurn].constrs
+                 if constr.type == ANTHILL or constr.type == TUNNEL]
+    if len(buildings) != 2:
+        return None
+    return tuple(sorted(buildings))
+
+##
+#carryDistance
+#Description: Returns how far a worker must carry food from a cell to the
+#   nearer of an anthill and tunnel, not counting grass
+#
+#Parameters:
+#   coords - The cell ((int,int))
+#   buildings - The coords of the anthill and tunnel ((int,int)[])
+#
+#Return: The number of steps (int)
+##
+def carryDistance(coords, buildings):
+    return min([abs(coords[0] - building[0]) + abs(coords[1] - building[1]) for building in buildings])
+
+##
+#rankFoodCells
+#Description: Ranks the cells of a side of the board by how far food on
+#   them must be carried to an anthill and tunnel on that side
+#
+#Parameters:
+#   buildings - The coords of the anthill and tunnel ((int,int)[])
+#   rows - The rows of the side (int[])
+#
+#Return: The free cells, farthest first ((int,int)[])
+##
+def rankFoodCells(buildings, rows):
+    cells = [(x, y) for x in xrange(0, BOARD_LENGTH) for y in rows if (x, y) not in buildings]
+    #ties go to the cell nearer the back of the side (rows[0])
+    cells.sort(key=lambda coords: (-carryDistance(coords, buildings), abs(coords[1] - rows[0])))
+    return cells
+
+##
+#makeFoodCells
+#Description: Works out the food cells for every placement of the enemy's
+#   anthill and tunnel
+#
+#Return: The food cells, keyed as in OpeningBook.foodCells
+##
+def makeFoodCells():
+    foodCells = {}
+    enemyCells = [(x, y) for x in xrange(0, BOARD_LENGTH) for y in ENEMY_ROWS]
+    for key in itertools.combinations(enemyCells, 2):
+        #the enemy's side is flipped in their view, so their back row is last
+        foodCells[key] = rankFoodCells(key, ENEMY_ROWS[::-1])[:FOOD_CELLS]
+    return foodCells
+
+##
+#makeHomeLayout
+#Description: Lays out the home side around an anthill and tunnel, putting
+#   the grass on the cells farthest from them.  Food can't be placed on
+#   grass, so this keeps the enemy from placing food as far away.
+#
+#Parameters:
+#   anthill - The coords of the anthill ((int,int))
+#   tunnel - The coords of the tunnel ((int,int))
+#
+#Return: A tuple of (the layout's coords as OpeningBook.homeLayouts has
+#   them, how far food must be carried once the enemy has placed it as far
+#   away as they can)
+##
+def makeHomeLayout(anthill, tunnel):
+    buildings = [anthill, tunnel]
+    ranked = rankFoodCells(buildings, HOME_ROWS)
+    grass = ranked[:9]
+    #the enemy places food on the 2 farthest cells left, and the nearer one
+    #is the one that gets carried
+    return ([anthill, tunnel] + grass, carryDistance(ranked[10], buildings))
+
+##
+#listCandidateLayouts
+#Description: Lists the home layouts that are worth trying in games: those
+#   that make food the shortest carry once the enemy has placed it
+#
+#Parameters:
+#   numCandidates - The number of layouts to list (int)
+#
+#Return: The layouts' coords, as OpeningBook.homeLayouts has them
+##
+def listCandidateLayouts(numCandidates):
+    homeCells = [(x, y) for x in xrange(0, BOARD_LENGTH) for y in HOME_ROWS]
+    layouts = [makeHomeLayout(anthill, tunnel)
+               for anthill, tunnel in itertools.permutations(homeCells, 2)]
+    #plenty of layouts share the shortest carry, so which of them are tried
+    #is left to chance
+    random.shuffle(layouts)
+    layouts.sort(key=lambda layout: layout[1])
+    return [layout[0] for layout in layouts[:numCandidates]]
+
+##
+#TrialPlayer
+#Description: A player that places from the book being made and leaves
+#   everything else to another player
+#
+#Variables:
+#   player - The player that makes the moves (Player)
+#   book - The book to place food from (OpeningBook)
+#   layout - The home layout to place, or None to let player place (coords[])
+##
+class TrialPlayer(Player):
+
+    def __init__(self, player, book, layout=None):
+        super(TrialPlayer, self).__init__(player.playerId, player.author)
+        self.player = player
+        self.book = book
+        self.layout = layout
+
+    def getPlacement(self, currentState):
+        if currentState.phase == SETUP_PHASE_1 and self.layout != None:
+            return list(self.layout)
+        if currentState.phase == SETUP_PHASE_2:
+            return self.book.getPlacement(currentState)
+        return self.player.getPlacement(currentState)
+
+    def getMove(self, currentState):
+        return self.player.getMove(currentState)
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.player.getAttack(currentState, attackingAnt, enemyLocations)
+
+##
+#scoreLayout
+#Description: Plays trial games with a home layout against BOOK_AI's own
+#   placements, taking turns going first.  A game scores the food gathered
+#   over the opponent's, plus FOOD_GOAL for a win (and minus it for a loss).
+#
+#Parameters:
+#   module - The module of BOOK_AI
+#   book - The book to place food from (OpeningBook)
+#   layout - The home layout (coords[])
+#   numGames - The number of games to play (int)
+#
+#Return: The average score (float)
+##
+def scoreLayout(module, book, layout, numGames):
+    engine = GameEngine(False)
+    total = 0
+    for seed in xrange(0, numGames):
+        seat = seed % 2
+        players = [None, None]
+        players[seat] = TrialPlayer(module.AIPlayer(seat), book, layout)
+        players[1 - seat] = TrialPlayer(module.AIPlayer(1 - seat), book)
+        result = engine.play(players[0], players[1], TRIAL_MOVES, seed)
+        inventories = engine.state.inventories
+        total += inventories[seat].foodCount - inventories[1 - seat].foodCount
+        if result.winner == seat:
+            total += FOOD_GOAL
+        elif result.winner == 1 - seat:
+            total -= FOOD_GOAL
+    return total / float(numGames)
+
+##
+#makeBook
+#Description: Works out a book (see the top of this file)
+#
+#Parameters:
+#   numCandidates - The number of home layouts to try in games (int)
+#   numGames - The number of games to try each one in (int)
+#   verbose - Whether to print each layout's score (bool)
+#
+#Return: The book (OpeningBook)
+##
+def makeBook(numCandidates=DEFAULT_CANDIDATES, numGames=DEFAULT_TRIAL_GAMES, verbose=False):
+    book = OpeningBook(None)
+    book.foodCells = makeFoodCells()
+
+    if "AI" not in sys.path:
+        sys.path.insert(0, "AI")
+    module = __import__(BOOK_AI)
+    searchTime = module.SEARCH_TIME_LIMIT
+    module.SEARCH_TIME_LIMIT = TRIAL_SEARCH_TIME
+    try:
+        scored = []
+        for layout in listCandidateLayouts(numCandidates):
+            score = scoreLayout(module, book, layout, numGames)
+            if verbose:
+                print "%7.2f  %s" % (score, " ".join([encodeCoords(coords) for coords in layout]))
+            scored.append((score, layout))
+    finally:
+        module.SEARCH_TIME_LIMIT = searchTime
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+    book.homeLayouts = scored[:HOME_LAYOUTS]
+    return book
+
+##
+#main
+#Description: Works the book out again and saves it (see the top of this
+#   file)
+##
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Work out the opening book of setup placements.")
+    parser.add_argument("-c", "--candidates", type=int, default=DEFAULT_CANDIDATES,
+                        help="home layouts to try in games")
+    parser.add_argument("-g", "--games", type=int, default=DEFAULT_TRIAL_GAMES,
+                        help="games to try each home layout in")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    book = makeBook(args.candidates, args.games, True)
+    book.save()
+    print "Saved %d home layouts and %d food placements to %s" % \
+        (len(book.homeLayouts), len(book.foodCells), BOOK_FILE)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,290 @@
+from Constants import *
+from Construction import Construction
+from Building import Building
+from Ant import Ant
+from Inventory import Inventory
+from Location import Location
+from GameState import GameState
+
+#
+# PackedState.py
+#
+# A compact stand-in for a GameState that keeps everything in one
+# bytearray, for when many states must be kept around at once (search
+# trees, replay buffers, opening books).  A packed state takes a few hundred
+# bytes where a GameState takes thousands, and cloning one is a single
+# buffer copy.
+#
+# Layout of the buffer:
+#   [phase] [whoseTurn] [food of PLAYER_ONE] [food of PLAYER_TWO]
+#   then one byte per cell (x * BOARD_LENGTH + y) in each of four sections:
+#   ants, ant health, constructions and capture health.
+#
+
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+
+#Offsets into the buffer
+PHASE_OFFSET = 0
+WHOSE_TURN_OFFSET = 1
+FOOD_OFFSET = 2
+ANTS_OFFSET = 4
+ANT_HEALTH_OFFSET = ANTS_OFFSET + NUM_CELLS
+CONSTRS_OFFSET = ANT_HEALTH_OFFSET + NUM_CELLS
+CAPTURE_HEALTH_OFFSET = CONSTRS_OFFSET + NUM_CELLS
+PACKED_SIZE = CAPTURE_HEALTH_OFFSET + NUM_CELLS
+
+#Empty ant and ant health sections
+NO_ANTS = bytearray(2 * NUM_CELLS)
+
+#Bits of an ants byte.  The low bits hold the ant's type + 1 (0 for no ant).
+ANT_TYPE_MASK = 0x07
+ANT_OWNER_BIT = 0x08
+ANT_CARRYING_BIT = 0x10
+ANT_MOVED_BIT = 0x20
+
+#Bits of a constructions byte.  The low bits hold the type - ANTHILL + 1 (0 for
+#nothing) and the next ones the owner (NEUTRAL for grass and food).
+CONSTR_TYPE_MASK = 0x07
+CONSTR_OWNER_SHIFT = 3
+
+##
+#packConstr
+#Description: Returns the byte that a construction is packed into
+#
+#Parameters:
+#   constrType - The type of the construction (int)
+#   owner - The player that owns it, or NEUTRAL (int)
+#
+#Return: The packed construction (int)
+##
+def packConstr(constrType, owner):
+    return (constrType - ANTHILL + 1) | (owner << CONSTR_OWNER_SHIFT)
+
+##
+#PackedState
+#Description: A GameState packed into a bytearray.  The ants and
+#   constructions are stored by cell, so unpacking lists them in board
+#   order rather than in the order of the original inventories.
+#
+#Variables:
+#   data - The packed state (bytearray)
+##
+class PackedState(object):
+
+    ##
+    #__init__
+    #Description: Creates a new PackedState
+    #
+    #Parameters:
+    #   state - The GameState to pack, or None for an empty state (GameState)
+    #   data - A buffer to use as is instead (bytearray)
+    ##
+    def __init__(self, state=None, data=None):
+        if data == None:
+            data = bytearray(PACKED_SIZE)
+        self.data = data
+        if state != None:
+            self.pack(state)
+
+    ##
+    #pack
+    #Description: Stores a GameState in this PackedState.  Only the
+    #   inventories are read, so states without a board can be packed.
+    #
+    #Parameters:
+    #   state - The GameState to pack (GameState)
+    ##
+    def pack(self, state):
+        data = self.data
+        data[PHASE_OFFSET] = state.phase
+        data[WHOSE_TURN_OFFSET] = state.whoseTurn
+        data[FOOD_OFFSET + PLAYER_ONE] = state.inventories[PLAYER_ONE].foodCount
+        data[FOOD_OFFSET + PLAYER_TWO] = state.inventories[PLAYER_TWO].foodCount
+        for inv in state.inventories:
+            for ant in inv.ants:
+                cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+                value = ant.type + 1
+                if ant.player == PLAYER_TWO:
+                    value |= ANT_OWNER_BIT
+                if ant.carrying:
+                    value |= ANT_CARRYING_BIT
+                if ant.hasMoved:
+                    value |= ANT_MOVED_BIT
+                data[ANTS_OFFSET + cell] = value
+                data[ANT_HEALTH_OFFSET + cell] = ant.health
+            for constr in inv.constrs:
+                cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+                owner = NEUTRAL
+                if type(constr) is Building:
+                    owner = constr.player
+                    data[CAPTURE_HEALTH_OFFSET + cell] = constr.captureHealth
+                data[CONSTRS_OFFSET + cell] = packConstr(constr.type, owner)
+
+    ##
+    #update
+    #Description: Packs a GameState over this PackedState, leaving out the
+    #   grass and food.  Those never change once the game is set up, so a
+    #   state's children can be packed by updating copies of the state.
+    #
+    #Parameters:
+    #   state - The GameState to pack, which must have the same grass and
+    #       food as the one this was packed from (GameState)
+    ##
+    def update(self, state):
+        data = self.data
+        data[PHASE_OFFSET] = state.phase
+        data[WHOSE_TURN_OFFSET] = state.whoseTurn
+        data[FOOD_OFFSET + PLAYER_ONE] = state.inventories[PLAYER_ONE].foodCount
+        data[FOOD_OFFSET + PLAYER_TWO] = state.inventories[PLAYER_TWO].foodCount
+        data[ANTS_OFFSET:CONSTRS_OFFSET] = NO_ANTS
+        for playerId in (PLAYER_ONE, PLAYER_TWO):
+            for ant in state.inventories[playerId].ants:
+                cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+                value = ant.type + 1
+                if playerId == PLAYER_TWO:
+                    value |= ANT_OWNER_BIT
+                if ant.carrying:
+                    value |= ANT_CARRYING_BIT
+                if ant.hasMoved:
+                    value |= ANT_MOVED_BIT
+                data[ANTS_OFFSET + cell] = value
+                data[ANT_HEALTH_OFFSET + cell] = ant.health
+            for constr in state.inventories[playerId].constrs:
+                cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+                #a captured tunnel stays in the inventory it was built in
+                owner = NEUTRAL
+                if type(constr) is Building:
+                    owner = constr.player
+                    data[CAPTURE_HEALTH_OFFSET + cell] = constr.captureHealth
+                data[CONSTRS_OFFSET + cell] = packConstr(constr.type, owner)
+
+    ##
+    #clone
+    #Description: Returns a copy of this PackedState
+    #
+    #Return: The copy (PackedState)
+    ##
+    def clone(self):
+        return PackedState(data=bytearray(self.data))
+
+    ##
+    #key
+    #Description: Returns the packed bytes, which can be compared or used
+    #   as a dictionary key
+    #
+    #Return: The packed state (str)
+    ##
+    def key(self):
+        return str(self.data)
+
+    ##
+    #getPhase / getWhoseTurn / getFoodCount
+    #Description: Read the header without unpacking the state
+    ##
+    def getPhase(self):
+        return self.data[PHASE_OFFSET]
+
+    def getWhoseTurn(self):
+        return self.data[WHOSE_TURN_OFFSET]
+
+    def getFoodCount(self, playerId):
+        return self.data[FOOD_OFFSET + playerId]
+
+    ##
+    #getAnt
+    #Description: Reads the ant on a cell without unpacking the state
+    #
+    #Parameters:
+    #   coords - The cell ((int,int))
+    #
+    #Return: A tuple of (type, player, health, carrying, hasMoved) or None
+    #   if there is no ant there
+    ##
+    def getAnt(self, coords):
+        cell = coords[0] * BOARD_LENGTH + coords[1]
+        value = self.data[ANTS_OFFSET + cell]
+        if value == 0:
+            return None
+        return ((value & ANT_TYPE_MASK) - 1,
+                (value & ANT_OWNER_BIT) and PLAYER_TWO or PLAYER_ONE,
+                self.data[ANT_HEALTH_OFFSET + cell],
+                (value & ANT_CARRYING_BIT) != 0,
+                (value & ANT_MOVED_BIT) != 0)
+
+    ##
+    #getConstr
+    #Description: Reads the construction on a cell without unpacking the state
+    #
+    #Parameters:
+    #   coords - The cell ((int,int))
+    #
+    #Return: A tuple of (type, owner, captureHealth) or None if there is
+    #   nothing there.  The owner of grass and food is NEUTRAL and their
+    #   captureHealth is None.
+    ##
+    def getConstr(self, coords):
+        cell = coords[0] * BOARD_LENGTH + coords[1]
+        value = self.data[CONSTRS_OFFSET + cell]
+        if value == 0:
+            return None
+        owner = value >> CONSTR_OWNER_SHIFT
+        captureHealth = None
+        if owner != NEUTRAL:
+            captureHealth = self.data[CAPTURE_HEALTH_OFFSET + cell]
+        return ((value & CONSTR_TYPE_MASK) - 1 + ANTHILL, owner, captureHealth)
+
+    ##
+    #toGameState
+    #Description: Unpacks this state into a new GameState
+    #
+    #Parameters:
+    #   withBoard - Whether to build the board too.  Without one the
+    #       GameState is like one made by GameState.fastclone (bool)
+    #
+    #Return: The GameState
+    ##
+    def toGameState(self, withBoard=True):
+        data = self.data
+        ants = ([], [])
+        constrs = ([], [], [])
+        board = None
+        if withBoard:
+            board = [[Location((col, row)) for row in xrange(0, BOARD_LENGTH)]
+                     for col in xrange(0, BOARD_LENGTH)]
+
+        for cell in xrange(0, NUM_CELLS):
+            antValue = data[ANTS_OFFSET + cell]
+            constrValue = data[CONSTRS_OFFSET + cell]
+            if antValue == 0 and constrValue == 0:
+                continue
+            coords = (cell / BOARD_LENGTH, cell % BOARD_LENGTH)
+
+            if antValue != 0:
+                player = (antValue & ANT_OWNER_BIT) and PLAYER_TWO or PLAYER_ONE
+                ant = Ant(coords, (antValue & ANT_TYPE_MASK) - 1, player)
+                ant.health = data[ANT_HEALTH_OFFSET + cell]
+                ant.carrying = (antValue & ANT_CARRYING_BIT) != 0
+                ant.hasMoved = (antValue & ANT_MOVED_BIT) != 0
+                ants[player].append(ant)
+                if withBoard:
+                    board[coords[0]][coords[1]].ant = ant
+
+            if constrValue != 0:
+                constrType = (constrValue & CONSTR_TYPE_MASK) - 1 + ANTHILL
+                owner = constrValue >> CONSTR_OWNER_SHIFT
+                if owner == NEUTRAL:
+                    constr = Construction(coords, constrType)
+                else:
+                    constr = Building(coords, constrType, owner)
+                    constr.captureHealth = data[CAPTURE_HEALTH_OFFSET + cell]
+                constrs[owner].append(constr)
+                if withBoard:
+                    board[coords[0]][coords[1]].constr = constr
+
+        #anthills come before tunnels, as they do in the game's inventories
+        constrs[PLAYER_ONE].sort(key=lambda constr: constr.type)
+        constrs[PLAYER_TWO].sort(key=lambda constr: constr.type)
+        inventories = [Inventory(PLAYER_ONE, ants[PLAYER_ONE], constrs[PLAYER_ONE], data[FOOD_OFFSET + PLAYER_ONE]),
+                       Inventory(PLAYER_TWO, ants[PLAYER_TWO], constrs[PLAYER_TWO], data[FOOD_OFFSET + PLAYER_TWO]),
+                       Inventory(NEUTRAL, [], constrs[NEUTRAL], 0)]
+        return GameState(board, inventories, data[PHASE_OFFSET], data[WHOSE_TURN_OFFSET])
@@ -0,0 +1,294 @@
+import os, time, threading, multiprocessing
+from Constants import *
+from PackedState import PackedState
+from AlphaBetaSearch import SearchTimeout, INFINITY, WIN_SCORE, DEFAULT_TIME_LIMIT, DEFAULT_MAX_DEPTH
+
+#
+# ParallelSearch.py
+#
+# Spreads an AlphaBetaSearch over several processes by splitting the moves
+# at the root between them.  Every depth of the iterative deepening is
+# handed to the pool one root move at a time, so the workers that finish
+# early pick up the moves that are left.  The workers share the best root
+# score found so far, which lets each of them prune the rest of its moves
+# as if it had searched the others itself.
+#
+# The workers are forked copies of the process that starts the pool, so
+# they have their own copy of the player and its search.  They are given the
+# state to search packed into a PackedState, along with the order of its
+# inventories, which a PackedState doesn't keep.  The order matters: a move
+# made in place attacks the first enemy in range (see GameEngine.applyAttack)
+# and a captured tunnel stays in the inventory it was built in, so a worker
+# needs the same inventories as the serial search to score a move the same.
+#
+
+#How often a worker checks that the process that started it is still there,
+#in seconds
+PARENT_CHECK_INTERVAL = 1.0
+
+#How long to wait for a worker past the deadline before giving up on it
+WORKER_GRACE_TIME = 1.0
+
+#The search of a worker process and what it is searching (see initWorker)
+workerSearch = None
+workerPrepare = None
+workerAlpha = None
+workerRootId = None
+workerRoot = None
+
+##
+#initWorker
+#Description: Prepares a pool worker process to search
+#
+#Parameters:
+#   search - The worker's copy of the AlphaBetaSearch (AlphaBetaSearch)
+#   prepare - The worker's copy of the player's prepare function, or None
+#   alpha - The best root score found so far, shared by all the workers
+#       (multiprocessing.Value)
+#   parentPid - The id of the process that started the pool, or None if
+#       the search isn't in a pool worker (int)
+##
+def initWorker(search, prepare, alpha, parentPid):
+    global workerSearch, workerPrepare, workerAlpha
+    workerSearch = search
+    workerPrepare = prepare
+    workerAlpha = alpha
+    #a player process that is killed for taking too long can't stop its
+    #pool, so the workers stop themselves once it is gone
+    if parentPid != None:
+        watcher = threading.Thread(target=watchParent, args=(parentPid,))
+        watcher.daemon = True
+        watcher.start()
+
+##
+#watchParent
+#Description: Ends the worker process when the process that started it ends
+#
+#Parameters:
+#   parentPid - The id of the process that started the pool (int)
+##
+def watchParent(parentPid):
+    while os.getppid() == parentPid:
+        time.sleep(PARENT_CHECK_INTERVAL)
+    os._exit(0)
+
+##
+#getInventoryOrder
+#Description: Lists the coords of the ants and constructions of each of a
+#   state's inventories, in order
+#
+#Parameters:
+#   state - The state (GameState)
+#
+#Return: A tuple of (ant coords, construction coords), each a list with one
+#   list of coords per inventory
+##
+def getInventoryOrder(state):
+    return ([[tuple(ant.coords) for ant in inv.ants] for inv in state.inventories],
+            [[tuple(constr.coords) for constr in inv.constrs] for inv in state.inventories])
+
+##
+#setInventoryOrder
+#Description: Rearranges the inventories of a state unpacked from a
+#   PackedState to match the state it was packed from
+#
+#Parameters:
+#   state - The unpacked state (GameState)
+#   order - The order of the original state (see getInventoryOrder)
+##
+def setInventoryOrder(state, order):
+    antCoords, constrCoords = order
+    ants = {}
+    constrs = {}
+    for inv in state.inventories:
+        for ant in inv.ants:
+            ants[tuple(ant.coords)] = ant
+        for constr in inv.constrs:
+            constrs[tuple(constr.coords)] = constr
+    for i in xrange(0, len(state.inventories)):
+        state.inventories[i].ants = [ants[coords] for coords in antCoords[i]]
+        state.inventories[i].constrs = [constrs[coords] for coords in constrCoords[i]]
+
+##
+#searchRootMove
+#Description: Searches one root move in a worker process
+#
+#Parameters:
+#   task - A tuple of (search id, packed root state, its inventory order,
+#       index of the move, Move, depth, deadline) as built by
+#       ParallelSearch.search
+#
+#Return: A tuple of (index of the move, its score or None if the time ran
+#   out, whether the score is exact, number of states visited).  A score
+#   that isn't exact is an upper bound no better than the shared alpha.
+##
+def searchRootMove(task):
+    global workerRootId, workerRoot
+    searchId, packedData, order, index, move, depth, deadline = task
+    search = workerSearch
+    search.nodeCount = 0
+    search.deadline = deadline
+    if time.time() > deadline:
+        return (index, None, False, 0)
+
+    #the root is unpacked once per search and reused for each of its moves.
+    #Its children are made in place, so indexing it indexes all of them.
+    if workerRootId != searchId:
+        workerRoot = PackedState(data=packedData).toGameState(False)
+        setInventoryOrder(workerRoot, order)
+        workerRoot.buildIndex()
+        if workerPrepare != None:
+            workerPrepare(workerRoot)
+        if search.table != None:
+            search.table.newSearch()
+            workerRoot.getHash()
+        workerRootId = searchId
+
+    alpha = workerAlpha.value
+    try:
+        score = search.scoreChild(workerRoot, move, search.makeChild(workerRoot, move),
+                                  depth - 1, alpha, INFINITY)
+    except SearchTimeout:
+        #a move made in place may have been left half done
+        workerRootId = None
+        return (index, None, False, search.nodeCount)
+
+    with workerAlpha.get_lock():
+        if score > workerAlpha.value:
+            workerAlpha.value = score
+    return (index, score, score > alpha, search.nodeCount)
+
+##
+#ParallelSearch
+#Description: Runs an AlphaBetaSearch on a pool of worker processes.  The
+#   pool is started the first time it is needed.  It relies on the workers
+#   being forked, which is how multiprocessing starts processes on Linux and
+#   Mac OS.
+#
+#Variables:
+#   alphaBeta - The search to run (AlphaBetaSearch)
+#   prepare - A function (state) that readies the player to search from a
+#       root state, like getMove does before searching.  The workers are
+#       copies of the player from when the pool started, so it must also set
+#       up anything else the search depends on that may have changed since,
+#       such as the player's id.
+#   processes - The number of worker processes
+#   pool - The worker processes, or None until the first search
+#   alpha - The best root score found so far in the current depth
+#   searchId - Counts the searches so the workers know when the root changes
+#   nodeCount - The number of states visited by the last search
+#   depthReached - The deepest search that finished in the last search
+##
+class ParallelSearch(object):
+
+    ##
+    #__init__
+    #Description: Creates a new ParallelSearch
+    #
+    #Parameters:
+    #   alphaBeta - see above (AlphaBetaSearch)
+    #   prepare - see above (GameState -> None)
+    #   processes - The number of worker processes (default: one per core)
+    ##
+    def __init__(self, alphaBeta, prepare=None, processes=None):
+        self.alphaBeta = alphaBeta
+        self.prepare = prepare
+        if processes == None:
+            processes = multiprocessing.cpu_count()
+        self.processes = processes
+        self.pool = None
+        self.alpha = None
+        self.searchId = 0
+        self.nodeCount = 0
+        self.depthReached = 0
+
+    ##
+    #start
+    #Description: Starts the worker processes.  A sandboxed player's host
+    #   process is made to allow this (see PlayerProcess.start).  The workers
+    #   end themselves when the process that started them does (see
+    #   watchParent), so nothing is left behind.
+    ##
+    def start(self):
+        self.alpha = multiprocessing.Value('d', -INFINITY)
+        self.pool = multiprocessing.Pool(self.processes, initWorker,
+                                         (self.alphaBeta, self.prepare, self.alpha, os.getpid()))
+
+    ##
+    #stop
+    #Description: Stops the worker processes
+    ##
+    def stop(self):
+        if self.pool != None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    ##
+    #search
+    #Description: Searches one move deeper at a time until the time runs out
+    #   or maxDepth is reached, like AlphaBetaSearch.search, with the root
+    #   moves of each depth searched in parallel
+    #
+    #Parameters:
+    #   state - The state to find a move for (GameState)
+    #   timeLimit - How long the search may take in seconds (float)
+    #   maxDepth - The deepest to search, in moves (int)
+    #
+    #Return: The best Move found
+    ##
+    def search(self, state, timeLimit=DEFAULT_TIME_LIMIT, maxDepth=DEFAULT_MAX_DEPTH):
+        deadline = time.time() + timeLimit
+        if self.pool == None:
+            self.start()
+        self.searchId += 1
+        self.nodeCount = 0
+        self.depthReached = 0
+
+        root = state.fastclone()
+        root.buildIndex()
+        moves = [move for move, child in self.alphaBeta.orderChildren(root, self.alphaBeta.listMoves(root))]
+        bestMove = moves[0]
+        if len(moves) == 1:
+            return bestMove
+        packedData = PackedState(state).data
+        order = getInventoryOrder(state)
+
+        for depth in xrange(1, maxDepth + 1):
+            self.alpha.value = -INFINITY
+            tasks = [(self.searchId, packedData, order, i, moves[i], depth, deadline)
+                     for i in xrange(0, len(moves))]
+            results = self.pool.imap_unordered(searchRootMove, tasks, 1)
+            scores = {}
+            try:
+                for i in xrange(0, len(tasks)):
+                    index, score, exact, nodes = results.next(max(deadline - time.time(), 0) + WORKER_GRACE_TIME)
+                    self.nodeCount += nodes
+                    if score != None:
+                        scores[index] = (score, exact)
+            except multiprocessing.TimeoutError:
+                pass
+
+            #only exact scores can be compared, and the best one always is.
+            #Ties go to the move that was ordered first.
+            best = None
+            for index in xrange(0, len(moves)):
+                if index in scores and scores[index][1] and \
+                   (best == None or scores[index][0] > scores[best][0]):
+                    best = index
+
+            if len(scores) < len(moves):
+                #the time ran out.  The unfinished search can only improve on
+                #the best move so far if it got to search that move.
+                if 0 in scores and best != None:
+                    bestMove = moves[best]
+                break
+            bestMove = moves[best]
+            self.depthReached = depth
+            #search the best move first next time
+            moves.insert(0, moves.pop(best))
+            #nothing left to find out once the game is decided
+            if abs(scores[best][0]) >= WIN_SCORE:
+                break
+
+        return bestMove
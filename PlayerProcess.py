@@ -0,0 +1,197 @@
+import sys, traceback, multiprocessing, multiprocessing.util
+import cPickle as pickle
+from Constants import *
+from Player import Player
+
+#
+# PlayerProcess.py
+#
+# Runs an AI player in a separate process so that the game can enforce
+# AI_MOVE_TIMEOUT.  The process is persistent: the same AIPlayer object
+# answers every call, so anything the AI remembers between turns is kept.
+#
+
+#Request that tells a hosted player's process to exit
+STOP_REQUEST = "stop"
+
+##
+#PlayerTimeoutError
+#Description: Raised when a hosted player does not answer in time.  The
+#   game treats this as a forfeit.
+#
+#Variables:
+#   methodName - The Player method that timed out (string)
+#   timeout - The deadline that was missed, in seconds (float)
+##
+class PlayerTimeoutError(Exception):
+
+    def __init__(self, methodName, timeout):
+        super(PlayerTimeoutError, self).__init__(methodName + " took longer than " + str(timeout) + " seconds")
+        self.methodName = methodName
+        self.timeout = timeout
+
+##
+#hostPlayer
+#Description: The main loop of a hosted player's process.  Answers requests
+#   until the game closes the connection or asks it to stop.
+#
+#Parameters:
+#   conn - The process's end of the connection to the game (Connection)
+#   gameConn - The game's end of the connection, which the process inherited
+#       and closes so it notices when the game goes away (Connection)
+#   player - The AI player being hosted (Player)
+##
+def hostPlayer(conn, gameConn, player):
+    gameConn.close()
+    while True:
+        try:
+            request = conn.recv_bytes()
+        except EOFError:
+            break
+        methodName, playerId, args = pickle.loads(request)
+        if methodName == STOP_REQUEST:
+            break
+
+        player.playerId = playerId
+        try:
+            result = getattr(player, methodName)(*args)
+        except Exception:
+            #the game sees a None answer, which is an invalid move/placement/attack
+            traceback.print_exc()
+            result = None
+        sys.stdout.flush()
+        conn.send_bytes(pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+
+##
+#PlayerProcess
+#Description: Stands in for an AI player that is hosted in its own process.
+#   Every call is forwarded to the process and must be answered within the
+#   timeout or a PlayerTimeoutError is raised.  A player that timed out is
+#   restarted from its original state the next time it is called.
+#
+#Variables:
+#   player - The hosted player as it was before the process started (Player)
+#   timeout - The deadline for each getPlacement, getMove and getAttack call
+#       in seconds (float)
+#   finalizer - Stops the process when the process that started it exits,
+#       or None while it isn't running
+##
+class PlayerProcess(Player):
+
+    ##
+    #__init__
+    #Description: Creates a new PlayerProcess.  The process is started the
+    #   first time the player is called.
+    #
+    #Parameters:
+    #   player - The AI player to host (Player)
+    #   timeout - The deadline for each call in seconds (float)
+    ##
+    def __init__(self, player, timeout=AI_MOVE_TIMEOUT):
+        super(PlayerProcess, self).__init__(player.playerId, player.author)
+        self.player = player
+        self.timeout = timeout
+        self.process = None
+        self.conn = None
+        self.finalizer = None
+
+    ##
+    #start
+    #Description: Starts the hosted player's process.  The process isn't
+    #   daemonic, so the player may start processes of its own (such as a
+    #   ParallelSearch pool).  Instead it is stopped when the game's process
+    #   exits, before multiprocessing waits for its children.
+    ##
+    def start(self):
+        self.conn, childConn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=hostPlayer, args=(childConn, self.conn, self.player))
+        self.process.daemon = False
+        self.process.start()
+        childConn.close()
+        self.finalizer = multiprocessing.util.Finalize(None, self.stop, exitpriority=0)
+
+    ##
+    #stop
+    #Description: Stops the hosted player's process
+    ##
+    def stop(self):
+        if self.process == None:
+            return
+        self.finalizer.cancel()
+        self.finalizer = None
+        try:
+            self.conn.send_bytes(pickle.dumps((STOP_REQUEST, None, ()), pickle.HIGHEST_PROTOCOL))
+        except IOError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    ##
+    #call
+    #Description: Calls a method of the hosted player and waits for the answer
+    #
+    #Parameters:
+    #   methodName - The Player method to call (string)
+    #   args - The arguments to pass to the method (tuple)
+    #   timeout - How long to wait for the answer in seconds (float)
+    #
+    #Return: The method's return value
+    ##
+    def call(self, methodName, args, timeout):
+        if self.process == None or not self.process.is_alive():
+            self.stop()
+            self.start()
+        #binary pickles share the objects that the board and inventories have in common
+        self.conn.send_bytes(pickle.dumps((methodName, self.playerId, args), pickle.HIGHEST_PROTOCOL))
+        if not self.conn.poll(timeout):
+            #the player is stuck, so throw it away rather than wait for it
+            self.finalizer.cancel()
+            self.finalizer = None
+            self.process.terminate()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+            self.conn = None
+            raise PlayerTimeoutError(methodName, timeout)
+        try:
+            return pickle.loads(self.conn.recv_bytes())
+        except EOFError:
+            #the process died without answering
+            self.stop()
+            return None
+
+    ##
+    #getPlacement
+    #Description: Forwards getPlacement to the hosted player
+    ##
+    def getPlacement(self, currentState):
+        return self.call("getPlacement", (currentState,), self.timeout)
+
+    ##
+    #getMove
+    #Description: Forwards getMove to the hosted player
+    ##
+    def getMove(self, currentState):
+        return self.call("getMove", (currentState,), self.timeout)
+
+    ##
+    #getAttack
+    #Description: Forwards getAttack to the hosted player
+    ##
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.call("getAttack", (currentState, attackingAnt, enemyLocations), self.timeout)
+
+    ##
+    #registerWin
+    #Description: Forwards registerWin to the hosted player.  A player that
+    #   doesn't answer in time is simply restarted on its next call.
+    ##
+    def registerWin(self, hasWon):
+        try:
+            self.call("registerWin", (hasWon,), self.timeout)
+        except PlayerTimeoutError:
+            pass
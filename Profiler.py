@@ -0,0 +1,249 @@
+import os, sys, timeit, json, csv
+from Constants import *
+
+#resource is only on Unix.  Without it memory peaks aren't recorded and CPU
+#time is only counted to the clock tick.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#
+# Profiler.py
+#
+# Times the calls a game is made of (the players' getPlacement, getMove and
+# getAttack, the engine's checks of what they return and the UI's redraws)
+# and adds them up by author, game phase and operation, so slow AIs and
+# slow engine code can be found.  GameEngine and Game make their calls
+# through profileCall, which does nothing extra until they are given a
+# Profiler.
+#
+# Wall time covers everything the call waited for.  CPU time and memory
+# only count this process, so they leave out what a sandboxed player uses in
+# its own process.
+#
+
+#The names the phases are exported under
+PHASE_NAMES = {MENU_PHASE: "menu", SETUP_PHASE_1: "setup 1", SETUP_PHASE_2: "setup 2",
+               PLAY_PHASE: "play"}
+
+#The author that calls that aren't a player's are added up under
+ENGINE_AUTHOR = "(engine)"
+
+#What ru_maxrss is counted in, in bytes
+MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+#The columns of an exported profile
+EXPORT_FIELDS = ["author", "phase", "operation", "calls", "wallTotal", "wallMean", "wallMax",
+                 "cpuTotal", "cpuMean", "peakMemory"]
+
+##
+#ProfileEntry
+#Description: The totals of one operation for one author in one phase
+#
+#Variables:
+#   calls - The number of calls (int)
+#   wallTotal - The wall time of the calls in seconds (float)
+#   wallMax - The wall time of the slowest call in seconds (float)
+#   cpuTotal - The CPU time of the calls in seconds (float)
+#   peakMemory - The most any call raised the peak memory use of the
+#       process in bytes, or None if it wasn't recorded (int)
+##
+class ProfileEntry(object):
+
+    def __init__(self):
+        self.calls = 0
+        self.wallTotal = 0.0
+        self.wallMax = 0.0
+        self.cpuTotal = 0.0
+        self.peakMemory = None
+
+    ##
+    #add
+    #Description: Adds a call, or the totals of another entry, to the entry
+    #
+    #Parameters:
+    #   calls - The number of calls (int)
+    #   wall - Their wall time (float)
+    #   wallMax - The wall time of the slowest (float)
+    #   cpu - Their CPU time (float)
+    #   peakMemory - The most one of them raised the peak, or None (int)
+    ##
+    def add(self, calls, wall, wallMax, cpu, peakMemory):
+        self.calls += calls
+        self.wallTotal += wall
+        self.wallMax = max(self.wallMax, wallMax)
+        self.cpuTotal += cpu
+        if peakMemory != None:
+            self.peakMemory = max(self.peakMemory, peakMemory)
+
+##
+#Profiler
+#Description: Adds up the time spent in calls (see the top of this file)
+#
+#Variables:
+#   traceMemory - Whether to record memory peaks (bool)
+#   entries - The ProfileEntry of each (author, phase, operation)
+##
+class Profiler(object):
+
+    ##
+    #__init__
+    #Description: Creates a new Profiler
+    #
+    #Parameters:
+    #   traceMemory - see above.  Ignored if resource isn't available (bool)
+    ##
+    def __init__(self, traceMemory=False):
+        self.traceMemory = traceMemory and resource != None
+        self.entries = {}
+
+    ##
+    #call
+    #Description: Calls a function and adds the call to the totals, even if
+    #   it raises an exception
+    #
+    #Parameters:
+    #   author - The author of the player the call is for, or None for the
+    #       engine's own calls (string)
+    #   phase - The phase of the game (int)
+    #   operation - The name the call is added up under (string)
+    #   function - The function to call
+    #   args - The arguments to call it with
+    #
+    #Return: What the function returns
+    ##
+    def call(self, author, phase, operation, function, *args):
+        if self.traceMemory:
+            basePeak = getPeakMemory()
+        startWall = timeit.default_timer()
+        startCpu = getCpuTime()
+        try:
+            return function(*args)
+        finally:
+            wall = timeit.default_timer() - startWall
+            cpu = getCpuTime() - startCpu
+            peakMemory = None
+            if self.traceMemory:
+                peakMemory = getPeakMemory() - basePeak
+            self.getEntry(author, phase, operation).add(1, wall, wall, cpu, peakMemory)
+
+    ##
+    #getEntry
+    #Description: Returns the entry of an operation, creating it if needed
+    #
+    #Parameters:
+    #   author - The author, or None for the engine (string)
+    #   phase - The phase of the game (int)
+    #   operation - The name of the operation (string)
+    #
+    #Return: The entry (ProfileEntry)
+    ##
+    def getEntry(self, author, phase, operation):
+        if author == None:
+            author = ENGINE_AUTHOR
+        key = (author, PHASE_NAMES.get(phase, str(phase)), operation)
+        if key not in self.entries:
+            self.entries[key] = ProfileEntry()
+        return self.entries[key]
+
+    ##
+    #merge
+    #Description: Adds the totals of another profiler, such as one that ran
+    #   in a tournament worker, to this one's
+    #
+    #Parameters:
+    #   entries - The other profiler's entries
+    ##
+    def merge(self, entries):
+        for key, other in entries.items():
+            if key not in self.entries:
+                self.entries[key] = ProfileEntry()
+            self.entries[key].add(other.calls, other.wallTotal, other.wallMax, other.cpuTotal,
+                                  other.peakMemory)
+
+    ##
+    #clear
+    #Description: Forgets every call
+    ##
+    def clear(self):
+        self.entries = {}
+
+    ##
+    #listRows
+    #Description: Lists the totals, slowest operations first
+    #
+    #Return: A dict for each entry with the fields of EXPORT_FIELDS
+    ##
+    def listRows(self):
+        rows = []
+        for (author, phase, operation), entry in self.entries.items():
+            rows.append({"author": author, "phase": phase, "operation": operation,
+                         "calls": entry.calls, "wallTotal": entry.wallTotal,
+                         "wallMean": entry.wallTotal / entry.calls, "wallMax": entry.wallMax,
+                         "cpuTotal": entry.cpuTotal, "cpuMean": entry.cpuTotal / entry.calls,
+                         "peakMemory": entry.peakMemory})
+        rows.sort(key=lambda row: row["wallTotal"], reverse=True)
+        return rows
+
+    ##
+    #export
+    #Description: Writes the totals to a file, as CSV if its name ends in
+    #   .csv and as JSON otherwise
+    #
+    #Parameters:
+    #   path - The file (string)
+    ##
+    def export(self, path):
+        rows = self.listRows()
+        with open(path, "wb" if path.endswith(".csv") else "w") as profileFile:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(profileFile, EXPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump(rows, profileFile, indent=2, sort_keys=True)
+
+##
+#getCpuTime
+#Description: Returns the CPU time this process has used
+#
+#Return: The time in seconds (float)
+##
+def getCpuTime():
+    if resource != None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime + usage.ru_stime
+    user, system = os.times()[:2]
+    return user + system
+
+##
+#getPeakMemory
+#Description: Returns the most memory this process has used at once.  It
+#   never goes down, so a call that doesn't go past the peak of the calls
+#   before it raises it by nothing.
+#
+#Return: The peak in bytes (int)
+##
+def getPeakMemory():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
+
+##
+#profileCall
+#Description: Calls a function through a profiler, or just calls it if
+#   there is no profiler
+#
+#Parameters:
+#   profiler - The Profiler, or None (Profiler)
+#   author - see Profiler.call (string)
+#   phase - see Profiler.call (int)
+#   operation - see Profiler.call (string)
+#   function - The function to call
+#   args - The arguments to call it with
+#
+#Return: What the function returns
+##
+def profileCall(profiler, author, phase, operation, function, *args):
+    if profiler == None:
+        return function(*args)
+    return profiler.call(author, phase, operation, function, *args)
@@ -0,0 +1,242 @@
+import sys, random, multiprocessing
+from Constants import *
+from GameEngine import GameEngine
+from GameRecord import GameRecorder
+from PlayerProcess import PlayerProcess
+from WorkerPool import WorkerPool
+
+#
+# Tournament.py
+#
+# Plays the games of a tournament in parallel.  Every game is scheduled
+# separately on a multiprocessing pool so a round robin between many AIs
+# keeps all of the machine's cores busy.  The worker processes only load the
+# headless GameEngine, never the user interface.
+#
+
+#The AI players and engine of a worker process (see initWorker)
+workerPlayers = {}
+workerEngine = None
+workerSandbox = False
+
+##
+#initWorker
+#Description: Prepares a pool worker process to play games
+#
+#Parameters:
+#   aiDir - the directory the AI modules are loaded from (string)
+#   sandbox - whether to run each player in a process of its own (bool)
+#   logPath - the log to append a record of each game to, or None (string)
+#   profiler - a Profiler to time each game with, or None.  The worker gets
+#       its own copy and sends back the totals of each game (Profiler)
+##
+def initWorker(aiDir, sandbox, logPath=None, profiler=None):
+    global workerEngine, workerSandbox
+    if aiDir not in sys.path:
+        sys.path.insert(0, aiDir)
+    #forked workers would otherwise all share the parent's random sequence
+    random.seed()
+    workerPlayers.clear()
+    recorder = None
+    if logPath != None:
+        recorder = GameRecorder(logPath)
+    workerEngine = GameEngine(False, recorder, profiler)
+    workerSandbox = sandbox
+
+##
+#getWorkerPlayer
+#Description: Returns this worker's instance of a tournament player.  The
+#   instance is created the first time it is needed and reused afterwards,
+#   just like the single process tournament reuses its players.  Sandboxed
+#   players forfeit if they take longer than AI_MOVE_TIMEOUT to answer.
+#
+#Parameters:
+#   index - The player's index in the tournament (int)
+#   moduleName - The name of the module that defines the player's AIPlayer (string)
+#
+#Return: The player (Player)
+##
+def getWorkerPlayer(index, moduleName):
+    if index not in workerPlayers:
+        module = __import__(moduleName)
+        workerPlayers[index] = module.AIPlayer(-1)
+        if workerSandbox:
+            workerPlayers[index] = PlayerProcess(workerPlayers[index])
+    return workerPlayers[index]
+
+##
+#playScheduledGame
+#Description: Plays one game of the tournament in a worker process
+#
+#Parameters:
+#   game - A tuple of (p1 index, p1 module, p2 index, p2 module, seed) as
+#       built by scheduleGames
+#
+#Return: A tuple of (p1 index, p2 index, winner, profile) where winner is
+#   PLAYER_ONE, PLAYER_TWO or None for a draw and profile is the entries of
+#   the worker's Profiler for the game, or None if it has none
+##
+def playScheduledGame(game):
+    p1Index, p1Module, p2Index, p2Module, seed = game
+    p1 = getWorkerPlayer(p1Index, p1Module)
+    p2 = getWorkerPlayer(p2Index, p2Module)
+    profile = None
+    if workerEngine.profiler != None:
+        workerEngine.profiler.clear()
+    result = workerEngine.play(p1, p2, seed=seed)
+    if workerEngine.profiler != None:
+        profile = workerEngine.profiler.entries
+    return (p1Index, p2Index, result.winner, profile)
+
+##
+#scheduleGames
+#Description: Expands the pairings of a tournament into a list of single
+#   games that can be played independently
+#
+#Parameters:
+#   gamesToPlay - The pairings in the format used by Game:
+#       [[(p1 index, p2 index), numGames], ...]
+#   moduleNames - The module of each player, by index (string[])
+#   seed - If given, each game is seeded with seed + its position in the
+#       schedule so the tournament can be repeated (int)
+#
+#Return: A list of games for playScheduledGame
+##
+def scheduleGames(gamesToPlay, moduleNames, seed=None):
+    games = []
+    for pairing, numGames in gamesToPlay:
+        p1Index, p2Index = pairing
+        for i in xrange(0, numGames):
+            gameSeed = None
+            if seed != None:
+                gameSeed = seed + len(games)
+            games.append((p1Index, moduleNames[p1Index], p2Index, moduleNames[p2Index], gameSeed))
+    return games
+
+##
+#mergeResult
+#Description: Adds the outcome of one game to the tournament scores
+#
+#Parameters:
+#   playerScores - The scores as [[author, wins, losses], ...]
+#   result - A result returned by playScheduledGame
+##
+def mergeResult(playerScores, result):
+    p1Index, p2Index, winner = result[:3]
+    if winner == None:
+        return
+    indexes = (p1Index, p2Index)
+    playerScores[indexes[winner]][1] += 1
+    playerScores[indexes[(winner + 1) % 2]][2] += 1
+
+##
+#ParallelTournament
+#Description: Plays the scheduled games of a tournament on a process pool
+#   and merges the results into the players' scores as they finish.
+#
+#Variables:
+#   playerScores - The scores of the players as [[author, wins, losses], ...]
+#   numGames - The total number of games in the tournament
+#   numPlayed - The number of games that have finished
+##
+class ParallelTournament(object):
+
+    ##
+    #__init__
+    #Description: Starts playing the tournament in the background
+    #
+    #Parameters:
+    #   players - The players in the tournament, indexed as in gamesToPlay (Player[])
+    #   gamesToPlay - The pairings as [[(p1 index, p2 index), numGames], ...]
+    #   playerScores - The scores to merge the results into
+    #   processes - The number of worker processes (default: one per core)
+    #   seed - Seed for repeatable tournaments (int)
+    #   sandbox - whether to run each player in a process of its own (bool)
+    #   aiDir - the directory the AI modules are loaded from (string)
+    #   logPath - the log to append a record of each game to, or None.  Each
+    #       game is appended whole, so the workers can share it (string)
+    #   profiler - the Profiler to add the totals of each game to, or None
+    ##
+    def __init__(self, players, gamesToPlay, playerScores, processes=None, seed=None,
+                 sandbox=False, aiDir="AI", logPath=None, profiler=None):
+        self.playerScores = playerScores
+        self.profiler = profiler
+        moduleNames = []
+        for player in players:
+            #sandboxed players are rebuilt in the workers from the AI they host
+            if isinstance(player, PlayerProcess):
+                player = player.player
+            moduleNames.append(player.__class__.__module__)
+        games = scheduleGames(gamesToPlay, moduleNames, seed)
+        self.numGames = len(games)
+        self.numPlayed = 0
+        if sandbox:
+            self.pool = WorkerPool(processes, initWorker, (aiDir, sandbox, logPath, profiler))
+        else:
+            self.pool = multiprocessing.Pool(processes, initWorker, (aiDir, sandbox, logPath, profiler))
+        #hand out one game at a time so long games don't hold up a worker's queue
+        self.results = self.pool.imap_unordered(playScheduledGame, games, 1)
+        self.pool.close()
+
+    ##
+    #poll
+    #Description: Merges the results of any games that have finished
+    #
+    #Parameters:
+    #   timeout - How long to wait for a result in seconds, or None to wait
+    #       until the tournament is over (float)
+    #
+    #Return: True if every game has been played
+    ##
+    def poll(self, timeout=0):
+        while self.numPlayed < self.numGames:
+            try:
+                result = self.results.next(timeout)
+            except multiprocessing.TimeoutError:
+                return False
+            mergeResult(self.playerScores, result)
+            if self.profiler != None and result[3] != None:
+                self.profiler.merge(result[3])
+            self.numPlayed += 1
+            #only wait for the first result unless waiting for them all
+            if timeout != None:
+                timeout = 0
+        self.pool.join()
+        return True
+
+    ##
+    #stop
+    #Description: Abandons any games that haven't finished
+    ##
+    def stop(self):
+        self.pool.terminate()
+        self.pool.join()
+
+##
+#runRoundRobin
+#Description: Plays every pairing of the given players a number of times in
+#   parallel and tallies the results
+#
+#Parameters:
+#   players - The players taking part (Player[])
+#   numGames - The number of games to play per pairing (int)
+#   processes - The number of worker processes (default: one per core)
+#   seed - Seed for repeatable tournaments (int)
+#   sandbox - whether to run each player in a process of its own (bool)
+#   logPath - the log to append a record of each game to, or None (string)
+#   profiler - the Profiler to add the totals of each game to, or None
+#
+#Return: The scores of the players as [[author, wins, losses], ...] in the
+#   same order as players
+##
+def runRoundRobin(players, numGames, processes=None, seed=None, sandbox=False, logPath=None,
+                  profiler=None):
+    gamesToPlay = []
+    for i in range(0, len(players)):
+        for j in range(i + 1, len(players)):
+            gamesToPlay.append([(i, j), numGames])
+    playerScores = [[player.author, 0, 0] for player in players]
+    tournament = ParallelTournament(players, gamesToPlay, playerScores, processes, seed, sandbox,
+                                    logPath=logPath, profiler=profiler)
+    tournament.poll(None)
+    return playerScores
@@ -0,0 +1,105 @@
+#
+# TranspositionTable.py
+#
+# Remembers the results of searching states so that a search that reaches
+# the same state again (moving ant A then ant B, or B then A) can reuse them.
+# States are looked up by their Zobrist hash (see GameState.getHash).
+#
+
+#What a stored score says about the real score of the state
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+#Indices into a table entry
+ENTRY_HASH = 0
+ENTRY_DEPTH = 1
+ENTRY_SCORE = 2
+ENTRY_BOUND = 3
+ENTRY_MOVE = 4
+ENTRY_GENERATION = 5
+
+#The number of entries in a table by default
+DEFAULT_TABLE_SIZE = 1 << 16
+
+##
+#TranspositionTable
+#Description: A fixed size table of search results.  Each state hashes to
+#   one slot.  When two states want the same slot the deeper search is kept,
+#   unless the one stored is left over from an earlier search.  Entries
+#   left over from earlier searches are never looked up, as the evaluation
+#   may have changed between searches (a player may recompute its goals
+#   each turn).
+#
+#Variables:
+#   size - The number of entries the table holds
+#   entries - The entries as tuples of (hash, depth, score, bound, best
+#       move, generation), or None for an empty slot
+#   generation - Counts the searches the table has been used for
+#   hits - The number of successful lookups
+##
+class TranspositionTable(object):
+
+    ##
+    #__init__
+    #Description: Creates a new, empty TranspositionTable
+    #
+    #Parameters:
+    #   size - The number of entries to hold (int)
+    ##
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        self.size = size
+        self.entries = [None] * size
+        self.generation = 0
+        self.hits = 0
+
+    ##
+    #newSearch
+    #Description: Marks the start of a new search.  Entries from earlier
+    #   searches are no longer found and give way to new ones.
+    ##
+    def newSearch(self):
+        self.generation += 1
+
+    ##
+    #clear
+    #Description: Forgets everything
+    ##
+    def clear(self):
+        self.entries = [None] * self.size
+        self.hits = 0
+
+    ##
+    #lookup
+    #Description: Finds the entry the current search stored for a state
+    #
+    #Parameters:
+    #   stateHash - The hash of the state (int)
+    #
+    #Return: The entry tuple (see above) or None if the state isn't stored
+    ##
+    def lookup(self, stateHash):
+        entry = self.entries[stateHash % self.size]
+        if entry != None and entry[ENTRY_HASH] == stateHash and \
+           entry[ENTRY_GENERATION] == self.generation:
+            self.hits += 1
+            return entry
+        return None
+
+    ##
+    #store
+    #Description: Stores the result of searching a state, unless its slot
+    #   holds a deeper search from the current search
+    #
+    #Parameters:
+    #   stateHash - The hash of the state (int)
+    #   depth - How deep the state was searched (int)
+    #   score - The score the search found (float)
+    #   bound - Whether the score is EXACT, a LOWER_BOUND or an UPPER_BOUND
+    #   move - The best move found, or None (Move)
+    ##
+    def store(self, stateHash, depth, score, bound, move):
+        index = stateHash % self.size
+        old = self.entries[index]
+        if old == None or old[ENTRY_GENERATION] != self.generation or depth >= old[ENTRY_DEPTH]:
+            self.entries[index] = (stateHash, depth, score, bound, move, self.generation)
@@ -0,0 +1,367 @@
+import random, itertools
+from Constants import *
+from Ant import UNIT_STATS
+from Construction import CONSTR_STATS
+from Move import Move
+from AIPlayerUtils import listCheapestMovementPaths, listAdjacent
+from GameEngine import applyMove, undoMove
+
+#
+# TurnGenerator.py
+#
+# Lists and samples whole turns: the moves of every ant that moves, maybe a
+# build, and the END that passes the turn on.  Searching turns instead of
+# single moves lets a search count its depth in turns.
+#
+# Most ants are too far apart to get in each other's way, and the order
+# such ants move in makes no difference.  The ants are split into groups
+# that can reach none of the same cells.  The moves of each group are
+# listed on their own, and a turn is made by picking one option from each
+# group.  Only the ants within a group are tried in different orders.
+#
+# A turn is a list of Moves that ends with an END move.  applyTurn and
+# undoTurn make and take back a turn like GameEngine.applyMove and undoMove
+# do a single move, so they can be given to AlphaBetaSearch with listTurns.
+#
+
+#The most turns listTurns returns by default
+DEFAULT_MAX_TURNS = 64
+
+#The most options of each group that listTurns combines by default
+DEFAULT_MAX_GROUP_OPTIONS = 16
+
+#The most combinations of group options listTurns looks through
+MAX_COMBINATIONS = 4096
+
+#The most options listed for a group of ants that can get in each other's way
+MAX_GROUP_OPTIONS = 512
+
+##
+#listTurns
+#Description: Lists the turns the player whose turn it is can take.  If
+#   there are too many, only the best are listed, judged by how each group's
+#   option scores on its own.
+#
+#Parameters:
+#   state - The state to list the turns of.  It is changed while the turns
+#       are listed, but left as it was (GameState)
+#   evaluate - A function (state, playerId) -> float that ranks the options,
+#       or None to keep them in the order they are listed
+#   maxTurns - The most turns to list (int)
+#   maxGroupOptions - The most options of each group to combine (int)
+#
+#Return: The turns (Move[][]), best first if evaluate is given
+##
+def listTurns(state, evaluate=None, maxTurns=DEFAULT_MAX_TURNS,
+              maxGroupOptions=DEFAULT_MAX_GROUP_OPTIONS):
+    me = state.whoseTurn
+    inventory = state.inventories[me]
+    ants = [ant for ant in inventory.ants if not ant.hasMoved]
+    #group options are told apart by the state they lead to
+    state.getHash()
+
+    baseScore = 0
+    if evaluate != None:
+        baseScore = evaluate(state, me)
+    groupOptions = []
+    for group in listGroups(state, ants):
+        if len(group) == 1:
+            options = listAntOptions(state, group[0])
+        else:
+            options = listGroupOptions(state, group)
+        scored = []
+        for option in options:
+            score = 0
+            if evaluate != None:
+                records = applyTurn(state, option)
+                score = evaluate(state, me) - baseScore
+                undoTurn(state, records)
+            scored.append((score, option))
+        if evaluate != None:
+            scored.sort(key=lambda entry: entry[0], reverse=True)
+        groupOptions.append(scored[:maxGroupOptions])
+
+    #keep the number of combinations in hand by dropping the worst options
+    #of the biggest groups
+    while product([len(options) for options in groupOptions]) > MAX_COMBINATIONS:
+        biggest = max(groupOptions, key=len)
+        del biggest[-1]
+
+    hill = inventory.getAnthill()
+    turns = []
+    for combination in itertools.product(*groupOptions):
+        score = sum([entry[0] for entry in combination])
+        moves = []
+        for entry in combination:
+            moves.extend(entry[1])
+        food = inventory.foodCount - CONSTR_STATS[TUNNEL][BUILD_COST] * \
+            len([move for move in moves if move.moveType == BUILD])
+        if food < 0:
+            continue
+        turns.append((score, moves + [Move(END, None, None)]))
+        #an ant can be built on the anthill if no ant ends up there
+        if hill != None and isFreeAfter(state, hill.coords, moves):
+            for antType in xrange(WORKER, R_SOLDIER + 1):
+                if UNIT_STATS[antType][COST] <= food:
+                    turns.append((score, moves + [Move(BUILD, [hill.coords], antType),
+                                                  Move(END, None, None)]))
+
+    if evaluate != None:
+        turns.sort(key=lambda entry: entry[0], reverse=True)
+    return [entry[1] for entry in turns[:maxTurns]]
+
+##
+#sampleTurn
+#Description: Picks a random turn for the player whose turn it is.  Each
+#   ant that can moves to a random place it can reach, in a random order,
+#   and the player may then build an ant.
+#
+#Parameters:
+#   state - The state to pick a turn in.  It is changed while the turn is
+#       picked, but left as it was (GameState)
+#   buildChance - The chance of building an ant when the player can (float)
+#
+#Return: The turn (Move[])
+##
+def sampleTurn(state, buildChance=0.25):
+    me = state.whoseTurn
+    inventory = state.inventories[me]
+    ants = [ant for ant in inventory.ants if not ant.hasMoved]
+    random.shuffle(ants)
+    turn = []
+    records = []
+    for ant in ants:
+        option = random.choice(listAntOptions(state, ant))
+        records.extend(applyTurn(state, option))
+        turn.extend(option)
+
+    if random.random() < buildChance:
+        hill = inventory.getAnthill()
+        if hill != None and state.getAntAt(hill.coords) == None:
+            types = [antType for antType in xrange(WORKER, R_SOLDIER + 1)
+                     if UNIT_STATS[antType][COST] <= inventory.foodCount]
+            if len(types) > 0:
+                turn.append(Move(BUILD, [hill.coords], random.choice(types)))
+    undoTurn(state, records)
+    turn.append(Move(END, None, None))
+    return turn
+
+##
+#applyTurn
+#Description: Makes the moves of a turn, or part of one, in a state in
+#   place (see GameEngine.applyMove)
+#
+#Parameters:
+#   state - The state to change (GameState)
+#   turn - The moves to make (Move[])
+#
+#Return: An undo record for undoTurn
+##
+def applyTurn(state, turn):
+    return [applyMove(state, move) for move in turn]
+
+##
+#undoTurn
+#Description: Takes back the moves made by applyTurn
+#
+#Parameters:
+#   state - The state the moves were made in (GameState)
+#   records - The undo record that applyTurn returned
+##
+def undoTurn(state, records):
+    for record in reversed(records):
+        undoMove(state, record)
+
+##
+#listAntOptions
+#Description: Lists what one ant can do this turn: stay put, move to each
+#   place it can reach or, for a worker, build a tunnel where it stands
+#
+#Parameters:
+#   state - The state the ant is in (GameState)
+#   ant - An ant that hasn't moved (Ant)
+#
+#Return: The options as lists of Moves (Move[][]).  Staying put is an
+#   empty list.
+##
+def listAntOptions(state, ant):
+    options = [[]]
+    #moving nowhere differs from staying put only by attacking
+    attacks = hasEnemyInRange(state, ant)
+    for path in listCheapestMovementPaths(state, ant.coords, UNIT_STATS[ant.type][MOVEMENT],
+                                          ant.type == QUEEN):
+        if len(path) > 1 or attacks:
+            options.append([Move(MOVE_ANT, path, None)])
+    if ant.type == WORKER and canBuildTunnel(state, ant):
+        options.append([Move(BUILD, [ant.coords], TUNNEL)])
+    return options
+
+##
+#listGroupOptions
+#Description: Lists what a group of ants that can get in each other's way
+#   can do this turn, trying the ants in every order.  Orders that lead to
+#   the same state are listed once.
+#
+#Parameters:
+#   state - The state the ants are in.  It is changed while the options are
+#       listed, but left as it was (GameState)
+#   ants - The ants of the group (Ant[])
+#
+#Return: The options as lists of Moves (Move[][]), at most MAX_GROUP_OPTIONS
+##
+def listGroupOptions(state, ants):
+    options = []
+    addGroupOptions(state, ants, [], set(), set(), options)
+    return options
+
+##
+#addGroupOptions
+#Description: The recursive part of listGroupOptions
+#
+#Parameters:
+#   state - The state so far (GameState)
+#   ants - The ants of the group that have yet to be given an option (Ant[])
+#   moves - The moves made so far (Move[])
+#   visited - The (hash, ants left) pairs that have been searched from
+#   reached - The hashes of the states that options have been listed for
+#   options - The options listed so far, which this adds to
+##
+def addGroupOptions(state, ants, moves, visited, reached, options):
+    if len(options) >= MAX_GROUP_OPTIONS:
+        return
+    if len(ants) == 0:
+        if state.hash not in reached:
+            reached.add(state.hash)
+            options.append(list(moves))
+        return
+    key = (state.hash, tuple([id(ant) for ant in ants]))
+    if key in visited:
+        return
+    visited.add(key)
+
+    for i in xrange(0, len(ants)):
+        rest = ants[:i] + ants[i + 1:]
+        for option in listAntOptions(state, ants[i]):
+            records = applyTurn(state, option)
+            addGroupOptions(state, rest, moves + option, visited, reached, options)
+            undoTurn(state, records)
+
+##
+#listGroups
+#Description: Splits ants into groups that can't get in each other's way.
+#   An ant can only change whether the cells it can reach are free, so two
+#   ants are in the same group if one can reach a cell the other can reach
+#   or is next to (and might reach once the first ant moves off it).
+#   Enemies that an attack kills free cells too, which is left out: that
+#   only means a few moves are missed.
+#
+#Parameters:
+#   state - The state the ants are in (GameState)
+#   ants - The ants that haven't moved (Ant[])
+#
+#Return: The groups (Ant[][])
+##
+def listGroups(state, ants):
+    #each group as a tuple of (ants, cells they reach, those and the cells
+    #next to them)
+    groups = []
+    for ant in ants:
+        cells = set()
+        for path in listCheapestMovementPaths(state, ant.coords, UNIT_STATS[ant.type][MOVEMENT],
+                                              ant.type == QUEEN):
+            for coords in path:
+                cells.add(tuple(coords))
+        around = set(cells)
+        for coords in cells:
+            around.update(listAdjacent(coords))
+
+        #merge every group this ant could get in the way of into one
+        groupAnts = [ant]
+        for group in list(groups):
+            if not cells.isdisjoint(group[2]) or not around.isdisjoint(group[1]):
+                groupAnts = group[0] + groupAnts
+                cells |= group[1]
+                around |= group[2]
+                groups.remove(group)
+        groups.append((groupAnts, cells, around))
+    return [group[0] for group in groups]
+
+##
+#hasEnemyInRange
+#Description: Checks whether an ant could attack without moving
+#
+#Parameters:
+#   state - The state the ant is in (GameState)
+#   ant - The ant (Ant)
+#
+#Return: True if an enemy is in range
+##
+def hasEnemyInRange(state, ant):
+    attackRange = UNIT_STATS[ant.type][RANGE]
+    for enemy in state.inventories[1 - ant.player].ants:
+        diffX = ant.coords[0] - enemy.coords[0]
+        diffY = ant.coords[1] - enemy.coords[1]
+        if attackRange ** 2 >= diffX ** 2 + diffY ** 2:
+            return True
+    return False
+
+##
+#canBuildTunnel
+#Description: Checks whether a worker could build a tunnel where it stands
+#   (see AIPlayerUtils.listAllBuildMoves).  The player's food is checked
+#   when the turn is put together.
+#
+#Parameters:
+#   state - The state the worker is in (GameState)
+#   ant - The worker (Ant)
+#
+#Return: True if it could
+##
+def canBuildTunnel(state, ant):
+    if state.inventories[ant.player].foodCount < CONSTR_STATS[TUNNEL][BUILD_COST]:
+        return False
+    if state.getConstrAt(ant.coords) != None:
+        return False
+    for coords in listAdjacent(ant.coords):
+        constr = state.getConstrAt(coords)
+        if constr != None and constr.type == FOOD:
+            return False
+    return True
+
+##
+#isFreeAfter
+#Description: Checks whether a cell is free of ants once some moves are made
+#
+#Parameters:
+#   state - The state before the moves (GameState)
+#   coords - The cell ((int,int))
+#   moves - The moves (Move[])
+#
+#Return: True if no ant is on the cell after the moves
+##
+def isFreeAfter(state, coords, moves):
+    coords = tuple(coords)
+    free = state.getAntAt(coords) == None
+    for move in moves:
+        if move.moveType != MOVE_ANT:
+            continue
+        if tuple(move.coordList[0]) == coords:
+            free = True
+        if tuple(move.coordList[-1]) == coords:
+            free = False
+    return free
+
+##
+#product
+#Description: Multiplies a list of numbers
+#
+#Parameters:
+#   numbers - The numbers (int[])
+#
+#Return: Their product (int)
+##
+def product(numbers):
+    result = 1
+    for number in numbers:
+        result *= number
+    return result
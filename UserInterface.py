@@ -4,7 +4,7 @@
 #   and handles user input events.
 #
 ##
-import pygame, os, sys, time
+import pygame, os, sys, time, collections
 from pygame.locals import *
 from Building import Building
 from Ant import UNIT_STATS
@@ -23,10 +23,20 @@ DARK_BLUE = (0, 0, 150)
 LIGHT_BLUE = (0, 0, 255)
 ROBIN_EGG_BLUE = (0, 204, 204)
 GOLDENROD = (238, 173, 14)
+#Stands in for the see-through parts of shaded sprites while they are made.
+#It mustn't turn up in any texture.
+SPRITE_KEY = (255, 0, 255)
+#How opaque the shades over moved ants and highlighted cells are.
+SHADE_ALPHA = 50
+#How many rendered pieces of text are kept for reuse (see renderText).
+TEXT_CACHE_SIZE = 256
 CELL_SIZE = Rect(0,0,10,10)
 BOARD_SIZE = Rect(0,0,10,10)
 CELL_SPACING = 5
 FIELD_SPACING = 10
+#The most times per second the screen is drawn. Calls to drawBoard in
+#between only handle events.
+FRAME_RATE = 30
 
 ##
 #UserInterface
@@ -189,6 +199,9 @@ class UserInterface(object):
     #   message - The message to be relayed to the user.(string)
     ##
     def notify(self, message):
+        if message != self.lastNotification:
+            #the message has to be drawn before waitForEvent waits
+            self.eventsPending = True
         self.lastNotification = message
     
     ##
@@ -244,11 +257,13 @@ class UserInterface(object):
     #drawNotification
     #Description: draws the notification currently being relayed to the user.
     #   Breaks the notification into multiple lines if necessary.
+    #
+    #Returns: The area of the screen drawn on.(Rect)
     ##
     def drawNotification(self):
         #Draw a black box to encapsulate the notification
         outerNoteBox = Rect(0, 0, self.buttonRect.width + 2 * CELL_SPACING, self.buttonRect.height + 2 * CELL_SPACING)
-        pygame.draw.rect(self.screen, BLACK, outerNoteBox.move(self.messageLocation).move(-CELL_SPACING, -CELL_SPACING))
+        drawnRect = pygame.draw.rect(self.screen, BLACK, outerNoteBox.move(self.messageLocation).move(-CELL_SPACING, -CELL_SPACING))
         #Draw a white box to make the black box appear empty
         noteBox = Rect(0, 0, self.buttonRect.width + CELL_SPACING + 1, self.buttonRect.height + CELL_SPACING + 1)
         pygame.draw.rect(self.screen, WHITE, noteBox.move(self.messageLocation).move(-CELL_SPACING / 2, -CELL_SPACING / 2))
@@ -262,13 +277,14 @@ class UserInterface(object):
                indexOfNewline -= 1
             if indexOfNewline == breakupIndex:
                 indexOfNewline = int(float(len(self.lastNotification)) * pctToNewline) - 1
-            messageSurface = self.notifyFont.render(self.lastNotification[breakupIndex:breakupIndex+indexOfNewline].lstrip(), True, DARK_RED)
-            self.screen.blit(messageSurface, (self.messageLocation[0], self.messageLocation[1] + lineNum * self.notifyFont.get_height()))
+            messageSurface = self.renderText(self.notifyFont, self.lastNotification[breakupIndex:breakupIndex+indexOfNewline].lstrip(), DARK_RED)
+            drawnRect.union_ip(self.screen.blit(messageSurface, (self.messageLocation[0], self.messageLocation[1] + lineNum * self.notifyFont.get_height())))
             breakupIndex += indexOfNewline
             lineNum += 1
         
-        messageSurface = self.notifyFont.render(self.lastNotification[breakupIndex:].lstrip(), True, DARK_RED)
-        self.screen.blit(messageSurface, (self.messageLocation[0], self.messageLocation[1] + lineNum * self.notifyFont.get_height()))
+        messageSurface = self.renderText(self.notifyFont, self.lastNotification[breakupIndex:].lstrip(), DARK_RED)
+        drawnRect.union_ip(self.screen.blit(messageSurface, (self.messageLocation[0], self.messageLocation[1] + lineNum * self.notifyFont.get_height())))
+        return drawnRect
     
     ##
     #drawConstruction
@@ -281,16 +297,8 @@ class UserInterface(object):
     def drawConstruction(self, item, position):
         Xpixel = CELL_SPACING * (position[0] + 1) + CELL_SIZE.width * position[0]
         Ypixel = CELL_SPACING * (position[1] + 1) + CELL_SIZE.height * position[1]
-        constrTex = self.constructionTexs[item.type].copy()
-        background = pygame.Surface(CELL_SIZE.size)
-        if type(item) is Building:
-            background.fill(LIGHT_RED if item.player == PLAYER_ONE else LIGHT_BLUE)
-            constrTex.set_colorkey(self.playerAlpha)
-        else:
-            background.fill(WHITE)
-        background.blit(constrTex, (0, 0))
-        background.set_colorkey(WHITE)
-        self.screen.blit(background, (Xpixel, Ypixel))
+        owner = item.player if type(item) is Building else NEUTRAL
+        self.screen.blit(self.constrSprites[(item.type, owner)], (Xpixel, Ypixel))
     
     ##
     #drawAnt
@@ -303,32 +311,129 @@ class UserInterface(object):
     def drawAnt(self, ant, position):
         Xpixel = CELL_SPACING * (position[0] + 1) + CELL_SIZE.width * position[0]
         Ypixel = CELL_SPACING * (position[1] + 1) + CELL_SIZE.height * position[1]
-        #Start by drawing the ant itself onto a solid player color background.
-        #The player color should only show in areas of the playerAlpha color.
-        background = pygame.Surface(CELL_SIZE.size)
-        background.fill(LIGHT_RED if ant.player == PLAYER_ONE else LIGHT_BLUE)
-        background.blit(self.antTexs[ant.type], (0, 0))
-        background.set_colorkey(WHITE)
-        #Then draw the ant itself.
-        self.screen.blit(background, (Xpixel, Ypixel))
-        #Draw current health across the top from the left.
+        #The sprite has the player color, isCarrying marker and hasMoved shade.
+        self.screen.blit(self.antSprites[(ant.type, ant.player, bool(ant.carrying), bool(ant.hasMoved))], (Xpixel, Ypixel))
+        #Draw current health across the top from the left, shaded like the ant.
+        perimiterColor, healthColor, damageColor = self.healthColors[bool(ant.hasMoved)]
         healthBox = Rect(0,0,10,6)
         healthPerimiter = Rect(0,0,12,8)
         for x in xrange(0, UNIT_STATS[ant.type][HEALTH]):
-            pygame.draw.rect(self.screen, DARK_GREEN, healthPerimiter.move(Xpixel + CELL_SIZE.width - 15 * (x + 1) - 1, Ypixel + 1))
+            pygame.draw.rect(self.screen, perimiterColor, healthPerimiter.move(Xpixel + CELL_SIZE.width - 15 * (x + 1) - 1, Ypixel + 1))
         for x in xrange(0, ant.health):
-            pygame.draw.rect(self.screen, LIGHT_GREEN, healthBox.move(Xpixel + CELL_SIZE.width - 15 * (x + 1), Ypixel + 2))
+            pygame.draw.rect(self.screen, healthColor, healthBox.move(Xpixel + CELL_SIZE.width - 15 * (x + 1), Ypixel + 2))
         for x in xrange(ant.health, UNIT_STATS[ant.type][HEALTH]):
-            pygame.draw.rect(self.screen, DARK_RED, healthBox.move(Xpixel + CELL_SIZE.width - 15 * (x + 1), Ypixel + 2))
+            pygame.draw.rect(self.screen, damageColor, healthBox.move(Xpixel + CELL_SIZE.width - 15 * (x + 1), Ypixel + 2))
+    
+    ##
+    #makeConstrSprite
+    #Description: Draws a construction in its owner's color, ready to be
+    #   blitted to the board by drawConstruction.
+    #
+    #Parameters:
+    #   constrType - The type of the construction.(int)
+    #   owner - The player that owns it, or NEUTRAL for grass and food.(int)
+    #
+    #Returns: The sprite.(Surface)
+    ##
+    def makeConstrSprite(self, constrType, owner):
+        constrTex = self.constructionTexs[constrType].copy()
+        sprite = pygame.Surface(CELL_SIZE.size)
+        if owner != NEUTRAL:
+            #The player color should only show in areas of the playerAlpha color.
+            sprite.fill(LIGHT_RED if owner == PLAYER_ONE else LIGHT_BLUE)
+            constrTex.set_colorkey(self.playerAlpha)
+        else:
+            sprite.fill(WHITE)
+        sprite.blit(constrTex, (0, 0))
+        sprite.set_colorkey(WHITE)
+        return sprite.convert()
+    
+    ##
+    #makeAntSprite
+    #Description: Draws an ant in its player's color, ready to be blitted to
+    #   the board by drawAnt. The health bars aren't part of it.
+    #
+    #Parameters:
+    #   antType - The type of the ant.(int)
+    #   player - The player that owns it.(int)
+    #   carrying - Whether to draw the isCarrying marker.(bool)
+    #   hasMoved - Whether to shade it as having moved.(bool)
+    #
+    #Returns: The sprite.(Surface)
+    ##
+    def makeAntSprite(self, antType, player, carrying, hasMoved):
+        #Start by drawing the ant itself onto a solid player color background.
+        #The player color should only show in areas of the playerAlpha color.
+        sprite = pygame.Surface(CELL_SIZE.size)
+        sprite.fill(LIGHT_RED if player == PLAYER_ONE else LIGHT_BLUE)
+        sprite.blit(self.antTexs[antType], (0, 0))
         #Draw isCarrying marker in lower right
-        if ant.carrying:
+        if carrying:
             XoffsetCarry = CELL_SIZE.width - self.isCarryingTex.get_width()
             YoffsetCarry = CELL_SIZE.height - self.isCarryingTex.get_height()
-            self.screen.blit(self.isCarryingTex, (Xpixel + XoffsetCarry, Ypixel + YoffsetCarry))
-        #Draw hasMoved marker as a shade across the image
-        if ant.hasMoved:
-            self.shaderTex.fill(BLACK)
-            self.screen.blit(self.shaderTex, (Xpixel, Ypixel))
+            sprite.blit(self.isCarryingTex, (XoffsetCarry, YoffsetCarry))
+        sprite.set_colorkey(WHITE)
+        if not hasMoved:
+            return sprite.convert()
+        #The hasMoved shade also darkens whatever shows through the ant, so
+        #the shaded sprite is the shaded ant over a translucent black.
+        shadedAnt = pygame.Surface(CELL_SIZE.size)
+        shadedAnt.fill(SPRITE_KEY)
+        shadedAnt.blit(sprite, (0, 0))
+        shadedAnt.blit(self.shadeTexs[BLACK], (0, 0))
+        #Blending can leave junk in the spare byte of 32 bit pixels that
+        #stops them matching the colorkey, so go through 24 bits.
+        shadedAnt = shadedAnt.convert(24)
+        shadedAnt.set_colorkey(self.shadeColor(SPRITE_KEY, BLACK))
+        shadedSprite = pygame.Surface(CELL_SIZE.size, SRCALPHA, 32)
+        shadedSprite.fill(BLACK + (SHADE_ALPHA,))
+        shadedSprite.blit(shadedAnt, (0, 0))
+        return shadedSprite.convert_alpha()
+    
+    ##
+    #shadeColor
+    #Description: Finds the color a shade turns another color into.
+    #
+    #Parameters:
+    #   color - The color under the shade.((int,int,int))
+    #   shade - The color of the shade.((int,int,int))
+    #
+    #Returns: The shaded color.((int,int,int))
+    ##
+    def shadeColor(self, color, shade):
+        pixel = pygame.Surface((1, 1))
+        pixel.fill(color)
+        pixel.blit(self.shadeTexs[shade], (0, 0))
+        return tuple(pixel.get_at((0, 0)))[:3]
+    
+    ##
+    #renderText
+    #Description: Renders a piece of text, reusing the surface it was
+    #   rendered to last time if it is one of the TEXT_CACHE_SIZE most
+    #   recently used. The scores, notifications and tables are the same
+    #   from one frame to the next, so they are rarely rendered again.
+    #
+    #Parameters:
+    #   font - The font to render it in.(Font)
+    #   text - The text.(string)
+    #   color - The color of the text.((int,int,int))
+    #   background - The color behind the text, or None for none.((int,int,int))
+    #
+    #Returns: The rendered text, which mustn't be drawn on.(Surface)
+    ##
+    def renderText(self, font, text, color, background=None):
+        key = (font, text, color, background)
+        label = self.textCache.pop(key, None)
+        if label == None:
+            if background == None:
+                label = font.render(text, True, color)
+            else:
+                label = font.render(text, True, color, background)
+            if len(self.textCache) >= TEXT_CACHE_SIZE:
+                #forget the least recently used text
+                self.textCache.popitem(False)
+        self.textCache[key] = label
+        return label
     
     ##
     #drawCaptureHealths
@@ -338,8 +443,8 @@ class UserInterface(object):
     #   health - the amount of health to draw.(int, int)
     ##
     def drawCaptureHealths(self, health):
-        label1 = self.monsterFont.render(str(health[0]), True, DARK_BLUE, WHITE)
-        label2 = self.monsterFont.render(str(health[1]), True, DARK_RED, WHITE)
+        label1 = self.renderText(self.monsterFont, str(health[0]), DARK_BLUE, WHITE)
+        label2 = self.renderText(self.monsterFont, str(health[1]), DARK_RED, WHITE)
         #Find out where to put the text onscreen.
         label1Size = label1.get_size()
         label2Size = label2.get_size()
@@ -386,7 +491,7 @@ class UserInterface(object):
     ##
     def drawCaptureHealth(self, health, coords, player):
         #Create and add settings to the text we want to draw. Background needs to be set so we don't have per pixel alpha.
-        label = self.captureFont.render(str(health), True, LIGHT_RED if player == PLAYER_ONE else LIGHT_BLUE, WHITE)
+        label = self.renderText(self.captureFont, str(health), LIGHT_RED if player == PLAYER_ONE else LIGHT_BLUE, WHITE)
         label.set_colorkey(WHITE)
         label.set_alpha(100)
         #Find where to place the text.
@@ -401,12 +506,14 @@ class UserInterface(object):
     #
     #Parameters:
     #   key - a key in the self.buttons hash table, known in Python as a Dictionary.(string)
+    #
+    #Returns: The area of the screen drawn on.(Rect)
     ##
     def drawButton(self, key, buttons):
-        label = self.gameFont.render(key, True, BLACK)
+        label = self.renderText(self.gameFont, key, BLACK)
         offset = subtractCoords(self.buttonRect.center, label.get_rect().center)
-        self.screen.blit(self.buttonTextures[buttons[key][1]], buttons[key][0])
-        self.screen.blit(label, addCoords(buttons[key][0], offset))
+        drawnRect = self.screen.blit(self.buttonTextures[buttons[key][1]], buttons[key][0])
+        return drawnRect.union(self.screen.blit(label, addCoords(buttons[key][0], offset)))
     
     ##
     #drawScoreBoard
@@ -415,12 +522,14 @@ class UserInterface(object):
     #Parameters:
     #   player1Score - the integer value of player 1's food stock.(int)
     #   player2Score - the integer value of player 2's food stock.(int)
+    #
+    #Returns: The area of the screen drawn on.(Rect)
     ##
     def drawScoreBoard(self, player1Score, player2Score):
-        label1 = self.gameFont.render("Player 1: " + str(player1Score) + " food", True, BLACK)
-        label2 = self.gameFont.render("Player 2: " + str(player2Score) + " food", True, BLACK)
-        self.screen.blit(label1, self.scoreLocation)
-        self.screen.blit(label2, addCoords(self.scoreLocation, (0, label2.get_rect().height)))
+        label1 = self.renderText(self.gameFont, "Player 1: " + str(player1Score) + " food", BLACK)
+        label2 = self.renderText(self.gameFont, "Player 2: " + str(player2Score) + " food", BLACK)
+        drawnRect = self.screen.blit(label1, self.scoreLocation)
+        return drawnRect.union(self.screen.blit(label2, addCoords(self.scoreLocation, (0, label2.get_rect().height))))
     
     ##
     #drawTextBox
@@ -430,11 +539,11 @@ class UserInterface(object):
         #Start by drawing the text box in the appropriate color.
         pygame.draw.rect(self.screen, DARK_RED if self.textBoxContent == '' else LIGHT_GREEN, self.buttonRect.move(self.textPosition))
         #Then draw the number in the text box.
-        label = self.gameFont.render(self.textBoxContent + ('|' if self.boxSelected else ''), True, BLACK)
+        label = self.renderText(self.gameFont, self.textBoxContent + ('|' if self.boxSelected else ''), BLACK)
         offset = subtractCoords(self.buttonRect.center, label.get_rect().center)
         self.screen.blit(label, addCoords(self.textPosition, offset))
         #Finally, draw the text box title.
-        boxLabel = self.gameFont.render("Games to play:", True, BLACK)
+        boxLabel = self.renderText(self.gameFont, "Games to play:", BLACK)
         boxLabelOffset = (0, - boxLabel.get_height() - FIELD_SPACING)
         self.screen.blit(boxLabel, addCoords(self.textPosition, boxLabelOffset))
     
@@ -464,7 +573,7 @@ class UserInterface(object):
                 Xoffset = 0 if innerDex == 0 else reduce(lambda x,y: x+y, lengths[:innerDex+1])
                 tempX = XStartPixel + Xoffset + FIELD_SPACING * innerDex
                 tempY = YStartPixel + index * (self.tournFont.get_height() + FIELD_SPACING)
-                label = self.tournFont.render(str(scores[index][innerDex]), True, BLACK)
+                label = self.renderText(self.tournFont, str(scores[index][innerDex]), BLACK)
                 self.screen.blit(label, (tempX, tempY))
 
         #Add some underlines under the table headers
@@ -479,7 +588,7 @@ class UserInterface(object):
         #Draw the elapsed time
         Yoffset = YStartPixel + len(scores) * (self.tournFont.get_height() + FIELD_SPACING)
         if (self.tournamentInProgress):
-            self.tournamentElapsed = time.clock() - self.tournamentStartTime
+            self.tournamentElapsed = time.time() - self.tournamentStartTime
         elapsedMessage = "Elapsed time: "
         elapsedColor = DARK_RED
         if (not self.tournamentInProgress):
@@ -487,7 +596,7 @@ class UserInterface(object):
             elapsedColor = DARK_GREEN
         elapsedMessage += str(int(self.tournamentElapsed) / 60) + "m "
         elapsedMessage += str(int(self.tournamentElapsed) % 60) + "s"
-        label = self.tournFont.render(elapsedMessage, True, elapsedColor)
+        label = self.renderText(self.tournFont, elapsedMessage, elapsedColor)
         self.screen.blit(label, (XStartPixel, Yoffset))
         
     
@@ -516,7 +625,7 @@ class UserInterface(object):
             tempX = XStartPixel + (secondColumnOffset if index >= maxRows else 0)
             tempY = YStartPixel + index % maxRows * (self.checkBoxRect.height + FIELD_SPACING)
             self.screen.blit(self.checkBoxTextures[safeList[index][1]], (tempX, tempY))
-            label = self.notifyFont.render(str(safeList[index][0].author), True, BLACK)
+            label = self.renderText(self.notifyFont, str(safeList[index][0].author), BLACK)
             self.screen.blit(label, (tempX + self.checkBoxRect.width + FIELD_SPACING, tempY + (self.checkBoxRect.height - self.notifyFont.get_height()) / 2))
         #Find out where the button should go.
         buttonIndex = maxRows if maxRows < len(safeList) else len(safeList)
@@ -534,6 +643,8 @@ class UserInterface(object):
     #Parameters:
     #   currentLoc - The Location to be drawn in this cell. Locations can have
     #       ants and buildings attached, so those will be drawn if present.(Location)
+    #
+    #Returns: The area of the cell, including its highlight.(Rect)
     ##
     def drawCell(self, currentLoc):
         col = currentLoc.coords[0]
@@ -548,20 +659,9 @@ class UserInterface(object):
         #Find the X and Y coordinates to draw the shade at.
         shadeXpixel = Xpixel - CELL_SPACING / 2
         shadeYpixel = Ypixel - CELL_SPACING / 2
-        #Create a True/False list indicating which shaders should be drawn
-        drawList = []
+        #Find which shaders should be drawn
+        drawList = self.getCellShades(currentLoc.coords)
         colorList = [DARK_GREEN, LIGHT_GREEN, GOLDENROD, LIGHT_RED]
-        if self.coordList != []:
-            #Draw the shadeRect if currentLoc is in coordList
-            drawList.append(True if currentLoc.coords in self.coordList[:-1] else False)
-            #Draw brighter if the currentLoc is the last move selected
-            drawList.append(True if currentLoc.coords == self.coordList[-1] else False)
-        else:
-            drawList += [False, False]
-        #Also shade potential moves.
-        drawList.append(True if currentLoc.coords in self.validCoordList else False)
-        #Draw the shade for a cell highlighted for attacks if currentLoc is in attackList
-        drawList.append(True if currentLoc.coords in self.attackList else False)
         #Draw the background shades
         for index in xrange(0, len(drawList)):
             if drawList[index]:
@@ -576,17 +676,65 @@ class UserInterface(object):
         #Draw the translucent foreground shades.
         for index in xrange(0, len(drawList)):
             if drawList[index]:
-                self.shaderTex.fill(colorList[index])
-                self.screen.blit(self.shaderTex, CELL_SIZE.move(Xpixel, Ypixel))
+                self.screen.blit(self.shadeTexs[colorList[index]], CELL_SIZE.move(Xpixel, Ypixel))
         #Draw the captureHealth of any ant tunnel being captured.
         captureVal = self.getCaptureValue(currentLoc)
         if captureVal != -1:
             self.drawCaptureHealth(captureVal, (Xpixel, Ypixel), currentLoc.constr.player)
+        return shadeRect.move(shadeXpixel, shadeYpixel)
+
+    ##
+    #getCellShades
+    #Description: Finds which highlights a cell is drawn with.
+    #
+    #Parameters:
+    #   coords - The board coordinates of the cell.((int,int))
+    #
+    #Returns: A True/False list of whether the cell is part of the selected
+    #   move, the last cell of it, a valid move and a valid attack.
+    ##
+    def getCellShades(self, coords):
+        drawList = []
+        if self.coordList != []:
+            #Draw the shadeRect if currentLoc is in coordList
+            drawList.append(True if coords in self.coordList[:-1] else False)
+            #Draw brighter if the currentLoc is the last move selected
+            drawList.append(True if coords == self.coordList[-1] else False)
+        else:
+            drawList += [False, False]
+        #Also shade potential moves.
+        drawList.append(True if coords in self.validCoordList else False)
+        #Draw the shade for a cell highlighted for attacks if currentLoc is in attackList
+        drawList.append(True if coords in self.attackList else False)
+        return drawList
+
+    ##
+    #getCellKey
+    #Description: Describes everything drawCell draws in a cell, so a cell
+    #   only has to be drawn again when this changes.
+    #
+    #Parameters:
+    #   currentLoc - The Location of the cell.(Location)
+    #
+    #Returns: A tuple that is equal for cells that look the same.
+    ##
+    def getCellKey(self, currentLoc):
+        constr = currentLoc.constr
+        constrKey = None
+        if constr != None:
+            constrKey = (constr.type, constr.player if type(constr) is Building else None)
+        ant = currentLoc.ant
+        antKey = None
+        if ant != None:
+            antKey = (ant.type, ant.player, ant.health, ant.carrying, ant.hasMoved)
+        return (constrKey, antKey, tuple(self.getCellShades(currentLoc.coords)))
 
     ##
     #drawBoard
     #Description: This is the bread and butter of the UserInterface class. Everything
-    #   starts drawing from here.
+    #   starts drawing from here.  Only what has changed since the last call
+    #   is drawn again, so calling this in a loop costs little when nothing
+    #   is happening.
     #
     #Parameters:
     #   currentState - The state of the board to draw as a GameState.(GameState)
@@ -594,49 +742,200 @@ class UserInterface(object):
     ##
     def drawBoard(self, currentState, mode):
         self.handleEvents(mode)
+        #Leave the drawing to a later call if the last frame was too recent.
+        if time.time() - self.lastFrameTime < 1.0 / FRAME_RATE:
+            self.pendingFrame = (currentState, mode)
+            return
+        self.pendingFrame = None
+        self.drawFrame(currentState, mode)
+
+    ##
+    #drawFrame
+    #Description: Draws the screen, without handling events.
+    #
+    #Parameters:
+    #   currentState - The state of the board to draw as a GameState.(GameState)
+    #   mode - The current game mode.(int)
+    ##
+    def drawFrame(self, currentState, mode):
+        self.lastFrameTime = time.time()
+        if self.choosingAIs or mode == TOURNAMENT_MODE:
+            self.drawMenuScreen(mode)
+        else:
+            self.drawGameScreen(currentState, mode)
+
+    ##
+    #drawMenuScreen
+    #Description: Draws the AI checklist or the tournament screen. These are
+    #   drawn whole, but only when something on them has changed.
+    #
+    #Parameters:
+    #   mode - The current game mode.(int)
+    ##
+    def drawMenuScreen(self, mode):
+        buttonStates = tuple([(key, self.buttons[key][1]) for key in self.buttons])
+        if self.choosingAIs:
+            screenKey = ("checklist", mode, tuple([(str(ai[0].author), ai[1]) for ai in self.allAIs]),
+                         self.submitSelected.values()[0][1], self.lastNotification, buttonStates)
+        else:
+            elapsed = None
+            if self.tournamentInProgress:
+                elapsed = int(time.time() - self.tournamentStartTime)
+            screenKey = ("tournament", self.textBoxContent, self.boxSelected, self.tournamentInProgress,
+                         elapsed, tuple([tuple(score) for score in self.tournamentScores]), buttonStates)
+        if screenKey == self.lastScreen:
+            return
+        self.lastScreen = screenKey
+
+        self.screen.fill(WHITE)
         if self.choosingAIs:
-            self.screen.fill(WHITE)
             self.drawAIChecklist(mode)
             self.drawNotification()
-        elif mode == TOURNAMENT_MODE:
-            self.screen.fill(WHITE)
+        else:
             #Draw the box into which the user can enter the number of games they want to play.
             self.drawTextBox()
             #Draw the table with columns author/win/loss/tie
             self.drawTable()
-        else:
-            self.screen.fill(BLACK)
-            #Draw the menu area.
-            pygame.draw.rect(self.screen, WHITE, self.buttonArea)
-            #Draw the player color indicator boxes.
-            pygame.draw.rect(self.screen, LIGHT_RED, self.outerRect)
-            pygame.draw.rect(self.screen, BLACK, self.innerRect.move((CELL_SPACING, CELL_SPACING)))
-            pygame.draw.rect(self.screen, LIGHT_BLUE, self.outerRect.move((0, self.p2RectYOffset)))
-            pygame.draw.rect(self.screen, BLACK, self.innerRect.move((CELL_SPACING, CELL_SPACING + self.p2RectYOffset)))
-            #Draw the cells themselves.
-            for col in xrange(0, len(currentState.board)):
-                for row in xrange(0, len(currentState.board[col])):
-                    self.drawCell(currentState.board[col][row])
-            #Draw the captureHealth of any anthill being captured.
-            captureVals = self.getCaptureValues(currentState)
-            if captureVals[0] != -1 or captureVals[1] != -1:
-                self.drawCaptureHealths(captureVals)
-            #Make sure we draw the right buttons
-            relButtons = {} if mode == None else self.humanButtons if mode == HUMAN_MODE else self.aiButtons
-            if self.buildAntMenu == True:
-                relButtons = self.antButtons
-            #Draw the context buttons
-            for key in relButtons:
-                self.drawButton(key, relButtons)
-            #I can't put this draw method outside of drawBoard, but it shouldn't work this way.
-            self.drawScoreBoard(currentState.inventories[0].foodCount, currentState.inventories[1].foodCount)
-            #Draw notifications just above menu buttons.
-            self.drawNotification()
         #Draw the basic buttons
         for key in self.buttons:
             self.drawButton(key, self.buttons)
         #Show everything I've drawn by posting self.screen to the monitor.
         pygame.display.flip()
+
+    ##
+    #drawGameScreen
+    #Description: Draws the board, the buttons, the scores and the
+    #   notification. Each is drawn again only when it has changed, and only
+    #   the parts of the screen drawn on are posted to the monitor.
+    #
+    #Parameters:
+    #   currentState - The state of the board to draw as a GameState.(GameState)
+    #   mode - The current game mode.(int)
+    ##
+    def drawGameScreen(self, currentState, mode):
+        #Make sure we draw the right buttons
+        relButtons = {} if mode == None else self.humanButtons if mode == HUMAN_MODE else self.aiButtons
+        if self.buildAntMenu == True:
+            relButtons = self.antButtons
+        #The capture healths are drawn across several cells, so the board is
+        #drawn whole while they are showing.
+        captureVals = self.getCaptureValues(currentState)
+        overlays = [captureVals] + [(col, row) for col in xrange(0, len(currentState.board))
+                                    for row in xrange(0, len(currentState.board[col]))
+                                    if self.getCaptureValue(currentState.board[col][row]) != -1]
+        screenKey = ("board", mode, self.buildAntMenu)
+        redrawAll = screenKey != self.lastScreen or overlays != [(-1, -1)] or overlays != self.lastOverlays
+        self.lastScreen = screenKey
+        self.lastOverlays = overlays
+        if redrawAll:
+            #Draw the black background, the menu area and the player color
+            #indicator boxes.
+            self.screen.blit(self.boardBackground, (0, 0))
+            self.lastRegions = {}
+
+        dirtyRects = []
+        #Draw the cells themselves.
+        for col in xrange(0, len(currentState.board)):
+            for row in xrange(0, len(currentState.board[col])):
+                currentLoc = currentState.board[col][row]
+                self.drawRegion((col, row), self.getCellKey(currentLoc), dirtyRects, self.drawCell, currentLoc)
+        #Draw the captureHealth of any anthill being captured.
+        if captureVals[0] != -1 or captureVals[1] != -1:
+            self.drawCaptureHealths(captureVals)
+        #Draw the context buttons
+        for key in relButtons:
+            self.drawRegion(key, (relButtons[key][0], relButtons[key][1]), dirtyRects, self.drawButton, key, relButtons)
+        #I can't put this draw method outside of drawBoard, but it shouldn't work this way.
+        foodCounts = (currentState.inventories[0].foodCount, currentState.inventories[1].foodCount)
+        self.drawRegion("score", foodCounts, dirtyRects, self.drawScoreBoard, foodCounts[0], foodCounts[1])
+        #Draw notifications just above menu buttons.
+        self.drawRegion("notification", self.lastNotification, dirtyRects, self.drawNotification)
+        #Draw the basic buttons
+        for key in self.buttons:
+            self.drawRegion(key, (self.buttons[key][0], self.buttons[key][1]), dirtyRects, self.drawButton, key, self.buttons)
+
+        #Show what I've drawn by posting it to the monitor.
+        if redrawAll:
+            pygame.display.flip()
+        elif dirtyRects:
+            pygame.display.update(dirtyRects)
+
+    ##
+    #drawRegion
+    #Description: Draws one part of the game screen again if it has changed
+    #   since it was last drawn, first clearing the area it was drawn on.
+    #
+    #Parameters:
+    #   name - The name the part is remembered by.(hashable)
+    #   key - A description of what is drawn, equal only if it looks the same.(hashable)
+    #   dirtyRects - The areas drawn on so far, which this adds to.(Rect[])
+    #   draw - The method that draws the part and returns the area it drew on.
+    #   args - The arguments to call draw with.
+    ##
+    def drawRegion(self, name, key, dirtyRects, draw, *args):
+        last = self.lastRegions.get(name)
+        if last != None and last[0] == key:
+            return
+        if last != None:
+            self.screen.blit(self.boardBackground, last[1], last[1])
+        drawnRect = draw(*args)
+        self.lastRegions[name] = (key, drawnRect)
+        dirtyRects.append(drawnRect if last == None else drawnRect.union(last[1]))
+
+    ##
+    #waitForEvent
+    #Description: Waits until the user does something, so loops waiting on
+    #   the user don't keep the processor busy. Draws the frame drawBoard
+    #   left for later first. Doesn't wait if drawBoard handled events or
+    #   the notification changed since the last wait, as the game may not
+    #   have caught up with them yet.
+    #
+    #Parameters:
+    #   timeout - The most seconds to wait, or None to wait as long as it
+    #       takes.(float)
+    ##
+    def waitForEvent(self, timeout=None):
+        if self.pendingFrame != None:
+            self.drawFrame(*self.pendingFrame)
+            self.pendingFrame = None
+        if self.eventsPending:
+            self.eventsPending = False
+            return
+        if timeout != None:
+            if timeout <= 0:
+                return
+            #wake up with a timer event if nothing else happens
+            pygame.time.set_timer(USEREVENT, max(1, int(timeout * 1000)))
+        self.waitedEvents.append(pygame.event.wait())
+        if timeout != None:
+            pygame.time.set_timer(USEREVENT, 0)
+
+    ##
+    #invalidate
+    #Description: Makes the next drawBoard draw the whole screen, such as
+    #   after the window has been covered up.
+    ##
+    def invalidate(self):
+        self.lastScreen = None
+
+    ##
+    #makeBoardBackground
+    #Description: Draws what is behind the board and the buttons, which
+    #   parts of the game screen are cleared to before being drawn again.
+    #
+    #Returns: The background.(Surface)
+    ##
+    def makeBoardBackground(self):
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(BLACK)
+        #Draw the menu area.
+        pygame.draw.rect(background, WHITE, self.buttonArea)
+        #Draw the player color indicator boxes.
+        pygame.draw.rect(background, LIGHT_RED, self.outerRect)
+        pygame.draw.rect(background, BLACK, self.innerRect.move((CELL_SPACING, CELL_SPACING)))
+        pygame.draw.rect(background, LIGHT_BLUE, self.outerRect.move((0, self.p2RectYOffset)))
+        pygame.draw.rect(background, BLACK, self.innerRect.move((CELL_SPACING, CELL_SPACING + self.p2RectYOffset)))
+        return background
     
     ##
     #handleButton
@@ -746,8 +1045,12 @@ class UserInterface(object):
         #It should be impossible for self.buildAntMenu to be True unless mode is HUMAN_MODE and AIs have already been chosen.
         if mode == HUMAN_MODE and self.buildAntMenu:
             relButtons = self.antButtons
-        #Check what to do for each event
-        for event in pygame.event.get():
+        #Check what to do for each event, starting with any waitForEvent took
+        events = self.waitedEvents + pygame.event.get()
+        self.waitedEvents = []
+        if events:
+            self.eventsPending = True
+        for event in events:
             if event.type == pygame.QUIT:
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN and time.clock() - self.lastClicked > self.clickCooldown:
@@ -824,6 +1127,9 @@ class UserInterface(object):
                     self.textBoxContent = self.textBoxContent[:-1]
             elif event.type == KEYDOWN:
                 self.handleHotkey(mode, str(event.unicode))
+            elif event.type == VIDEOEXPOSE:
+                #The window has been uncovered, so draw all of it again.
+                self.invalidate()
     
     ##
     #findButtonCoords
@@ -854,38 +1160,43 @@ class UserInterface(object):
         global CELL_SIZE
         #Declare the name of the folder that all textures are in.
         texFolder = "Textures"
-        #Load textures as Surfaces. Should convert these surfaces later for optimal speed.
+        #Load textures as Surfaces, converted to the screen's format so blitting them is fast.
+        loadTexture = lambda name: pygame.image.load(os.path.join(texFolder, name)).convert()
         self.constructionTexs = []
-        self.constructionTexs.append(pygame.image.load(os.path.join(texFolder, "anthill.bmp")))
-        self.constructionTexs.append(pygame.image.load(os.path.join(texFolder, "antTunnel.bmp")))
-        self.constructionTexs.append(pygame.image.load(os.path.join(texFolder, "grass.bmp")))
-        self.constructionTexs.append(pygame.image.load(os.path.join(texFolder, "food.bmp")))
+        self.constructionTexs.append(loadTexture("anthill.bmp"))
+        self.constructionTexs.append(loadTexture("antTunnel.bmp"))
+        self.constructionTexs.append(loadTexture("grass.bmp"))
+        self.constructionTexs.append(loadTexture("food.bmp"))
         self.antTexs = []
-        self.antTexs.append(pygame.image.load(os.path.join(texFolder, "queen.bmp")))
-        self.antTexs.append(pygame.image.load(os.path.join(texFolder, "worker.bmp")))
-        self.antTexs.append(pygame.image.load(os.path.join(texFolder, "drone.bmp")))
-        self.antTexs.append(pygame.image.load(os.path.join(texFolder, "direct.bmp")))
-        self.antTexs.append(pygame.image.load(os.path.join(texFolder, "indirect.bmp")))
+        self.antTexs.append(loadTexture("queen.bmp"))
+        self.antTexs.append(loadTexture("worker.bmp"))
+        self.antTexs.append(loadTexture("drone.bmp"))
+        self.antTexs.append(loadTexture("direct.bmp"))
+        self.antTexs.append(loadTexture("indirect.bmp"))
         #Load isCarrying and texture, which will allow players to see the conditions of their ants.
-        self.isCarryingTex = pygame.image.load(os.path.join(texFolder, "isCarrying.bmp"))
+        self.isCarryingTex = loadTexture("isCarrying.bmp")
         #Load the texture used for terrain (ground).
-        self.terrainTex = pygame.image.load(os.path.join(texFolder, "terrain.bmp"))
+        self.terrainTex = loadTexture("terrain.bmp")
         #CheckBox textures
         self.checkBoxTextures = []
-        self.checkBoxTextures.append(pygame.image.load(os.path.join(texFolder, "unchecked.bmp")))
-        self.checkBoxTextures.append(pygame.image.load(os.path.join(texFolder, "checked.bmp")))
+        self.checkBoxTextures.append(loadTexture("unchecked.bmp"))
+        self.checkBoxTextures.append(loadTexture("checked.bmp"))
         #CheckBox rectangle
         self.checkBoxRect = self.checkBoxTextures[0].get_rect()
         #Button textures
         self.buttonTextures = []
-        self.buttonTextures.append(pygame.image.load(os.path.join(texFolder, "buttonDown.bmp")))
-        self.buttonTextures.append(pygame.image.load(os.path.join(texFolder, "buttonUp.bmp")))
+        self.buttonTextures.append(loadTexture("buttonDown.bmp"))
+        self.buttonTextures.append(loadTexture("buttonUp.bmp"))
         #Button rectangle
         self.buttonRect = self.buttonTextures[0].get_rect()
         #Make CELL_SIZE equal to the size of an ant image.
         CELL_SIZE = self.constructionTexs[0].get_rect()
-        #Create shaderTex, which will be used to translucently shade ants.
-        self.shaderTex = pygame.Surface((CELL_SIZE.width, CELL_SIZE.height))
+        #Create the shades that translucently cover moved ants and highlighted cells.
+        self.shadeTexs = {}
+        for color in [BLACK, DARK_GREEN, LIGHT_GREEN, GOLDENROD, LIGHT_RED]:
+            self.shadeTexs[color] = pygame.Surface(CELL_SIZE.size).convert()
+            self.shadeTexs[color].fill(color)
+            self.shadeTexs[color].set_alpha(SHADE_ALPHA)
         #Set the color that will be used as an alpha transparency to let player colors shine through.
         self.playerAlpha = OFF_BLACK
         #Make White transparent (alpha 0) for most textures (well, buttons don't actually need it).
@@ -896,7 +1207,23 @@ class UserInterface(object):
         for ant in self.antTexs:
             ant.set_colorkey(self.playerAlpha)
         self.isCarryingTex.set_colorkey(WHITE)
-        self.shaderTex.set_alpha(50)
+        #Draw every construction and ant the board can show ahead of time, so
+        #each is a single blit.
+        self.constrSprites = {}
+        for constrType in [ANTHILL, TUNNEL, GRASS, FOOD]:
+            for owner in [PLAYER_ONE, PLAYER_TWO, NEUTRAL]:
+                self.constrSprites[(constrType, owner)] = self.makeConstrSprite(constrType, owner)
+        self.antSprites = {}
+        for antType in xrange(0, len(self.antTexs)):
+            for player in [PLAYER_ONE, PLAYER_TWO]:
+                for carrying in [False, True]:
+                    for hasMoved in [False, True]:
+                        self.antSprites[(antType, player, carrying, hasMoved)] = \
+                            self.makeAntSprite(antType, player, carrying, hasMoved)
+        #The health bar colors (perimeter, health, damage) of ants that haven't and have moved
+        healthColors = [DARK_GREEN, LIGHT_GREEN, DARK_RED]
+        self.healthColors = {False: healthColors,
+                             True: [self.shadeColor(color, BLACK) for color in healthColors]}
         #Set up fonts.
         pygame.font.init()
         self.statFont = pygame.font.Font(None, 15)
@@ -905,6 +1232,8 @@ class UserInterface(object):
         self.tournFont = pygame.font.Font(None, 25)
         self.captureFont = pygame.font.Font(None, 130)
         self.monsterFont = pygame.font.Font(None, 300)
+        #The text rendered most recently, least recently used first (see renderText)
+        self.textCache = collections.OrderedDict()
         #Where should scores be drawn?
         self.scoreLocation = self.findButtonCoords(0, True)
         #Where should notifications be drawn?
@@ -969,7 +1298,7 @@ class UserInterface(object):
         #Initializing tournament scores
         self.tournamentScores = []
         #Variables used to track elapsed time during tournaments
-        self.tournamentStartTime = time.clock()
+        self.tournamentStartTime = time.time()
         self.tournamentElapsed = 0.0
         self.tournamentInProgress = False
         #Find out if user is choosing AIs
@@ -979,3 +1308,13 @@ class UserInterface(object):
         #Set a minimmum time between accepted clicks.
         self.clickCooldown = 0.15
         self.lastClicked = time.clock()
+        #What is behind the game screen, and what was drawn last (see drawBoard)
+        self.boardBackground = self.makeBoardBackground()
+        self.lastScreen = None
+        self.lastOverlays = None
+        self.lastRegions = {}
+        #Frame timing and event waiting (see drawBoard and waitForEvent)
+        self.lastFrameTime = 0
+        self.pendingFrame = None
+        self.eventsPending = False
+        self.waitedEvents = []
@@ -0,0 +1,32 @@
+import multiprocessing, multiprocessing.pool
+
+#
+# WorkerPool.py
+#
+# A multiprocessing pool whose workers may start processes of their own.
+# Pool workers are normally daemonic, which multiprocessing does not allow
+# to have children, but a worker that plays games with sandboxed players
+# (see PlayerProcess) needs a process for each of them.
+#
+
+##
+#WorkerProcess
+#Description: A pool worker process that is never daemonic, whatever the
+#   pool asks for, so it is allowed to start processes of its own
+##
+class WorkerProcess(multiprocessing.Process):
+
+    def _getDaemon(self):
+        return False
+
+    def _setDaemon(self, value):
+        pass
+
+    daemon = property(_getDaemon, _setDaemon)
+
+##
+#WorkerPool
+#Description: A process pool made of WorkerProcesses
+##
+class WorkerPool(multiprocessing.pool.Pool):
+    Process = WorkerProcess
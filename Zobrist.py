@@ -0,0 +1,151 @@
+import random
+from Constants import *
+from Construction import Construction
+
+#
+# Zobrist.py
+#
+# Zobrist hashing of GameStates.  Every feature of a state (an ant of a
+# given type and owner on a given cell, its health, whether it carries food,
+# ...) has a random key, and the hash of a state is the XOR of the keys of
+# its features.  XOR is its own inverse, so a change to a state is hashed in
+# by XORing out the keys of the old features and XORing in the new ones
+# (see GameState.hashAnt and friends).
+#
+# The phase of the game is not hashed since states from different phases
+# are never compared.
+#
+
+#Seed for the keys.  It is fixed so that every process hashes states the same.
+ZOBRIST_SEED = 1234567
+
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+NUM_ANT_TYPES = R_SOLDIER + 1
+NUM_CONSTR_TYPES = FOOD - ANTHILL + 1
+#healths and food counts above these share a key
+MAX_HASHED_HEALTH = 15
+MAX_HASHED_FOOD = 63
+
+keyGenerator = random.Random(ZOBRIST_SEED)
+
+##
+#makeKeys
+#Description: Makes a list of random keys.  The keys are 63 bits so they
+#   stay plain ints on 64 bit machines.
+#
+#Parameters:
+#   count - The number of keys to make (int)
+#
+#Return: The keys (int[])
+##
+def makeKeys(count):
+    return [keyGenerator.getrandbits(63) for i in xrange(0, count)]
+
+#An ant of each owner and type on each cell:
+#   ANT_KEYS[(player * NUM_ANT_TYPES + type) * NUM_CELLS + cell]
+ANT_KEYS = makeKeys(2 * NUM_ANT_TYPES * NUM_CELLS)
+#The health of the ant of each owner on each cell:
+#   ANT_HEALTH_KEYS[(player * NUM_CELLS + cell) * (MAX_HASHED_HEALTH + 1) + health]
+ANT_HEALTH_KEYS = makeKeys(2 * NUM_CELLS * (MAX_HASHED_HEALTH + 1))
+#The ant of each owner on each cell is carrying food / has moved:
+#   ANT_CARRYING_KEYS[player * NUM_CELLS + cell]
+ANT_CARRYING_KEYS = makeKeys(2 * NUM_CELLS)
+ANT_MOVED_KEYS = makeKeys(2 * NUM_CELLS)
+#A construction of each owner (including NEUTRAL) and type on each cell:
+#   CONSTR_KEYS[(owner * NUM_CONSTR_TYPES + type - ANTHILL) * NUM_CELLS + cell]
+CONSTR_KEYS = makeKeys(3 * NUM_CONSTR_TYPES * NUM_CELLS)
+#The capture health of the building on each cell:
+#   CAPTURE_KEYS[cell * (MAX_HASHED_HEALTH + 1) + captureHealth]
+CAPTURE_KEYS = makeKeys(NUM_CELLS * (MAX_HASHED_HEALTH + 1))
+#The food count of each player: FOOD_KEYS[player * (MAX_HASHED_FOOD + 1) + foodCount]
+FOOD_KEYS = makeKeys(2 * (MAX_HASHED_FOOD + 1))
+#It is player two's turn
+TURN_KEY = makeKeys(1)[0]
+
+##
+#hashAnt
+#Description: Returns the XOR of the keys of an ant's features
+#
+#Parameters:
+#   ant - The ant to hash (Ant)
+#
+#Return: The hash (int)
+##
+def hashAnt(ant):
+    cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+    slot = ant.player * NUM_CELLS + cell
+    health = min(max(ant.health, 0), MAX_HASHED_HEALTH)
+    result = ANT_KEYS[(ant.player * NUM_ANT_TYPES + ant.type) * NUM_CELLS + cell]
+    result ^= ANT_HEALTH_KEYS[slot * (MAX_HASHED_HEALTH + 1) + health]
+    if ant.carrying:
+        result ^= ANT_CARRYING_KEYS[slot]
+    if ant.hasMoved:
+        result ^= ANT_MOVED_KEYS[slot]
+    return result
+
+##
+#hashConstr
+#Description: Returns the XOR of the keys of a construction's features
+#
+#Parameters:
+#   constr - The construction to hash (Construction)
+#
+#Return: The hash (int)
+##
+def hashConstr(constr):
+    cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+    #grass and food are plain Constructions, which nobody owns
+    if type(constr) is Construction:
+        return CONSTR_KEYS[(NEUTRAL * NUM_CONSTR_TYPES + constr.type - ANTHILL) * NUM_CELLS + cell]
+    result = CONSTR_KEYS[(constr.player * NUM_CONSTR_TYPES + constr.type - ANTHILL) * NUM_CELLS + cell]
+    if constr.captureHealth != None:
+        health = min(max(constr.captureHealth, 0), MAX_HASHED_HEALTH)
+        result ^= CAPTURE_KEYS[cell * (MAX_HASHED_HEALTH + 1) + health]
+    return result
+
+##
+#hashFood
+#Description: Returns the key of a player's food count
+#
+#Parameters:
+#   playerId - The player (int)
+#   foodCount - The player's food count (int)
+#
+#Return: The hash (int)
+##
+def hashFood(playerId, foodCount):
+    return FOOD_KEYS[playerId * (MAX_HASHED_FOOD + 1) + min(max(foodCount, 0), MAX_HASHED_FOOD)]
+
+##
+#hashTurn
+#Description: Returns the key of whose turn it is
+#
+#Parameters:
+#   whoseTurn - The player whose turn it is (int)
+#
+#Return: The hash (int)
+##
+def hashTurn(whoseTurn):
+    if whoseTurn == PLAYER_TWO:
+        return TURN_KEY
+    return 0
+
+##
+#hashState
+#Description: Hashes a whole state from scratch
+#
+#Parameters:
+#   state - The state to hash (GameState)
+#
+#Return: The hash (int)
+##
+def hashState(state):
+    result = hashTurn(state.whoseTurn)
+    for inv in state.inventories:
+        for ant in inv.ants:
+            result ^= hashAnt(ant)
+        for constr in inv.constrs:
+            result ^= hashConstr(constr)
+        if inv.player != NEUTRAL:
+            result ^= hashFood(inv.player, inv.foodCount)
+    return result